@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Lich protocol asyncio client and concurrent-session load driver.
+
+The server keeps one session per user (a re-login drops the old one) and admits
+maxSess of them at once (5 by default), so give each session its own user and
+raise maxSess (and --max-sessions past 100) for larger runs.
+
+Examples:
+  python lichServer.py 9001 --max-sessions 200 --config maxSess=200
+  python asyncClient.py --sessions 200 --user 'u{i}' --password SBLCHT42
+  python asyncClient.py --sessions 50 --concurrency 5 --user 'u{i}' --password SBLCHT42 --command id
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import struct
+import sys
+import time
+from typing import Dict, List, Optional
+
+from client import (
+    HEADER_SIZE,
+    MSG_BC_ACK,
+    MSG_BC_CTS,
+    PROTO_BC,
+    Frame,
+    Req,
+    bcDataReq,
+    bcRtsReq,
+    buildFrame,
+    decodeError,
+    elevateReq,
+    execReq,
+    getCfgReq,
+    handshakeReq,
+    loginReq,
+    loginToken,
+    logoutReq,
+    parseFrame,
+    setCfgReq,
+)
+
+
+class AsyncLichSession:
+    """One persistent asyncio connection; reconnects when the server has closed it.
+
+    Records per-message latency (seconds) in self.lat and error replies in self.fails.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float) -> None:
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.connects = 0
+        self.lat: Dict[str, List[float]] = {}
+        self.fails: Dict[str, int] = {}
+
+    async def __aenter__(self) -> "AsyncLichSession":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def connect(self) -> None:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.timeout)
+            self.connects += 1
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            writer = self.writer
+            self.reader = self.writer = None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def readResp(self) -> Optional[bytes]:
+        # One raw response frame; None if the peer closed before sending any of it
+        try:
+            respHeader = await self.reader.readexactly(HEADER_SIZE)
+        except asyncio.IncompleteReadError as exc:
+            if exc.partial:
+                raise ConnectionError("connection lost mid-response") from exc
+            return None
+        except (ConnectionResetError, ConnectionAbortedError):
+            return None
+
+        respPayloadLen = struct.unpack("<I", respHeader[3:7])[0]
+        try:
+            respPayload = await self.reader.readexactly(respPayloadLen) if respPayloadLen else b""
+        except (asyncio.IncompleteReadError, ConnectionError) as exc:
+            raise ConnectionError("connection lost mid-response") from exc
+        return respHeader + respPayload
+
+    async def exchange(self, reqFrame: bytes) -> bytes:
+        # Same policy as LichSession.exchange: retry once if a reused connection was stale
+        for _ in range(2):
+            if self.reader is not None and self.reader.at_eof():
+                await self.close()
+            fresh = self.writer is None
+            await self.connect()
+
+            try:
+                self.writer.write(reqFrame)
+                await self.writer.drain()
+                resp = await asyncio.wait_for(self.readResp(), self.timeout)
+            except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError):
+                resp = None
+            except (ConnectionError, OSError, asyncio.TimeoutError):
+                await self.close()
+                raise
+
+            if resp is None:
+                await self.close()
+                if fresh:
+                    raise ConnectionError("socket closed before response")
+                continue
+            return resp
+
+        raise ConnectionError("socket closed before response")
+
+    async def request(self, name: str, req: Req) -> Frame:
+        reqFrame = buildFrame(*req)
+        t0 = time.perf_counter()
+        frame = parseFrame(await self.exchange(reqFrame))
+        self.lat.setdefault(name, []).append(time.perf_counter() - t0)
+        if decodeError(frame):
+            self.fails[name] = self.fails.get(name, 0) + 1
+        return frame
+
+    async def handshake(self, supportedHashes: str = "Blake3,MD5") -> Frame:
+        return await self.request("handshake", handshakeReq(supportedHashes))
+
+    async def login(self, user: str, password: str) -> Optional[bytes]:
+        return loginToken(await self.request("login", loginReq(user, password)))
+
+    async def elevate(self, token: bytes, requestText: str = "elevateRequest") -> Frame:
+        return await self.request("elevate", elevateReq(token, requestText))
+
+    async def setCfg(self, token: bytes, key: str, value: str) -> Frame:
+        return await self.request("setCfg", setCfgReq(token, key, value))
+
+    async def getCfg(self, token: bytes, key: str) -> Frame:
+        return await self.request("getCfg", getCfgReq(token, key))
+
+    async def exec(self, token: bytes, command: str) -> Frame:
+        return await self.request("exec", execReq(token, command))
+
+    async def bcSend(self, token: bytes, chunkBytes: bytes) -> int:
+        rtsFrame = await self.request("bcRts", bcRtsReq(token, len(chunkBytes)))
+        if not (rtsFrame["protoId"] == PROTO_BC and rtsFrame["msgType"] == MSG_BC_CTS
+                and len(rtsFrame["payload"]) >= 1 and rtsFrame["payload"][0] == 1):
+            return 1
+
+        dataFrame = await self.request("bcData", bcDataReq(token, chunkBytes))
+        if dataFrame["protoId"] == PROTO_BC and dataFrame["msgType"] == MSG_BC_ACK and len(dataFrame["payload"]) == 0:
+            return 0
+        return 1
+
+    async def logout(self, token: bytes) -> Frame:
+        return await self.request("logout", logoutReq(token))
+
+
+def percentile(sortedVals: List[float], pct: float) -> float:
+    # Nearest-rank percentile of an ascending list
+    if not sortedVals:
+        return 0.0
+    rank = max(1, -(-len(sortedVals) * pct // 100))
+    return sortedVals[int(rank) - 1]
+
+
+def latencyReport(lat: Dict[str, List[float]], fails: Dict[str, int]) -> List[dict]:
+    # Per-message summary rows, latencies in milliseconds
+    rows = []
+    for name, vals in lat.items():
+        vals = sorted(vals)
+        rows.append({
+            "msg": name,
+            "count": len(vals),
+            "fail": fails.get(name, 0),
+            "p50": percentile(vals, 50) * 1000,
+            "p95": percentile(vals, 95) * 1000,
+            "p99": percentile(vals, 99) * 1000,
+            "max": vals[-1] * 1000,
+        })
+    return rows
+
+
+def printReport(rows: List[dict]) -> None:
+    print(f"{'msg':<10} {'count':>7} {'fail':>6} {'p50ms':>9} {'p95ms':>9} {'p99ms':>9} {'maxms':>9}")
+    for r in rows:
+        print(f"{r['msg']:<10} {r['count']:>7} {r['fail']:>6} {r['p50']:>9.2f} {r['p95']:>9.2f} {r['p99']:>9.2f} {r['max']:>9.2f}")
+
+
+async def scriptedSession(conn: AsyncLichSession, user: str, password: str, command: str, chunk: bytes) -> None:
+    # handshake -> login -> elevate -> set/get config -> exec -> BoneCourier send -> logout
+    # (exec is refused for unelevated sessions, so the script elevates first, like lichBench --elevate)
+    await conn.handshake()
+    token = await conn.login(user, password)
+    if not token:
+        raise RuntimeError(f"login failed for {user}")
+    await conn.setCfg(token, "EleEnabled", "True")
+    await conn.elevate(token)
+    await conn.setCfg(token, "EnCmdExec", "True")
+    await conn.getCfg(token, "EnCmdExec")
+    await conn.exec(token, command)
+    await conn.bcSend(token, chunk)
+    await conn.logout(token)
+
+
+async def runLoad(host: str, port: int, timeout: float, sessions: int, concurrency: int,
+                  user: str, password: str, command: str, chunk: bytes) -> dict:
+    # Run scripted sessions concurrently; merge their latency samples
+    sem = asyncio.Semaphore(concurrency)
+    lat: Dict[str, List[float]] = {}
+    fails: Dict[str, int] = {}
+    errors: List[str] = []
+    connects = 0
+
+    async def one(idx: int) -> None:
+        nonlocal connects
+        async with sem:
+            conn = AsyncLichSession(host, port, timeout)
+            try:
+                await scriptedSession(conn, user.format(i=idx), password, command, chunk)
+            except (ValueError, RuntimeError, ConnectionError, OSError, asyncio.TimeoutError) as exc:
+                errors.append(f"session {idx}: {exc or type(exc).__name__}")
+            finally:
+                await conn.close()
+            connects += conn.connects
+            for name, vals in conn.lat.items():
+                lat.setdefault(name, []).extend(vals)
+            for name, cnt in conn.fails.items():
+                fails[name] = fails.get(name, 0) + cnt
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(sessions)))
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "sessions": sessions,
+        "errors": errors,
+        "connects": connects,
+        "elapsed": elapsed,
+        "messages": sum(len(v) for v in lat.values()),
+        "report": latencyReport(lat, fails),
+    }
+
+
+def buildParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Lich protocol asyncio load driver")
+    parser.add_argument("--host", default="127.0.0.1", help="Server host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=9001, help="Server port (default: 9001)")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Per-message timeout seconds")
+    parser.add_argument("--sessions", type=int, default=100, help="Scripted sessions to run")
+    parser.add_argument("--concurrency", type=int, default=0, help="Max sessions in flight (default: all)")
+    parser.add_argument("--user", required=True, help="Username; '{i}' expands to the session index")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--command", default="id")
+    parser.add_argument("--chunk", default="bonecourier", help="BoneCourier chunk text")
+    return parser
+
+
+def main() -> int:
+    args = buildParser().parse_args()
+    res = asyncio.run(runLoad(args.host, args.port, args.timeout, args.sessions,
+                              args.concurrency or args.sessions, args.user, args.password,
+                              args.command, args.chunk.encode("utf-8")))
+
+    for err in res["errors"][:10]:
+        print(f"error: {err}", file=sys.stderr)
+    printReport(res["report"])
+    rate = res["messages"] / res["elapsed"] if res["elapsed"] else 0.0
+    print(f"sessions={res['sessions']} errors={len(res['errors'])} connects={res['connects']} "
+          f"messages={res['messages']} elapsed={res['elapsed']:.2f}s rate={rate:.0f} msg/s")
+    return 1 if res["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,24 +6,33 @@ Examples:
   python test_client.py handshake
   python test_client.py login --user test --password SBLCHT42
   python test_client.py flow --user test --password SBLCHT42 --max-payload 512
+  python test_client.py get --user test --password SBLCHT42 --key timeout   # token cached for later runs
 """
 
 from __future__ import annotations
 
 import argparse
+import functools
 import hashlib
+import json
+import os
 import re
+import select
 import shlex
 import socket
 import struct
 import sys
-from typing import Optional
+import time
+from collections import deque
+from typing import BinaryIO, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
 
 try:
     import blake3  # pip install blake3
 except ImportError:
     blake3 = None
 
+import pyBlake3
+
 
 HEADER_SIZE = 46
 VERSION = 0x06
@@ -57,6 +66,42 @@ MSG_ER_REQ = 0x50
 MSG_ER_RESP = 0x51
 MSG_ER_IDK = 0x52
 
+# protoId, msgType, payloadLen, magic, version, payloadHash (MD5 is zero-padded to 32)
+FRAME_HDR = struct.Struct("<2sBI6sB32s")
+
+# Max requests in flight for LichSession.pipeline
+PIPE_WINDOW = 8
+# Default BoneCourier chunk: fits the reference server's 256-byte maxPayload
+# once the DataPacket's 16-byte chunk header and 16-byte token are added
+BC_CHUNK_DEFAULT = 224
+# Initial LichSession receive buffer payload capacity
+RBUF_SIZE = 4096
+# Payloads up to HASH_MEMO_MAX bytes hit an LRU digest memo of HASH_MEMO_SIZE entries
+HASH_MEMO_MAX = 64
+HASH_MEMO_SIZE = 4096
+# Payload size from which the blake3 extension may hash on its own threads
+HASH_THREADS_MIN = 1 << 17
+
+# Token cache file (override with LICH_TOKEN_CACHE or --cache)
+TOKEN_CACHE = os.environ.get("LICH_TOKEN_CACHE") or os.path.join(os.path.expanduser("~"), ".lich_tokens.json")
+# ERR_TOKEN_EXP always means the cached token is dead. ERR_UNAUTHORIZED is also
+# what the reference server reports for an expired token, but it is a real denial
+# elsewhere (e.g. a refused elevate), so the token is probed before it is replaced.
+TOKEN_EXP_ERR = 0x0005
+TOKEN_UNAUTH_ERR = 0x0003
+# Token-checked request with no side effects: a live token gets ERR_CONFIG_NOTFOUND
+TOKEN_PROBE_KEY = "__token_probe__"
+
+# (protoId, msgType, payload) for one request
+Req = Tuple[bytes, int, bytes]
+T = TypeVar("T")
+
+# BoneCourier upload source: file path, binary file, buffer, or iterable of byte pieces
+Source = Union[str, BinaryIO, bytes, bytearray, memoryview, Iterable[bytes]]
+
+# Subcommands that act with a session token
+TOKEN_CMDS = ("get", "set", "elevate", "bcrts", "bcdata", "bcsend", "bcupload", "exec", "logout")
+
 ERR_MAP = {
     0x0000: "ERR_OK",
     0x0001: "ERR_MAGIC_VER",
@@ -72,36 +117,76 @@ ERR_MAP = {
 
 
 def hashPayload(protoId: bytes, payload: bytes) -> bytes:
+    # Small payloads (tokens, config keys, logout bodies) repeat constantly: memoise them
+    if len(payload) <= HASH_MEMO_MAX:
+        return memoHash(protoId, bytes(payload))
+    return rawHash(protoId, payload)
+
+
+@functools.lru_cache(maxsize=HASH_MEMO_SIZE)
+def memoHash(protoId: bytes, payload: bytes) -> bytes:
+    return rawHash(protoId, payload)
+
+
+def rawHash(protoId: bytes, payload: bytes) -> bytes:
     if protoId == PROTO_AR:
         md5Bytes = hashlib.md5(payload).digest()
         return md5Bytes + (b"\x00" * 16)
 
     if blake3 is None:
-        raise RuntimeError("blake3 module is required for non-AR messages. Install with: pip install blake3")
-
+        return pyBlake3.digest(payload)
+    if len(payload) >= HASH_THREADS_MIN:
+        return blake3.blake3(payload, max_threads=blake3.blake3.AUTO).digest()
     return blake3.blake3(payload).digest()
 
 
+def packHeader(buf: bytearray, offset: int, protoId: bytes, msgType: int, payload: bytes) -> None:
+    # Write the 46-byte header for payload into buf at offset
+    if len(protoId) != 2:
+        raise ValueError("protoId must be 2 bytes")
+
+    magicBytes = ZERO_MAGIC if protoId == PROTO_AR else MAGIC
+    FRAME_HDR.pack_into(buf, offset, protoId, msgType, len(payload), magicBytes, VERSION, hashPayload(protoId, payload))
+
+
 def buildFrame(protoId: bytes, msgType: int, payload: bytes) -> bytes:
     if len(protoId) != 2:
         raise ValueError("protoId must be 2 bytes")
 
     magicBytes = ZERO_MAGIC if protoId == PROTO_AR else MAGIC
-    payloadHash = hashPayload(protoId, payload)
+    return FRAME_HDR.pack(protoId, msgType, len(payload), magicBytes, VERSION, hashPayload(protoId, payload)) + payload
+
+
+def sendParts(sockObj: socket.socket, *parts: bytes) -> None:
+    # Gathered write of all parts without joining them (sendall of a joined copy where sendmsg is missing)
+    if not hasattr(sockObj, "sendmsg"):
+        sockObj.sendall(b"".join(parts))
+        return
+
+    total = sum(len(p) for p in parts)
+    sent = sockObj.sendmsg(parts)
+    if sent == total:
+        return
 
-    header = (
-        protoId
-        + bytes([msgType])
-        + struct.pack("<I", len(payload))
-        + magicBytes
-        + bytes([VERSION])
-        + payloadHash
-    )
+    # Partial write: resume from the first unsent byte
+    views = [memoryview(p).cast("B") for p in parts if len(p)]
+    while True:
+        while views and sent >= len(views[0]):
+            sent -= len(views[0])
+            views.pop(0)
+        if not views:
+            return
+        views[0] = views[0][sent:]
+        sent = sockObj.sendmsg(views)
 
-    if len(header) != HEADER_SIZE:
-        raise RuntimeError(f"header size mismatch: {len(header)}")
 
-    return header + payload
+def sendFrame(sockObj: socket.socket, protoId: bytes, msgType: int, payload: bytes,
+              hdrBuf: Optional[bytearray] = None) -> None:
+    # Pack the header into hdrBuf (reusable) and send it with payload; the payload is never copied
+    if hdrBuf is None:
+        hdrBuf = bytearray(HEADER_SIZE)
+    packHeader(hdrBuf, 0, protoId, msgType, payload)
+    sendParts(sockObj, hdrBuf, payload)
 
 
 def recvExact(sockObj: socket.socket, size: int) -> bytes:
@@ -114,29 +199,70 @@ def recvExact(sockObj: socket.socket, size: int) -> bytes:
     return bytes(out)
 
 
-def parseFrame(rawFrame: bytes) -> dict:
-    if len(rawFrame) < HEADER_SIZE:
-        raise ValueError("short frame")
+def recvExactInto(sockObj: socket.socket, view: memoryview) -> None:
+    # Fill view completely from the socket
+    got = 0
+    while got < len(view):
+        n = sockObj.recv_into(view[got:])
+        if not n:
+            raise ConnectionError(f"socket closed early: wanted {len(view)}, got {got}")
+        got += n
 
-    header = rawFrame[:HEADER_SIZE]
-    payload = rawFrame[HEADER_SIZE:]
 
-    payloadLen = struct.unpack("<I", header[3:7])[0]
-    if payloadLen != len(payload):
-        raise ValueError(f"payload length mismatch header={payloadLen} actual={len(payload)}")
+class Frame:
+    # Lazily parsed frame, indexable like the old dict. One received by a LichSession views its
+    # receive buffer and is only valid until the next receive on that session; copy() to keep it
 
-    return {
-        "protoId": header[0:2],
-        "msgType": header[2],
-        "payloadLen": payloadLen,
-        "magic": header[7:13],
-        "version": header[13],
-        "hashBytes": header[14:46],
-        "payload": payload,
-    }
+    __slots__ = ("view", "msgType", "payloadLen", "version")
+
+    # msgType, payloadLen, version; protoId/magic/hash are skipped and sliced lazily
+    HDR = struct.Struct("<2xBI6xB32x")
+    FIELDS = frozenset(("protoId", "msgType", "payloadLen", "magic", "version", "hashBytes", "payload"))
+
+    def __init__(self, view: memoryview) -> None:
+        if len(view) < HEADER_SIZE:
+            raise ValueError("short frame")
+
+        self.view = view
+        self.msgType, self.payloadLen, self.version = self.HDR.unpack_from(view)
+        if self.payloadLen != len(view) - HEADER_SIZE:
+            raise ValueError(f"payload length mismatch header={self.payloadLen} actual={len(view) - HEADER_SIZE}")
+
+    @property
+    def protoId(self) -> bytes:
+        return self.view[0:2].tobytes()
+
+    @property
+    def magic(self) -> bytes:
+        return self.view[7:13].tobytes()
+
+    @property
+    def hashBytes(self) -> bytes:
+        return self.view[14:HEADER_SIZE].tobytes()
+
+    @property
+    def payloadView(self) -> memoryview:
+        return self.view[HEADER_SIZE:]
+
+    @property
+    def payload(self) -> bytes:
+        return self.view[HEADER_SIZE:].tobytes()
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
 
+    def copy(self) -> "Frame":
+        # Detach from the receive buffer
+        return Frame(memoryview(self.view.tobytes()))
 
-def verifyFrameHash(frame: dict) -> bool:
+
+def parseFrame(rawFrame: bytes) -> Frame:
+    return Frame(memoryview(rawFrame))
+
+
+def verifyFrameHash(frame: Frame) -> bool:
     try:
         expectedHash = hashPayload(frame["protoId"], frame["payload"])
     except RuntimeError:
@@ -148,27 +274,12 @@ def verifyFrameHash(frame: dict) -> bool:
     return frame["hashBytes"] == expectedHash
 
 
-def requestFrame(host: str, port: int, timeout: float, protoId: bytes, msgType: int, payload: bytes) -> dict:
-    reqFrame = buildFrame(protoId, msgType, payload)
-    sendFrame = parseFrame(reqFrame)
-    print("=== SEND ===")
-    printFrame(sendFrame, "send")
-
-    with socket.create_connection((host, port), timeout=timeout) as sockObj:
-        sockObj.settimeout(timeout)
-        sockObj.sendall(reqFrame)
-
-        respHeader = recvExact(sockObj, HEADER_SIZE)
-        respPayloadLen = struct.unpack("<I", respHeader[3:7])[0]
-        respPayload = recvExact(sockObj, respPayloadLen) if respPayloadLen else b""
+def requestFrame(host: str, port: int, timeout: float, protoId: bytes, msgType: int, payload: bytes) -> Frame:
+    with LichSession(host, port, timeout) as conn:
+        return conn.request(protoId, msgType, payload)
 
-    recvFrame = parseFrame(respHeader + respPayload)
-    print("=== RECV ===")
-    printFrame(recvFrame, "recv")
-    return recvFrame
 
-
-def decodeError(frame: dict) -> Optional[str]:
+def errorCode(frame: Frame) -> Optional[int]:
     payload = frame["payload"]
     msgType = frame["msgType"]
 
@@ -178,11 +289,17 @@ def decodeError(frame: dict) -> Optional[str]:
     if msgType not in (MSG_ER_IDK, MSG_UW_INVALID, MSG_BC_CTS, MSG_BC_ACK):
         return None
 
-    code = struct.unpack("<H", payload)[0]
+    return struct.unpack("<H", payload)[0]
+
+
+def decodeError(frame: Frame) -> Optional[str]:
+    code = errorCode(frame)
+    if code is None:
+        return None
     return f"0x{code:04x} ({ERR_MAP.get(code, 'UNKNOWN')})"
 
 
-def printFrame(frame: dict, label: str = "resp") -> None:
+def printFrame(frame: Frame, label: str = "resp") -> None:
     protoText = frame["protoId"].decode("ascii", errors="replace")
     hashOk = verifyFrameHash(frame)
 
@@ -194,16 +311,28 @@ def printFrame(frame: dict, label: str = "resp") -> None:
         print(f"[{label}] error={errText}")
         return
 
-    payload = frame["payload"]
+    printPayload(frame["protoId"], frame["msgType"], frame["payload"], label)
 
-    if frame["protoId"] == PROTO_AR and frame["msgType"] == MSG_ARISE_RESP and len(payload) >= 3:
+
+def printRequest(hdr: bytes, payload: bytes, label: str = "send") -> None:
+    # Trace an outgoing frame from its header buffer and payload as sent, without joining
+    # them or re-hashing the payload (the hash was just computed by packHeader)
+    protoId, msgType, payloadLen, magic, version, hashBytes = FRAME_HDR.unpack_from(hdr)
+    protoText = protoId.decode("ascii", errors="replace")
+    print(f"[{label}] proto={protoText} msg=0x{msgType:02x} payloadLen={payloadLen}")
+    print(f"[{label}] magic={magic.hex()} ver=0x{version:02x} hash={hashBytes[:8].hex()}")
+    printPayload(protoId, msgType, payload, label)
+
+
+def printPayload(protoId: bytes, msgType: int, payload: bytes, label: str) -> None:
+    if protoId == PROTO_AR and msgType == MSG_ARISE_RESP and len(payload) >= 3:
         magicPart = struct.unpack("<H", payload[:2])[0]
         respVer = payload[2]
         chosenHash = payload[3:].decode("utf-8", errors="replace")
         print(f"[{label}] arise.magicPart=0x{magicPart:04x} arise.ver=0x{respVer:02x} chosenHash={chosenHash}")
         return
 
-    if frame["protoId"] == PROTO_SB and frame["msgType"] == MSG_SB_RESP and len(payload) >= 18:
+    if protoId == PROTO_SB and msgType == MSG_SB_RESP and len(payload) >= 18:
         accept = payload[0]
         token = payload[1:17]
         authLevel = payload[17]
@@ -216,20 +345,20 @@ def printFrame(frame: dict, label: str = "resp") -> None:
                 print(f"[{label}] soulbind.flag.raw={payload[18:].hex()}")
         return
 
-    if frame["protoId"] == PROTO_BC and frame["msgType"] == MSG_BC_CTS and len(payload) >= 1:
+    if protoId == PROTO_BC and msgType == MSG_BC_CTS and len(payload) >= 1:
         print(f"[{label}] bc.cts.accept={payload[0]}")
         return
 
-    if frame["protoId"] == PROTO_BC and frame["msgType"] == MSG_BC_ACK and len(payload) == 0:
+    if protoId == PROTO_BC and msgType == MSG_BC_ACK and len(payload) == 0:
         print(f"[{label}] bc.ack=ok")
         return
 
-    if frame["protoId"] == PROTO_NW and frame["msgType"] == MSG_NW_GETCFG:
+    if protoId == PROTO_NW and msgType == MSG_NW_GETCFG:
         valueText = payload.split(b"\x00", 1)[0].decode("utf-8", errors="replace")
         print(f"[{label}] getCfg.value={valueText}")
         return
 
-    if frame["protoId"] == PROTO_NW and frame["msgType"] == MSG_NW_APPROVE:
+    if protoId == PROTO_NW and msgType == MSG_NW_APPROVE:
         parts = payload.split(b"\x00")
         if len(parts) >= 2:
             keyText = parts[0].decode("utf-8", errors="replace")
@@ -237,11 +366,11 @@ def printFrame(frame: dict, label: str = "resp") -> None:
             print(f"[{label}] nw.key={keyText} decision={decisionText}")
             return
 
-    if frame["protoId"] == PROTO_UW and frame["msgType"] == MSG_UW_RESULT:
+    if protoId == PROTO_UW and msgType == MSG_UW_RESULT:
         print(f"[{label}] uw.result.raw={payload.hex()}")
         return
 
-    if frame["protoId"] == PROTO_ER and frame["msgType"] == MSG_ER_RESP:
+    if protoId == PROTO_ER and msgType == MSG_ER_RESP:
         print(f"[{label}] eternal.raw={payload.hex()}")
         return
 
@@ -297,93 +426,568 @@ def decodeElevFlag(flagBytes: bytes) -> Optional[str]:
     return None
 
 
-def doHandshake(host: str, port: int, timeout: float, supportedHashes: str) -> dict:
+# Request builders: (protoId, msgType, payload) tuples, usable for lockstep or pipelined sends
+
+
+def handshakeReq(supportedHashes: str) -> Req:
     payload = bytes([0x84, 0x92, VERSION]) + supportedHashes.encode("utf-8")
-    frame = requestFrame(host, port, timeout, PROTO_AR, MSG_ARISE_REQ, payload)
-    return frame
+    return PROTO_AR, MSG_ARISE_REQ, payload
 
 
-def doLogin(host: str, port: int, timeout: float, user: str, password: str) -> Optional[bytes]:
+def loginReq(user: str, password: str) -> Req:
     if len(user.encode("utf-8")) > 8:
         raise ValueError("username must be <=8 bytes")
     if len(password.encode("utf-8")) > 8:
         raise ValueError("password must be <=8 bytes")
 
     payload = user.encode("utf-8") + b"\x00" + password.encode("utf-8") + b"\x00"
-    frame = requestFrame(host, port, timeout, PROTO_SB, MSG_SB_REQ, payload)
-
-    if frame["protoId"] == PROTO_SB and frame["msgType"] == MSG_SB_RESP and len(frame["payload"]) >= 18:
-        if frame["payload"][0] == 1:
-            token = frame["payload"][1:17]
-            print(f"[login] token={token.hex()}")
-            return token
-
-    return None
+    return PROTO_SB, MSG_SB_REQ, payload
 
 
-def doSetCfg(host: str, port: int, timeout: float, token: bytes, key: str, value: str) -> dict:
+def setCfgReq(token: bytes, key: str, value: str) -> Req:
     payload = key.encode("utf-8") + b"\x00" + value.encode("utf-8") + b"\x00" + token
-    frame = requestFrame(host, port, timeout, PROTO_NW, MSG_NW_SETCFG, payload)
-    return frame
+    return PROTO_NW, MSG_NW_SETCFG, payload
 
 
-def doGetCfg(host: str, port: int, timeout: float, token: bytes, key: str) -> dict:
+def getCfgReq(token: bytes, key: str) -> Req:
     payload = key.encode("utf-8") + b"\x00" + token
-    frame = requestFrame(host, port, timeout, PROTO_NW, MSG_NW_GETCFG, payload)
-    return frame
+    return PROTO_NW, MSG_NW_GETCFG, payload
 
 
-def doElevate(host: str, port: int, timeout: float, token: bytes, requestText: str) -> dict:
+def elevateReq(token: bytes, requestText: str) -> Req:
     payload = token + requestText.encode("utf-8") + b"\x00"
-    frame = requestFrame(host, port, timeout, PROTO_SB, MSG_SB_ELEVATE, payload)
-    return frame
+    return PROTO_SB, MSG_SB_ELEVATE, payload
 
 
-def doBcRts(host: str, port: int, timeout: float, token: bytes, dataSize: int) -> dict:
+def bcRtsReq(token: bytes, dataSize: int) -> Req:
     if dataSize < 0 or dataSize > 0xFFFFFFFF:
         raise ValueError("size must be in range [0, 4294967295]")
 
     payload = struct.pack("<I", dataSize) + token
-    frame = requestFrame(host, port, timeout, PROTO_BC, MSG_BC_RTS, payload)
-    return frame
+    return PROTO_BC, MSG_BC_RTS, payload
 
 
-def doBcData(host: str, port: int, timeout: float, token: bytes, chunkBytes: bytes) -> dict:
+def bcDataReq(token: bytes, chunkBytes: bytes) -> Req:
     if len(chunkBytes) > 1024:
         raise ValueError("chunk size must be <=1024 bytes")
 
     chunkHash = hashlib.md5(chunkBytes).digest()
-    payload = chunkBytes + chunkHash + token
-    frame = requestFrame(host, port, timeout, PROTO_BC, MSG_BC_DATA, payload)
-    return frame
+    payload = b"".join((chunkBytes, chunkHash, token))
+    return PROTO_BC, MSG_BC_DATA, payload
 
 
-def doBcSend(host: str, port: int, timeout: float, token: bytes, chunkBytes: bytes) -> int:
-    rtsFrame = doBcRts(host, port, timeout, token, len(chunkBytes))
-    if not (rtsFrame["protoId"] == PROTO_BC and rtsFrame["msgType"] == MSG_BC_CTS and len(rtsFrame["payload"]) >= 1):
-        print("[bcsend] RTS failed")
-        return 1
-    if rtsFrame["payload"][0] != 1:
-        print("[bcsend] RTS denied")
+def execReq(token: bytes, command: str) -> Req:
+    payload = command.encode("utf-8") + b"\x00" + token
+    return PROTO_UW, MSG_UW_EXEC, payload
+
+
+def logoutReq(token: bytes) -> Req:
+    return PROTO_ER, MSG_ER_REQ, token
+
+
+def sourceSize(source: Source) -> Optional[int]:
+    # Bytes left in an upload source, or None if it cannot be known up front
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return memoryview(source).nbytes
+    if hasattr(source, "fileno") and hasattr(source, "tell"):
+        try:
+            return os.fstat(source.fileno()).st_size - source.tell()
+        except (OSError, ValueError):
+            return None
+    return None
+
+
+def iterChunks(source: Source, chunkSize: int) -> Iterator[memoryview]:
+    # Chunks of <= chunkSize from a path, file, buffer or bytes iterator; file chunks share one read buffer
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            yield from iterChunks(f, chunkSize)
+        return
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        pieces: Iterable = (source,)
+    elif hasattr(source, "readinto"):
+        buf = bytearray(chunkSize * 64)
+        view = memoryview(buf)
+        while True:
+            n = source.readinto(buf)
+            if not n:
+                return
+            for off in range(0, n, chunkSize):
+                yield view[off:min(off + chunkSize, n)]
+    else:
+        pieces = source
+
+    for piece in pieces:
+        view = memoryview(piece).cast("B")
+        for off in range(0, len(view), chunkSize):
+            yield view[off:off + chunkSize]
+
+
+def loginToken(frame: Frame) -> Optional[bytes]:
+    # Token from an accepted SoulBind response (login or elevate)
+    if frame["protoId"] == PROTO_SB and frame["msgType"] == MSG_SB_RESP and len(frame["payload"]) >= 18:
+        if frame["payload"][0] == 1:
+            return frame["payload"][1:17]
+    return None
+
+
+class LichSession:
+    # One socket reused for every message; reconnects if the server closed it, pipelines once it has kept it open
+
+    def __init__(self, host: str, port: int, timeout: float) -> None:
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.sock: Optional[socket.socket] = None
+        self.connects = 0
+        # None until observed; False once the server closed with requests outstanding
+        self.keepAlive: Optional[bool] = None
+        # Receive buffer reused for every response (grown on demand), header buffer for every request
+        self.rbuf = bytearray(HEADER_SIZE + RBUF_SIZE)
+        self.hbuf = bytearray(HEADER_SIZE)
+        # Error code of the last exchange() response, None if it was not an error
+        self.lastErr: Optional[int] = None
+
+    def __enter__(self) -> "LichSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def connect(self) -> socket.socket:
+        if self.sock is None:
+            sockObj = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            sockObj.settimeout(self.timeout)
+            sockObj.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sock = sockObj
+            self.connects += 1
+        return self.sock
+
+    def close(self) -> None:
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            finally:
+                self.sock = None
+
+    def peerClosed(self) -> bool:
+        # Readable while idle means EOF/reset (or stray bytes): either way the socket is unusable
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+            return bool(readable)
+        except (OSError, ValueError):
+            return True
+
+    def readResp(self, sockObj: socket.socket) -> Optional[Frame]:
+        # One response frame, in the receive buffer; None if the peer closed before sending any of it
+        view = memoryview(self.rbuf)
+        try:
+            got = sockObj.recv_into(view[:HEADER_SIZE])
+        except (ConnectionResetError, ConnectionAbortedError):
+            got = 0
+        if not got:
+            return None
+
+        try:
+            recvExactInto(sockObj, view[got:HEADER_SIZE])
+            size = HEADER_SIZE + Frame.HDR.unpack_from(view)[1]
+            if size > len(view):
+                # Older frames may still view the old buffer, so replace rather than resize it
+                self.rbuf = bytearray(size)
+                self.rbuf[:HEADER_SIZE] = view[:HEADER_SIZE]
+                view = memoryview(self.rbuf)
+            recvExactInto(sockObj, view[HEADER_SIZE:size])
+        except (ConnectionError, OSError) as exc:
+            self.close()
+            raise ConnectionError(f"connection lost mid-response: {exc}") from exc
+        return Frame(view[:size])
+
+    def exchange(self, reqFrame: bytes, payload: bytes = b"") -> Frame:
+        # Send one frame (or header + payload, gathered), return the response;
+        # retry once on a fresh socket if the reused one was stale
+        for _ in range(2):
+            fresh = self.sock is None
+            if not fresh and self.peerClosed():
+                self.close()
+                fresh = True
+            sockObj = self.connect()
+
+            try:
+                sendParts(sockObj, reqFrame, payload)
+                resp = self.readResp(sockObj)
+            except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError):
+                resp = None
+            except OSError:
+                self.close()
+                raise
+
+            if resp is None:
+                # Closed before any reply byte: the server never saw this request
+                self.close()
+                if fresh:
+                    raise ConnectionError("socket closed before response")
+                continue
+
+            if not fresh:
+                self.keepAlive = True
+            self.lastErr = errorCode(resp)
+            return resp
+
+        raise ConnectionError("socket closed before response")
+
+    def request(self, protoId: bytes, msgType: int, payload: bytes) -> Frame:
+        packHeader(self.hbuf, 0, protoId, msgType, payload)
+        print("=== SEND ===")
+        printRequest(self.hbuf, payload)
+
+        recvFrame = self.exchange(self.hbuf, payload)
+        print("=== RECV ===")
+        printFrame(recvFrame, "recv")
+        return recvFrame
+
+    def pump(self, reqFrames: Iterable[bytes], window: int = PIPE_WINDOW) -> Iterator[Frame]:
+        # Responses (each valid until the next) for a lazy frame stream, window in flight; no other requests until done
+        frames = iter(reqFrames)
+        pending: Deque[bytes] = deque()  # sent (or about to be), not yet answered
+        try:
+            while True:
+                if not pending:
+                    nxt = next(frames, None)
+                    if nxt is None:
+                        return
+                    pending.append(nxt)
+
+                if window <= 1 or not self.keepAlive:
+                    resp = self.exchange(pending[0])
+                    pending.popleft()
+                    yield resp
+                    continue
+
+                if self.sock is not None and self.peerClosed():
+                    self.close()
+                sockObj = self.connect()
+
+                while len(pending) < window:
+                    nxt = next(frames, None)
+                    if nxt is None:
+                        break
+                    pending.append(nxt)
+
+                try:
+                    sockObj.sendall(b"".join(pending))
+                    while pending:
+                        resp = self.readResp(sockObj)
+                        if resp is None:
+                            break
+                        pending.popleft()
+                        yield resp
+                        nxt = next(frames, None)
+                        if nxt is not None:
+                            pending.append(nxt)
+                            sockObj.sendall(nxt)
+                except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError):
+                    pass
+
+                if pending:
+                    # Server dropped the connection with requests outstanding
+                    self.close()
+                    self.keepAlive = False
+        finally:
+            if pending:
+                # Abandoned or failed mid-stream: late replies would desync the socket
+                self.close()
+
+    def pipeline(self, reqs: List[Req], window: int = PIPE_WINDOW) -> List[Frame]:
+        # Independent requests with up to window frames in flight; responses come back in order
+        reqFrames = [buildFrame(protoId, msgType, payload) for protoId, msgType, payload in reqs]
+        for reqFrame, (_, _, payload) in zip(reqFrames, reqs):
+            print("=== SEND ===")
+            printRequest(reqFrame, payload)
+
+        recvFrames = [resp.copy() for resp in self.pump(reqFrames, window)]
+        for recvFrame in recvFrames:
+            print("=== RECV ===")
+            printFrame(recvFrame, "recv")
+        return recvFrames
+
+    def handshake(self, supportedHashes: str) -> Frame:
+        return self.request(*handshakeReq(supportedHashes))
+
+    def login(self, user: str, password: str) -> Optional[bytes]:
+        frame = self.request(*loginReq(user, password))
+        token = loginToken(frame)
+        if token:
+            print(f"[login] token={token.hex()}")
+        return token
+
+    def setCfg(self, token: bytes, key: str, value: str) -> Frame:
+        return self.request(*setCfgReq(token, key, value))
+
+    def getCfg(self, token: bytes, key: str) -> Frame:
+        return self.request(*getCfgReq(token, key))
+
+    def elevate(self, token: bytes, requestText: str) -> Frame:
+        return self.request(*elevateReq(token, requestText))
+
+    def bcRts(self, token: bytes, dataSize: int) -> Frame:
+        return self.request(*bcRtsReq(token, dataSize))
+
+    def bcData(self, token: bytes, chunkBytes: bytes) -> Frame:
+        return self.request(*bcDataReq(token, chunkBytes))
+
+    def bcSend(self, token: bytes, chunkBytes: bytes) -> int:
+        rtsFrame = self.bcRts(token, len(chunkBytes))
+        if not (rtsFrame["protoId"] == PROTO_BC and rtsFrame["msgType"] == MSG_BC_CTS and len(rtsFrame["payload"]) >= 1):
+            print("[bcsend] RTS failed")
+            return 1
+        if rtsFrame["payload"][0] != 1:
+            print("[bcsend] RTS denied")
+            return 1
+
+        dataFrame = self.bcData(token, chunkBytes)
+        if dataFrame["protoId"] == PROTO_BC and dataFrame["msgType"] == MSG_BC_ACK and len(dataFrame["payload"]) == 0:
+            return 0
+
+        print("[bcsend] DATA failed")
         return 1
 
-    dataFrame = doBcData(host, port, timeout, token, chunkBytes)
-    if dataFrame["protoId"] == PROTO_BC and dataFrame["msgType"] == MSG_BC_ACK and len(dataFrame["payload"]) == 0:
-        return 0
+    def bcUpload(self, token: bytes, source: Source, total: Optional[int] = None, segSize: int = 0,
+                 chunkSize: int = BC_CHUNK_DEFAULT, window: int = PIPE_WINDOW) -> dict:
+        # Stream source as DataPackets in RTS segments of segSize bytes (0: one RTS); RuntimeError on a deny/NAK
+        if not 0 < chunkSize <= 1024:
+            raise ValueError("chunk size must be in range [1, 1024]")
+        if total is None:
+            total = sourceSize(source)
+        if total is None:
+            raise ValueError("total size is required for iterator sources")
+
+        chunks = iterChunks(source, chunkSize)
+        carry: Optional[memoryview] = None
+        streamHash = hashlib.md5()
+        sent = 0
+        segs = 0
+        nChunks = 0
+
+        def segFrames(segLen: int) -> Iterator[bytes]:
+            # DataPackets for one segment; a chunk straddling the boundary is split, not copied
+            nonlocal carry, nChunks
+            while segLen > 0:
+                chunk = carry if carry is not None else next(chunks, None)
+                carry = None
+                if chunk is None:
+                    raise ValueError(f"source ended {segLen} bytes short of the announced size")
+                if len(chunk) > segLen:
+                    carry = chunk[segLen:]
+                    chunk = chunk[:segLen]
+                segLen -= len(chunk)
+                streamHash.update(chunk)
+                nChunks += 1
+                yield buildFrame(*bcDataReq(token, chunk))
+
+        t0 = time.perf_counter()
+        try:
+            while sent < total:
+                segLen = min(segSize or total, total - sent)
+                rtsProto, rtsType, rtsPayload = bcRtsReq(token, segLen)
+                packHeader(self.hbuf, 0, rtsProto, rtsType, rtsPayload)
+                ctsFrame = self.exchange(self.hbuf, rtsPayload)
+                if not (ctsFrame["protoId"] == PROTO_BC and ctsFrame["msgType"] == MSG_BC_CTS
+                        and len(ctsFrame["payload"]) >= 1 and ctsFrame["payload"][0] == 1):
+                    raise RuntimeError(f"RTS for {segLen} bytes denied: {decodeError(ctsFrame) or 'no CTS'}")
+                segs += 1
+
+                acks = self.pump(segFrames(segLen), window)
+                try:
+                    for ackFrame in acks:
+                        if not (ackFrame["protoId"] == PROTO_BC and ackFrame["msgType"] == MSG_BC_ACK
+                                and len(ackFrame["payload"]) == 0):
+                            raise RuntimeError(f"DataPacket rejected: {decodeError(ackFrame) or 'no ACK'}")
+                finally:
+                    acks.close()
+                sent += segLen
+        finally:
+            chunks.close()
+        elapsed = time.perf_counter() - t0
+
+        return {
+            "bytes": sent,
+            "chunks": nChunks,
+            "segments": segs,
+            "seconds": elapsed,
+            "mbps": sent / elapsed / 1e6 if elapsed else 0.0,
+            "md5": streamHash.hexdigest(),
+        }
+
+    def exec(self, token: bytes, command: str) -> Frame:
+        return self.request(*execReq(token, command))
+
+    def logout(self, token: bytes) -> Frame:
+        return self.request(*logoutReq(token))
+
+
+# One-shot helpers: a short-lived session per call
+
+
+def doHandshake(host: str, port: int, timeout: float, supportedHashes: str) -> Frame:
+    with LichSession(host, port, timeout) as conn:
+        return conn.handshake(supportedHashes)
+
 
-    print("[bcsend] DATA failed")
-    return 1
+def doLogin(host: str, port: int, timeout: float, user: str, password: str) -> Optional[bytes]:
+    with LichSession(host, port, timeout) as conn:
+        return conn.login(user, password)
 
 
-def doExec(host: str, port: int, timeout: float, token: bytes, command: str) -> dict:
-    payload = command.encode("utf-8") + b"\x00" + token
-    frame = requestFrame(host, port, timeout, PROTO_UW, MSG_UW_EXEC, payload)
-    return frame
+def doSetCfg(host: str, port: int, timeout: float, token: bytes, key: str, value: str) -> Frame:
+    with LichSession(host, port, timeout) as conn:
+        return conn.setCfg(token, key, value)
+
+
+def doGetCfg(host: str, port: int, timeout: float, token: bytes, key: str) -> Frame:
+    with LichSession(host, port, timeout) as conn:
+        return conn.getCfg(token, key)
+
+
+def doElevate(host: str, port: int, timeout: float, token: bytes, requestText: str) -> Frame:
+    with LichSession(host, port, timeout) as conn:
+        return conn.elevate(token, requestText)
+
+
+def doBcRts(host: str, port: int, timeout: float, token: bytes, dataSize: int) -> Frame:
+    with LichSession(host, port, timeout) as conn:
+        return conn.bcRts(token, dataSize)
+
+
+def doBcData(host: str, port: int, timeout: float, token: bytes, chunkBytes: bytes) -> Frame:
+    with LichSession(host, port, timeout) as conn:
+        return conn.bcData(token, chunkBytes)
 
 
-def doLogout(host: str, port: int, timeout: float, token: bytes) -> dict:
-    frame = requestFrame(host, port, timeout, PROTO_ER, MSG_ER_REQ, token)
-    return frame
+def doBcSend(host: str, port: int, timeout: float, token: bytes, chunkBytes: bytes) -> int:
+    with LichSession(host, port, timeout) as conn:
+        return conn.bcSend(token, chunkBytes)
+
+
+def doExec(host: str, port: int, timeout: float, token: bytes, command: str) -> Frame:
+    with LichSession(host, port, timeout) as conn:
+        return conn.exec(token, command)
+
+
+def doLogout(host: str, port: int, timeout: float, token: bytes) -> Frame:
+    with LichSession(host, port, timeout) as conn:
+        return conn.logout(token)
+
+
+class TokenCache:
+    # JSON file of {host:port:user: {token, elevated, issued}} kept between CLI runs
+
+    def __init__(self, path: str = TOKEN_CACHE) -> None:
+        self.path = path
+        self.entries: Dict[str, dict] = self.load()
+
+    @staticmethod
+    def key(host: str, port: int, user: str) -> str:
+        return f"{host}:{port}:{user}"
+
+    def load(self) -> Dict[str, dict]:
+        # A missing or corrupt cache is simply empty
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def save(self) -> None:
+        # Atomic replace; tokens are credentials, so the file is private to the user
+        tmpPath = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmpPath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmpPath, self.path)
+
+    def get(self, host: str, port: int, user: str) -> Optional[dict]:
+        ent = self.entries.get(self.key(host, port, user))
+        try:
+            parseToken(ent["token"])
+        except (TypeError, KeyError, ValueError):
+            return None
+        return ent
+
+    def put(self, host: str, port: int, user: str, token: bytes, elevated: bool = False,
+            issued: Optional[float] = None) -> None:
+        self.entries[self.key(host, port, user)] = {
+            "token": token.hex(),
+            "elevated": elevated,
+            "issued": time.time() if issued is None else issued,
+        }
+        self.save()
+
+    def drop(self, host: str, port: int, user: str) -> None:
+        if self.entries.pop(self.key(host, port, user), None) is not None:
+            self.save()
+
+
+def freshToken(conn: LichSession, cache: Optional[TokenCache], user: str, password: Optional[str],
+               elevate: bool = False) -> bytes:
+    # Handshake + login (+ elevate, best effort); remember the token if there is a cache
+    if password is None:
+        raise ValueError(f"no cached token for {user}: --password is required to log in")
+    conn.handshake("Blake3,MD5")
+    token = conn.login(user, password)
+    if not token:
+        raise RuntimeError(f"login failed for {user}")
+    if elevate:
+        elevate = loginToken(conn.elevate(token, "elevateRequest")) is not None
+        print(f"[cache] re-elevation {'ok' if elevate else 'failed'}")
+    if cache is not None:
+        cache.put(conn.host, conn.port, user, token, elevate)
+    return token
+
+
+def tokenAlive(conn: LichSession, token: bytes) -> bool:
+    # Cheap GetConfig probe: only a token error means the token itself is dead
+    conn.lastErr = None
+    try:
+        conn.getCfg(token, TOKEN_PROBE_KEY)
+    except RuntimeError:
+        pass
+    return conn.lastErr not in (TOKEN_EXP_ERR, TOKEN_UNAUTH_ERR)
+
+
+def cachedCall(conn: LichSession, cache: TokenCache, user: str, password: Optional[str],
+               op: Callable[[bytes], T]) -> T:
+    # Run op with the cached token; log in again once if there is none or it turns out to be dead
+    ent = cache.get(conn.host, conn.port, user)
+    if ent is not None:
+        print(f"[cache] token={ent['token']} elevated={ent['elevated']} age={time.time() - ent['issued']:.0f}s")
+        token = bytes.fromhex(ent["token"])
+        conn.lastErr = None
+        failure: Optional[RuntimeError] = None
+        result = None
+        try:
+            result = op(token)
+        except RuntimeError as e:
+            failure = e
+        err = conn.lastErr
+        if err == TOKEN_UNAUTH_ERR and isinstance(result, Frame):
+            # The probe reply reuses the receive buffer the frame views
+            result = result.copy()
+
+        if err not in (TOKEN_EXP_ERR, TOKEN_UNAUTH_ERR) or (err == TOKEN_UNAUTH_ERR and tokenAlive(conn, token)):
+            # Success, an unrelated error, or a real denial for a token that still works
+            conn.lastErr = err
+            if failure is not None:
+                raise failure
+            return result
+        print(f"[cache] token rejected ({ERR_MAP[err]}), logging in again")
+        cache.drop(conn.host, conn.port, user)
+
+    token = freshToken(conn, cache, user, password, bool(ent and ent["elevated"]))
+    return op(token)
 
 
 def printSessionHelp() -> None:
@@ -417,11 +1021,14 @@ def runSession(host: str, port: int, timeout: float, user: str, password: str) -
     print("interactive session mode")
     printSessionHelp()
 
+    conn = LichSession(host, port, timeout)
+
     while True:
         try:
             line = input("lich> ").strip()
         except (EOFError, KeyboardInterrupt):
             print()
+            conn.close()
             return 0
 
         if not line:
@@ -437,6 +1044,7 @@ def runSession(host: str, port: int, timeout: float, user: str, password: str) -
 
         try:
             if cmd in ("quit", "exit"):
+                conn.close()
                 return 0
 
             if cmd == "help":
@@ -462,7 +1070,7 @@ def runSession(host: str, port: int, timeout: float, user: str, password: str) -
 
             if cmd == "handshake":
                 supported = parts[1] if len(parts) > 1 else "Blake3,MD5"
-                doHandshake(host, port, timeout, supported)
+                conn.handshake(supported)
                 continue
 
             if cmd == "login":
@@ -475,7 +1083,7 @@ def runSession(host: str, port: int, timeout: float, user: str, password: str) -
                     print("usage: login <user> <password>")
                     continue
 
-                tok = doLogin(host, port, timeout, sess["user"], sess["password"])
+                tok = conn.login(sess["user"], sess["password"])
                 if tok:
                     sess["token"] = tok
                 continue
@@ -487,7 +1095,7 @@ def runSession(host: str, port: int, timeout: float, user: str, password: str) -
                 if not sess["token"]:
                     print("token not set; login first")
                     continue
-                doGetCfg(host, port, timeout, sess["token"], parts[1])
+                conn.getCfg(sess["token"], parts[1])
                 continue
 
             if cmd == "bcrts":
@@ -497,7 +1105,7 @@ def runSession(host: str, port: int, timeout: float, user: str, password: str) -
                 if not sess["token"]:
                     print("token not set; login first")
                     continue
-                doBcRts(host, port, timeout, sess["token"], int(parts[1]))
+                conn.bcRts(sess["token"], int(parts[1]))
                 continue
 
             if cmd == "bcdata":
@@ -508,7 +1116,7 @@ def runSession(host: str, port: int, timeout: float, user: str, password: str) -
                     print("token not set; login first")
                     continue
                 chunkBytes = " ".join(parts[1:]).encode("utf-8")
-                doBcData(host, port, timeout, sess["token"], chunkBytes)
+                conn.bcData(sess["token"], chunkBytes)
                 continue
 
             if cmd == "bcdatahex":
@@ -519,7 +1127,7 @@ def runSession(host: str, port: int, timeout: float, user: str, password: str) -
                     print("token not set; login first")
                     continue
                 chunkBytes = bytes.fromhex(parts[1])
-                doBcData(host, port, timeout, sess["token"], chunkBytes)
+                conn.bcData(sess["token"], chunkBytes)
                 continue
 
             if cmd == "bcsend":
@@ -530,7 +1138,7 @@ def runSession(host: str, port: int, timeout: float, user: str, password: str) -
                     print("token not set; login first")
                     continue
                 chunkBytes = " ".join(parts[1:]).encode("utf-8")
-                doBcSend(host, port, timeout, sess["token"], chunkBytes)
+                conn.bcSend(sess["token"], chunkBytes)
                 continue
 
             if cmd == "bcsendhex":
@@ -541,7 +1149,7 @@ def runSession(host: str, port: int, timeout: float, user: str, password: str) -
                     print("token not set; login first")
                     continue
                 chunkBytes = bytes.fromhex(parts[1])
-                doBcSend(host, port, timeout, sess["token"], chunkBytes)
+                conn.bcSend(sess["token"], chunkBytes)
                 continue
 
             if cmd == "set":
@@ -553,7 +1161,7 @@ def runSession(host: str, port: int, timeout: float, user: str, password: str) -
                     continue
                 key = parts[1]
                 value = " ".join(parts[2:])
-                doSetCfg(host, port, timeout, sess["token"], key, value)
+                conn.setCfg(sess["token"], key, value)
                 continue
 
             if cmd == "elevate":
@@ -561,7 +1169,7 @@ def runSession(host: str, port: int, timeout: float, user: str, password: str) -
                     print("token not set; login first")
                     continue
                 requestText = parts[1] if len(parts) > 1 else "elevateRequest"
-                frame = doElevate(host, port, timeout, sess["token"], requestText)
+                frame = conn.elevate(sess["token"], requestText)
                 if frame["protoId"] == PROTO_SB and frame["msgType"] == MSG_SB_RESP and len(frame["payload"]) >= 18 and frame["payload"][0] == 1:
                     sess["token"] = frame["payload"][1:17]
                     print(f"elevated token={sess['token'].hex()}")
@@ -575,14 +1183,14 @@ def runSession(host: str, port: int, timeout: float, user: str, password: str) -
                     print("token not set; login first")
                     continue
                 command = " ".join(parts[1:])
-                doExec(host, port, timeout, sess["token"], command)
+                conn.exec(sess["token"], command)
                 continue
 
             if cmd == "logout":
                 if not sess["token"]:
                     print("token not set; login first")
                     continue
-                doLogout(host, port, timeout, sess["token"])
+                conn.logout(sess["token"])
                 sess["token"] = None
                 print("token cleared")
                 continue
@@ -593,51 +1201,111 @@ def runSession(host: str, port: int, timeout: float, user: str, password: str) -
             print(f"error: {exc}")
 
 
-def runFlow(host: str, port: int, timeout: float, user: str, password: str, maxPayload: int, command: str) -> int:
-    print("[flow] handshake")
-    hsFrame = doHandshake(host, port, timeout, "Blake3,MD5")
-    if not (hsFrame["protoId"] == PROTO_AR and hsFrame["msgType"] == MSG_ARISE_RESP):
-        print("[flow] handshake failed")
-        return 1
-
-    print("[flow] login")
-    token = doLogin(host, port, timeout, user, password)
-    if not token:
-        print("[flow] login failed")
-        return 1
-
-    print("[flow] set EleEnabled=True")
-    doSetCfg(host, port, timeout, token, "EleEnabled", "True")
-
-    print("[flow] elevate")
-    elevFrame = doElevate(host, port, timeout, token, "elevateRequest")
-    if elevFrame["protoId"] == PROTO_SB and elevFrame["msgType"] == MSG_SB_RESP and len(elevFrame["payload"]) >= 18 and elevFrame["payload"][0] == 1:
-        token = elevFrame["payload"][1:17]
+def runFlow(host: str, port: int, timeout: float, user: str, password: str, maxPayload: int, command: str,
+            window: int = PIPE_WINDOW) -> int:
+    with LichSession(host, port, timeout) as conn:
+        print("[flow] handshake")
+        hsFrame = conn.handshake("Blake3,MD5")
+        if not (hsFrame["protoId"] == PROTO_AR and hsFrame["msgType"] == MSG_ARISE_RESP):
+            print("[flow] handshake failed")
+            return 1
+
+        print("[flow] login")
+        token = conn.login(user, password)
+        if not token:
+            print("[flow] login failed")
+            return 1
+
+        print("[flow] set EleEnabled=True")
+        conn.setCfg(token, "EleEnabled", "True")
+
+        print("[flow] elevate")
+        token = loginToken(conn.elevate(token, "elevateRequest"))
+        if not token:
+            print("[flow] elevate failed")
+            return 1
         print(f"[flow] elevated token={token.hex()}")
-    else:
-        print("[flow] elevate failed")
-        return 1
 
-    print(f"[flow] set maxPayload={maxPayload}")
-    doSetCfg(host, port, timeout, token, "maxPayload", str(maxPayload))
+        # The rest of the chain only needs the elevated token: pipeline it
+        print(f"[flow] set maxPayload={maxPayload}, set EnCmdExec=True, exec command, logout (window={window})")
+        conn.pipeline([
+            setCfgReq(token, "maxPayload", str(maxPayload)),
+            setCfgReq(token, "EnCmdExec", "True"),
+            execReq(token, command),
+            logoutReq(token),
+        ], window)
 
-    print("[flow] set EnCmdExec=True")
-    doSetCfg(host, port, timeout, token, "EnCmdExec", "True")
-
-    print("[flow] exec command")
-    doExec(host, port, timeout, token, command)
+        print(f"[flow] connections={conn.connects}")
+        return 0
 
-    print("[flow] logout")
-    doLogout(host, port, timeout, token)
 
+def tokenOp(conn: LichSession, args: argparse.Namespace) -> Callable[[bytes], object]:
+    # The selected token subcommand, as a function of the token it runs with
+    if args.cmd == "get":
+        return lambda token: conn.getCfg(token, args.key)
+    if args.cmd == "set":
+        return lambda token: conn.setCfg(token, args.key, args.value)
+    if args.cmd == "elevate":
+        return lambda token: conn.elevate(token, args.request)
+    if args.cmd == "bcrts":
+        return lambda token: conn.bcRts(token, args.size)
+    if args.cmd in ("bcdata", "bcsend"):
+        chunkBytes = parseChunkBytes(args.text, args.hex)
+        if args.cmd == "bcdata":
+            return lambda token: conn.bcData(token, chunkBytes)
+        return lambda token: conn.bcSend(token, chunkBytes)
+    if args.cmd == "bcupload":
+        source = sys.stdin.buffer if args.file == "-" else args.file
+        return lambda token: conn.bcUpload(token, source, args.size, args.segment, args.chunk_size, args.window)
+    if args.cmd == "exec":
+        return lambda token: conn.exec(token, args.command)
+    if args.cmd == "logout":
+        return lambda token: conn.logout(token)
+    raise ValueError(f"not a token command: {args.cmd}")
+
+
+def runTokenCmd(host: str, port: int, timeout: float, args: argparse.Namespace) -> int:
+    # Token subcommands: explicit --token, or the cached token for --user (logging in when needed)
+    if not args.token and not args.user:
+        raise ValueError("--token or --user is required")
+    cache = None if args.token or args.no_cache else TokenCache(args.cache)
+
+    with LichSession(host, port, timeout) as conn:
+        op = tokenOp(conn, args)
+        if args.token:
+            result = op(parseToken(args.token))
+        elif cache is None:
+            result = op(freshToken(conn, None, args.user, args.password))
+        else:
+            result = cachedCall(conn, cache, args.user, args.password, op)
+
+    if cache is not None and args.cmd == "elevate" and loginToken(result) is not None:
+        ent = cache.get(host, port, args.user)
+        cache.put(host, port, args.user, loginToken(result), True, ent["issued"] if ent else None)
+    if cache is not None and args.cmd == "logout":
+        cache.drop(host, port, args.user)
+
+    if args.cmd == "bcsend":
+        return result
+    if args.cmd == "bcupload":
+        print(f"[bcupload] {result['bytes']} bytes, {result['chunks']} chunks, {result['segments']} RTS, "
+              f"{result['seconds']:.2f}s, {result['mbps']:.2f} MB/s, md5={result['md5']}, connects={conn.connects}")
     return 0
 
 
+def addTokenArgs(sp: argparse.ArgumentParser) -> None:
+    sp.add_argument("--token", help="hex token from login")
+    sp.add_argument("--user", help="use the cached token for this user instead of --token")
+    sp.add_argument("--password", help="log in with this password when no cached token is valid")
+
+
 def buildParser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Lich protocol test client")
     parser.add_argument("--host", default="127.0.0.1", help="Server host (default: 127.0.0.1)")
     parser.add_argument("--port", type=int, default=9001, help="Server port (default: 9001)")
     parser.add_argument("--timeout", type=float, default=5.0, help="Socket timeout seconds")
+    parser.add_argument("--cache", default=TOKEN_CACHE, help=f"Token cache file (default: {TOKEN_CACHE})")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the token cache")
 
     subParsers = parser.add_subparsers(dest="cmd", required=True)
 
@@ -649,46 +1317,58 @@ def buildParser() -> argparse.ArgumentParser:
     sp.add_argument("--password", required=True)
 
     sp = subParsers.add_parser("get", help="NecroticWeave GetConfig")
-    sp.add_argument("--token", required=True, help="hex token from login")
+    addTokenArgs(sp)
     sp.add_argument("--key", required=True)
 
     sp = subParsers.add_parser("set", help="NecroticWeave SetConfig")
-    sp.add_argument("--token", required=True, help="hex token from login")
+    addTokenArgs(sp)
     sp.add_argument("--key", required=True)
     sp.add_argument("--value", required=True)
 
     sp = subParsers.add_parser("elevate", help="SoulBind elevate")
-    sp.add_argument("--token", required=True, help="hex token from login")
+    addTokenArgs(sp)
     sp.add_argument("--request", default="elevateRequest")
 
     sp = subParsers.add_parser("bcrts", help="BoneCourier RTS")
-    sp.add_argument("--token", required=True, help="hex token from login")
+    addTokenArgs(sp)
     sp.add_argument("--size", type=int, required=True, help="total transfer size")
 
     sp = subParsers.add_parser("bcdata", help="BoneCourier DATA")
-    sp.add_argument("--token", required=True, help="hex token from login")
+    addTokenArgs(sp)
     grp = sp.add_mutually_exclusive_group(required=True)
     grp.add_argument("--text", help="chunk text to send")
     grp.add_argument("--hex", help="chunk bytes in hex")
 
     sp = subParsers.add_parser("bcsend", help="BoneCourier RTS + DATA helper")
-    sp.add_argument("--token", required=True, help="hex token from login")
+    addTokenArgs(sp)
     grp = sp.add_mutually_exclusive_group(required=True)
     grp.add_argument("--text", help="chunk text to send")
     grp.add_argument("--hex", help="chunk bytes in hex")
 
+    sp = subParsers.add_parser("bcupload", help="BoneCourier streaming upload of a file")
+    addTokenArgs(sp)
+    sp.add_argument("--file", required=True, help="file to send, '-' for stdin (needs --size)")
+    sp.add_argument("--size", type=int, help="bytes to send (default: file size)")
+    sp.add_argument("--chunk-size", type=int, default=BC_CHUNK_DEFAULT,
+                    help=f"DataPacket data bytes, up to 1024; each packet adds 32 bytes, so raise the server's "
+                         f"maxPayload before going above {BC_CHUNK_DEFAULT} (default: {BC_CHUNK_DEFAULT})")
+    sp.add_argument("--segment", type=int, default=0, help="bytes per RTS, 0 = one RTS (default: 0)")
+    sp.add_argument("--window", type=int, default=PIPE_WINDOW, help=f"DataPackets in flight (default: {PIPE_WINDOW})")
+
     sp = subParsers.add_parser("exec", help="UndeadWhisper exec")
-    sp.add_argument("--token", required=True, help="hex token")
+    addTokenArgs(sp)
     sp.add_argument("--command", required=True)
 
     sp = subParsers.add_parser("logout", help="EternalRest")
-    sp.add_argument("--token", required=True, help="hex token")
+    addTokenArgs(sp)
 
     sp = subParsers.add_parser("flow", help="End-to-end test flow")
     sp.add_argument("--user", required=True)
     sp.add_argument("--password", required=True)
     sp.add_argument("--max-payload", type=int, default=512)
     sp.add_argument("--command", default="id")
+    sp.add_argument("--window", type=int, default=PIPE_WINDOW,
+                    help=f"max pipelined requests in flight, 1 = lockstep (default: {PIPE_WINDOW})")
 
     sp = subParsers.add_parser("session", help="Interactive session mode")
     sp.add_argument("--user", default="")
@@ -711,43 +1391,15 @@ def main() -> int:
 
         if args.cmd == "login":
             token = doLogin(host, port, timeout, args.user, args.password)
+            if token and not args.no_cache:
+                TokenCache(args.cache).put(host, port, args.user, token)
             return 0 if token else 1
 
-        if args.cmd == "get":
-            doGetCfg(host, port, timeout, parseToken(args.token), args.key)
-            return 0
-
-        if args.cmd == "set":
-            doSetCfg(host, port, timeout, parseToken(args.token), args.key, args.value)
-            return 0
-
-        if args.cmd == "elevate":
-            doElevate(host, port, timeout, parseToken(args.token), args.request)
-            return 0
-
-        if args.cmd == "bcrts":
-            doBcRts(host, port, timeout, parseToken(args.token), args.size)
-            return 0
-
-        if args.cmd == "bcdata":
-            chunkBytes = parseChunkBytes(args.text, args.hex)
-            doBcData(host, port, timeout, parseToken(args.token), chunkBytes)
-            return 0
-
-        if args.cmd == "bcsend":
-            chunkBytes = parseChunkBytes(args.text, args.hex)
-            return doBcSend(host, port, timeout, parseToken(args.token), chunkBytes)
-
-        if args.cmd == "exec":
-            doExec(host, port, timeout, parseToken(args.token), args.command)
-            return 0
-
-        if args.cmd == "logout":
-            doLogout(host, port, timeout, parseToken(args.token))
-            return 0
+        if args.cmd in TOKEN_CMDS:
+            return runTokenCmd(host, port, timeout, args)
 
         if args.cmd == "flow":
-            return runFlow(host, port, timeout, args.user, args.password, args.max_payload, args.command)
+            return runFlow(host, port, timeout, args.user, args.password, args.max_payload, args.command, args.window)
 
         if args.cmd == "session":
             return runSession(host, port, timeout, args.user, args.password)
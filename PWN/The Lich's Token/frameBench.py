@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Frame encoder microbenchmark: frames/second for the old concatenating buildFrame
+versus the precompiled-struct encoders, in memory and over a local socket pair.
+
+Examples:
+  python frameBench.py
+  python frameBench.py --sizes 0,256,1024 --count 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import socket
+import struct
+import threading
+import time
+from typing import Callable, List
+
+from client import (
+    HEADER_SIZE,
+    MAGIC,
+    PROTO_AR,
+    PROTO_BC,
+    VERSION,
+    ZERO_MAGIC,
+    buildFrame,
+    hashPayload,
+    packHeader,
+    sendFrame,
+)
+
+
+def legacyBuildFrame(protoId: bytes, msgType: int, payload: bytes) -> bytes:
+    # The original encoder: six concatenations plus a length check
+    if len(protoId) != 2:
+        raise ValueError("protoId must be 2 bytes")
+
+    magicBytes = ZERO_MAGIC if protoId == PROTO_AR else MAGIC
+    payloadHash = hashPayload(protoId, payload)
+
+    header = (
+        protoId
+        + bytes([msgType])
+        + struct.pack("<I", len(payload))
+        + magicBytes
+        + bytes([VERSION])
+        + payloadHash
+    )
+
+    if len(header) != HEADER_SIZE:
+        raise RuntimeError(f"header size mismatch: {len(header)}")
+
+    return header + payload
+
+
+def rate(fn: Callable[[], None], count: int) -> float:
+    # Calls per second of fn over count calls
+    t0 = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return count / (time.perf_counter() - t0)
+
+
+def drain(sockObj: socket.socket, total: int) -> None:
+    # Reader side of the socket benchmark
+    buf = bytearray(1 << 16)
+    got = 0
+    while got < total:
+        n = sockObj.recv_into(buf)
+        if not n:
+            return
+        got += n
+
+
+def socketRate(send: Callable[[socket.socket], None], frameLen: int, count: int) -> float:
+    # Frames per second pushed through a local socket pair by send
+    tx, rx = socket.socketpair()
+    reader = threading.Thread(target=drain, args=(rx, frameLen * count), daemon=True)
+    reader.start()
+    try:
+        t0 = time.perf_counter()
+        for _ in range(count):
+            send(tx)
+        reader.join()
+        return count / (time.perf_counter() - t0)
+    finally:
+        tx.close()
+        rx.close()
+
+
+def benchSize(protoId: bytes, size: int, count: int) -> List[str]:
+    payload = bytes(range(256)) * (size // 256) + bytes(size % 256)
+    if legacyBuildFrame(protoId, 0x22, payload) != buildFrame(protoId, 0x22, payload):
+        raise RuntimeError("encoders disagree")
+
+    hdrBuf = bytearray(HEADER_SIZE)
+    frameLen = HEADER_SIZE + size
+    results = [
+        rate(lambda: legacyBuildFrame(protoId, 0x22, payload), count),
+        rate(lambda: buildFrame(protoId, 0x22, payload), count),
+        rate(lambda: packHeader(hdrBuf, 0, protoId, 0x22, payload), count),
+        socketRate(lambda s: s.sendall(legacyBuildFrame(protoId, 0x22, payload)), frameLen, count),
+        socketRate(lambda s: sendFrame(s, protoId, 0x22, payload, hdrBuf), frameLen, count),
+    ]
+    return [f"{r / 1000:>9.0f}k" for r in results]
+
+
+def buildParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Lich frame encoder microbenchmark")
+    parser.add_argument("--sizes", default="0,64,1024,16384", help="Comma-separated payload sizes")
+    parser.add_argument("--count", type=int, default=50000, help="Frames per measurement")
+    return parser
+
+
+def main() -> int:
+    args = buildParser().parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    print(f"{'proto':<6} {'size':>6} {'legacy':>10} {'build':>10} {'packInto':>10} {'sendall':>10} {'sendmsg':>10}")
+    for protoId in (PROTO_AR, PROTO_BC):
+        for size in sizes:
+            try:
+                cols = benchSize(protoId, size, args.count)
+            except RuntimeError as exc:
+                print(f"{protoId.decode():<6} {size:>6} skipped: {exc}")
+                continue
+            print(f"{protoId.decode():<6} {size:>6} " + " ".join(cols))
+    print("frames/s; legacy/build/packInto in memory, sendall(legacy)/sendmsg(sendFrame) over a socket pair")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Lich protocol load benchmark: replays a weighted message mix from processes x asyncio
+tasks and reports throughput plus p50/p95/p99 latency per message type.
+
+Each task keeps one session (handshake + login, optionally elevate) and then picks
+messages from the mix until the duration or request budget runs out. A logout in the
+mix is followed by a fresh handshake + login. Usernames must stay unique per task,
+since a second login for the same user ends the first session.
+
+Examples:
+  python lichBench.py --procs 4 --tasks 16 --duration 10 --json bench.json
+  python lichBench.py --port 9002 --mix getCfg=6,bcSend=2,exec=1,logout=1 --elevate
+  python lichServer.py 9001 --config maxSess=100   # local stand-in target
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from asyncClient import AsyncLichSession, latencyReport, printReport
+from client import loginReq
+
+MIX_NAMES = ("handshake", "login", "elevate", "getCfg", "setCfg", "exec", "bcSend", "logout")
+DEFAULT_MIX = "handshake=1,getCfg=4,setCfg=1,exec=1,bcSend=2,logout=1"
+
+
+def parseMix(text: str) -> List[Tuple[str, float]]:
+    # "name=weight,..." -> [(name, weight)] with positive weights
+    mix = []
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        name, sep, weight = item.partition("=")
+        name = name.strip()
+        if name not in MIX_NAMES:
+            raise ValueError(f"unknown message type in mix: {name} (choose from {', '.join(MIX_NAMES)})")
+        w = float(weight) if sep else 1.0
+        if w > 0:
+            mix.append((name, w))
+    if not mix:
+        raise ValueError("empty message mix")
+    return mix
+
+
+class BenchTask:
+    """One task's session plus the mix it replays."""
+
+    def __init__(self, conn: AsyncLichSession, user: str, password: str, elevate: bool,
+                 command: str, chunk: bytes) -> None:
+        self.conn = conn
+        self.user = user
+        self.password = password
+        self.elevate = elevate
+        self.command = command
+        self.chunk = chunk
+        self.token: Optional[bytes] = None
+
+    async def setup(self) -> None:
+        await self.conn.handshake()
+        self.token = await self.conn.login(self.user, self.password)
+        if not self.token:
+            raise RuntimeError(f"login failed for {self.user}")
+        if self.elevate:
+            await self.conn.setCfg(self.token, "EleEnabled", "True")
+            await self.conn.elevate(self.token)
+            await self.conn.setCfg(self.token, "EnCmdExec", "True")
+
+    async def step(self, name: str) -> None:
+        conn, token = self.conn, self.token
+        if name == "handshake":
+            await conn.handshake()
+        elif name == "login":
+            await self.setup()
+        elif name == "elevate":
+            await conn.elevate(token)
+        elif name == "getCfg":
+            await conn.getCfg(token, "timeout")
+        elif name == "setCfg":
+            await conn.setCfg(token, "EleEnabled", "True")
+        elif name == "exec":
+            await conn.exec(token, self.command)
+        elif name == "bcSend":
+            await conn.bcSend(token, self.chunk)
+        elif name == "logout":
+            await conn.logout(token)
+            await self.setup()
+
+
+async def runTasks(procIdx: int, host: str, port: int, timeout: float, tasks: int,
+                   mix: List[Tuple[str, float]], duration: float, requests: int, user: str,
+                   password: str, elevate: bool, command: str, chunk: bytes, seed: int) -> dict:
+    lat: Dict[str, List[float]] = {}
+    fails: Dict[str, int] = {}
+    errors: List[str] = []
+    names = [n for n, _ in mix]
+    weights = [w for _, w in mix]
+    connects = 0
+    deadline = time.perf_counter() + duration if duration > 0 else float("inf")
+
+    async def one(taskIdx: int) -> None:
+        nonlocal connects
+        rng = random.Random(seed * 1000003 + procIdx * 4099 + taskIdx)
+        conn = AsyncLichSession(host, port, timeout)
+        task = BenchTask(conn, user.format(p=procIdx, t=taskIdx), password, elevate, command, chunk)
+        sent = 0
+        try:
+            while sent < requests and time.perf_counter() < deadline:
+                try:
+                    if task.token is None:
+                        await task.setup()
+                    await task.step(rng.choices(names, weights)[0])
+                except (RuntimeError, ConnectionError, OSError, asyncio.TimeoutError) as exc:
+                    errors.append(f"proc {procIdx} task {taskIdx}: {exc or type(exc).__name__}")
+                    task.token = None
+                    await conn.close()
+                    if len(errors) > 1000:
+                        return
+                sent += 1
+        finally:
+            await conn.close()
+            connects += conn.connects
+            for name, vals in conn.lat.items():
+                lat.setdefault(name, []).extend(vals)
+            for name, cnt in conn.fails.items():
+                fails[name] = fails.get(name, 0) + cnt
+
+    start = time.time()
+    await asyncio.gather(*(one(i) for i in range(tasks)))
+    return {"start": start, "end": time.time(), "lat": lat, "fails": fails,
+            "errors": errors, "connects": connects}
+
+
+def benchWorker(*args) -> dict:
+    # Process entry point: one event loop running this process's tasks
+    return asyncio.run(runTasks(*args))
+
+
+def runBench(host: str, port: int, timeout: float, procs: int, tasks: int, mix: List[Tuple[str, float]],
+             duration: float, requests: int, user: str, password: str, elevate: bool,
+             command: str, chunk: bytes, seed: int) -> dict:
+    jobArgs = [(p, host, port, timeout, tasks, mix, duration, requests, user, password,
+                elevate, command, chunk, seed) for p in range(procs)]
+    if procs > 1:
+        with ProcessPoolExecutor(max_workers=procs) as pool:
+            results = list(pool.map(benchWorker, *zip(*jobArgs)))
+    else:
+        results = [benchWorker(*jobArgs[0])]
+
+    lat: Dict[str, List[float]] = {}
+    fails: Dict[str, int] = {}
+    for res in results:
+        for name, vals in res["lat"].items():
+            lat.setdefault(name, []).extend(vals)
+        for name, cnt in res["fails"].items():
+            fails[name] = fails.get(name, 0) + cnt
+
+    # Wall span across workers, so process start-up is not counted as load
+    elapsed = max(r["end"] for r in results) - min(r["start"] for r in results)
+    report = latencyReport(lat, fails)
+    for row in report:
+        row["rate"] = row["count"] / elapsed if elapsed else 0.0
+    messages = sum(len(v) for v in lat.values())
+
+    return {
+        "target": f"{host}:{port}",
+        "procs": procs,
+        "tasks": tasks,
+        "mix": dict(mix),
+        "elevate": elevate,
+        "elapsed": elapsed,
+        "messages": messages,
+        "throughput": messages / elapsed if elapsed else 0.0,
+        "connects": sum(r["connects"] for r in results),
+        "errors": [e for r in results for e in r["errors"]],
+        "report": report,
+    }
+
+
+def buildParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Lich protocol load benchmark")
+    parser.add_argument("--host", default="127.0.0.1", help="Server host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=9001, help="Server port (default: 9001)")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Per-message timeout seconds")
+    parser.add_argument("--procs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--tasks", type=int, default=8, help="asyncio tasks per process (default: 8)")
+    parser.add_argument("--mix", default=DEFAULT_MIX,
+                        help=f"Weighted message mix, name=weight,... (default: {DEFAULT_MIX})")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run (0: use --requests)")
+    parser.add_argument("--requests", type=int, default=0, help="Mix steps per task (default: unlimited)")
+    parser.add_argument("--user", default="b{p}x{t}",
+                        help="Username; '{p}' and '{t}' expand to process and task index (max 8 chars)")
+    parser.add_argument("--password", default="SBLCHT42")
+    parser.add_argument("--elevate", action="store_true", help="Elevate each session and enable exec")
+    parser.add_argument("--command", default="id")
+    parser.add_argument("--chunk", type=int, default=64, help="BoneCourier chunk size in bytes (default: 64)")
+    parser.add_argument("--seed", type=int, default=1, help="Mix RNG seed")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    return parser
+
+
+def main() -> int:
+    args = buildParser().parse_args()
+    if args.duration <= 0 and args.requests <= 0:
+        print("error: set --duration or --requests", file=sys.stderr)
+        return 2
+    try:
+        mix = parseMix(args.mix)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    try:
+        # The highest indices give the longest name; reject it here rather than in every task
+        lastUser = args.user.format(p=max(1, args.procs) - 1, t=max(1, args.tasks) - 1)
+    except (KeyError, IndexError, ValueError):
+        print(f"error: --user {args.user!r}: only {{p}} and {{t}} can be expanded", file=sys.stderr)
+        return 2
+    try:
+        loginReq(lastUser, args.password)
+    except ValueError as exc:
+        print(f"error: {exc} (--user expands up to {lastUser!r})", file=sys.stderr)
+        return 2
+
+    res = runBench(args.host, args.port, args.timeout, max(1, args.procs), max(1, args.tasks), mix,
+                   args.duration, args.requests or sys.maxsize, args.user, args.password, args.elevate,
+                   args.command, os.urandom(args.chunk), args.seed)
+
+    for err in res["errors"][:10]:
+        print(f"error: {err}", file=sys.stderr)
+    printReport(res["report"])
+    print(f"target={res['target']} procs={res['procs']} tasks={res['tasks']} errors={len(res['errors'])} "
+          f"connects={res['connects']} messages={res['messages']} elapsed={res['elapsed']:.2f}s "
+          f"throughput={res['throughput']:.0f} msg/s")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(res, f, indent=1)
+        print(f"[+] wrote {args.json}")
+    return 1 if res["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Lich protocol reference server (pure-Python asyncio stand-in for lichServer.exe).
+
+Implements PROTOspec.md with the reference server's validation order, config table
+and error codes. Where the reference server cannot complete a flow, the spec wins:
+  - BoneCourier: CTS accepts (the reference seeds rand() so it always denies) and
+    DataPackets reach the handler (its token extraction for 0x22 always fails).
+  - Expired tokens answer ERR_TOKEN_EXP instead of ERR_UNAUTHORIZED.
+Connections stay open across requests unless --one-shot is given (one request per
+connection, like the reference); an 'IDK you' reply always closes the connection.
+
+Examples:
+  python lichServer.py
+  python lichServer.py 9001 --config maxSess=100 --config EleEnabled=True
+  python lichServer.py 9002 --one-shot --verbose
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import os
+import struct
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from client import (
+    ERR_MAP,
+    FRAME_HDR,
+    HEADER_SIZE,
+    MAGIC,
+    MSG_ARISE_RESP,
+    MSG_BC_ACK,
+    MSG_BC_CTS,
+    MSG_BC_DATA,
+    MSG_BC_RTS,
+    MSG_ER_IDK,
+    MSG_ER_REQ,
+    MSG_ER_RESP,
+    MSG_NW_APPROVE,
+    MSG_NW_GETCFG,
+    MSG_NW_SETCFG,
+    MSG_SB_ELEVATE,
+    MSG_SB_REQ,
+    MSG_SB_RESP,
+    MSG_UW_EXEC,
+    MSG_UW_INVALID,
+    MSG_UW_RESULT,
+    PROTO_AR,
+    PROTO_BC,
+    PROTO_ER,
+    PROTO_NW,
+    PROTO_SB,
+    PROTO_UW,
+    VERSION,
+    Req,
+    buildFrame,
+    hashPayload,
+)
+
+try:
+    import uvloop  # optional: pip install uvloop
+except ImportError:
+    uvloop = None
+
+
+# Error code by name, from the client's table
+ERR = {name: code for code, name in ERR_MAP.items()}
+
+# Reply message type per error code (error.c gtErRs); anything else is 'IDK you'
+ERR_MSG_TYPE = {
+    ERR["ERR_UNAUTHORIZED"]: MSG_UW_INVALID,
+    ERR["ERR_CMD_DENIED"]: MSG_UW_INVALID,
+    ERR["ERR_CHUNK_HASH"]: MSG_BC_ACK,
+    ERR["ERR_TRANSFER_DENY"]: MSG_BC_CTS,
+}
+
+TOKEN_SIZE = 16
+MAX_PAYLOAD_LEN = 256
+MAX_CHUNK_SIZE = 256
+MAX_CMD_LEN = 256
+MAX_CRED_LEN = 8
+MAX_SESSIONS = 100
+HS_TTL_SEC = 30
+TOKEN_EXPIRE_SEC = 60
+TIMEOUT_SEC = 10
+
+AUTH_UNPRIVILEGED = 0
+AUTH_ADMIN = 1
+
+PASSPHRASE = b"SBLCHT42"
+ELEV_REQ = b"elevateRequest"
+ELE_KEY = bytes([0xF0, 0x15, 0xAC, 0x71, 0xEE])
+ELE_FLAG_BYTES = bytes([0x8B, 0x60, 0xC2, 0x35, 0xAB, 0xB1, 0x51, 0xF3, 0x25, 0xA6, 0xA2, 0x25, 0xE2, 0x42, 0x93])
+
+# key: (default, requiresAdmin) -- config.c cfgInit
+CONFIG_DEFAULTS = {
+    "timeout": ("10", True),
+    "maxChunkSize": ("256", True),
+    "EleEnabled": ("False", False),
+    "serverPort": ("9001", True),
+    "tknExpire": ("60", True),
+    "maxSess": ("5", True),
+    "maxPayload": ("256", True),
+    "EnCmdExec": ("False", True),
+    "CmdSize": ("256", True),
+}
+
+
+def atoi(text: str) -> int:
+    # C atoi: leading integer prefix, 0 if none
+    text = text.strip()
+    end = 1 if text[:1] in ("+", "-") else 0
+    while end < len(text) and text[end].isdigit():
+        end += 1
+    try:
+        return int(text[:end])
+    except ValueError:
+        return 0
+
+
+def cStr(buf: bytes) -> Optional[bytes]:
+    # NUL-terminated prefix of buf, or None if there is no terminator
+    end = buf.find(b"\x00")
+    return None if end < 0 else buf[:end]
+
+
+def errReply(name: str) -> Req:
+    code = ERR[name]
+    return PROTO_ER, ERR_MSG_TYPE.get(code, MSG_ER_IDK), struct.pack("<H", code)
+
+
+class Session:
+    __slots__ = ("user", "token", "lastActivity", "authLevel", "active", "inTransfer", "expected")
+
+    def __init__(self, user: bytes, token: bytes) -> None:
+        self.user = user
+        self.token = token
+        self.lastActivity = time.monotonic()
+        self.authLevel = AUTH_UNPRIVILEGED
+        self.active = True
+        self.inTransfer = False
+        self.expected = 0
+
+
+class LichServer:
+    """Protocol state (config, sessions, handshake window) and request dispatch.
+
+    Handlers are synchronous and never await, so each request runs atomically on the loop.
+    """
+
+    def __init__(self, oneShot: bool = False, overrides: Optional[Dict[str, str]] = None,
+                 maxSessions: int = MAX_SESSIONS, verbose: bool = False) -> None:
+        self.oneShot = oneShot
+        self.maxSessions = maxSessions
+        self.verbose = verbose
+        self.config: Dict[str, List] = {k: [v, adm] for k, (v, adm) in CONFIG_DEFAULTS.items()}
+        for key, value in (overrides or {}).items():
+            if key not in self.config:
+                raise ValueError(f"unknown config key: {key}")
+            self.config[key][0] = value
+        self.sessions: Dict[bytes, Session] = {}  # token -> session
+        self.users: Dict[bytes, Session] = {}     # username -> active session
+        self.handshakes: Dict[str, float] = {}    # peer ip -> last Arise
+        self.conns = 0
+        self.requests = 0
+
+    # Config
+
+    def cfgInt(self, key: str, default: int, lo: int, hi: int) -> int:
+        value = atoi(self.config[key][0])
+        if value <= 0:
+            value = default
+        return min(max(value, lo), hi)
+
+    def timeout(self) -> int:
+        return self.cfgInt("timeout", TIMEOUT_SEC, 1, 120)
+
+    def maxPayload(self) -> int:
+        return self.cfgInt("maxPayload", MAX_PAYLOAD_LEN, 16, MAX_PAYLOAD_LEN)
+
+    def tknExpire(self) -> int:
+        return self.cfgInt("tknExpire", TOKEN_EXPIRE_SEC, 1, 86400)
+
+    # Sessions
+
+    def expired(self, sess: Session, now: float) -> bool:
+        if sess.active and now - sess.lastActivity > self.tknExpire():
+            self.dropSession(sess)
+        return not sess.active
+
+    def dropSession(self, sess: Session) -> None:
+        sess.active = False
+        if self.users.get(sess.user) is sess:
+            del self.users[sess.user]
+
+    def createSession(self, user: bytes) -> Optional[Session]:
+        now = time.monotonic()
+        for sess in list(self.users.values()):
+            self.expired(sess, now)
+        old = self.users.get(user)
+        if old is not None:
+            self.dropSession(old)
+
+        maxS = min(self.cfgInt("maxSess", self.maxSessions, 1, self.maxSessions), self.maxSessions)
+        if len(self.users) >= maxS:
+            return None
+
+        # Inactive sessions linger only so their tokens can report expiry/unauthorized
+        self.sessions = {t: s for t, s in self.sessions.items() if s.active}
+        token = os.urandom(TOKEN_SIZE)
+        while token in self.sessions:
+            token = os.urandom(TOKEN_SIZE)
+        sess = Session(user, token)
+        self.sessions[token] = sess
+        self.users[user] = sess
+        return sess
+
+    def lookup(self, token: bytes) -> Tuple[Optional[Session], str]:
+        # Active session for token, or (None, error name)
+        sess = self.sessions.get(token)
+        if sess is None:
+            return None, "ERR_UNAUTHORIZED"
+        wasActive = sess.active
+        if self.expired(sess, time.monotonic()):
+            return None, "ERR_TOKEN_EXP" if wasActive else "ERR_UNAUTHORIZED"
+        return sess, ""
+
+    # Framing
+
+    def extractToken(self, protoId: bytes, msgType: int, payload: bytes) -> Optional[bytes]:
+        # main.c exTok, with the DataPacket case fixed
+        if protoId == PROTO_BC:
+            if msgType == MSG_BC_RTS and len(payload) >= 4 + TOKEN_SIZE:
+                return payload[4:4 + TOKEN_SIZE]
+            if msgType == MSG_BC_DATA and len(payload) >= 16 + TOKEN_SIZE:
+                return payload[-TOKEN_SIZE:]
+            return None
+
+        if protoId == PROTO_NW:
+            key = cStr(payload)
+            if key is None:
+                return None
+            pos = len(key) + 1
+            if msgType in (MSG_NW_SETCFG, MSG_NW_APPROVE):
+                value = cStr(payload[pos:])
+                if value is None:
+                    return None
+                pos += len(value) + 1
+            elif msgType != MSG_NW_GETCFG:
+                return None
+            tok = payload[pos:pos + TOKEN_SIZE]
+            return tok if len(tok) == TOKEN_SIZE else None
+
+        if protoId == PROTO_UW:
+            cmd = cStr(payload)
+            if cmd is None:
+                return None
+            tok = payload[len(cmd) + 1:len(cmd) + 1 + TOKEN_SIZE]
+            return tok if len(tok) == TOKEN_SIZE else None
+
+        if protoId == PROTO_ER:
+            return payload[:TOKEN_SIZE] if len(payload) >= TOKEN_SIZE else None
+
+        return None
+
+    def handle(self, peerIp: str, protoId: bytes, msgType: int, magic: bytes, version: int,
+               hashBytes: bytes, payload: bytes) -> Req:
+        # Validate one received frame and dispatch it (main.c loop body)
+        if protoId != PROTO_AR and (magic != MAGIC or version != VERSION):
+            return errReply("ERR_MAGIC_VER")
+
+        expected = hashPayload(protoId, payload)
+        if protoId == PROTO_AR:
+            if hashBytes[:16] != expected[:16]:
+                return errReply("ERR_HASH_FAIL")
+        elif hashBytes != expected:
+            return errReply("ERR_HASH_FAIL")
+
+        sess = None
+        if protoId not in (PROTO_AR, PROTO_SB):
+            token = self.extractToken(protoId, msgType, payload)
+            if token is None:
+                return errReply("ERR_MALFORMED")
+            sess, errName = self.lookup(token)
+            if sess is None:
+                return errReply(errName)
+            sess.lastActivity = time.monotonic()
+
+        if protoId == PROTO_AR:
+            return self.handleArise(peerIp, payload)
+        if protoId == PROTO_SB:
+            if msgType == MSG_SB_REQ:
+                return self.handleLogin(peerIp, payload)
+            if msgType == MSG_SB_ELEVATE:
+                return self.handleElevate(payload)
+        elif protoId == PROTO_BC:
+            if msgType == MSG_BC_RTS:
+                return self.handleRts(sess, payload)
+            if msgType == MSG_BC_DATA and sess.inTransfer:
+                return self.handleData(sess, payload)
+        elif protoId == PROTO_NW:
+            if msgType == MSG_NW_GETCFG:
+                return self.handleGetCfg(payload)
+            if msgType == MSG_NW_SETCFG:
+                return self.handleSetCfg(sess, payload)
+        elif protoId == PROTO_UW:
+            if msgType == MSG_UW_EXEC:
+                return self.handleExec(sess, payload)
+        elif protoId == PROTO_ER:
+            if msgType == MSG_ER_REQ:
+                self.dropSession(sess)
+                return PROTO_ER, MSG_ER_RESP, b"\x00"
+        return errReply("ERR_MALFORMED")
+
+    # Handlers (handlers.c)
+
+    def handleArise(self, peerIp: str, payload: bytes) -> Req:
+        if len(payload) < 3 or len(payload) - 3 >= 256:
+            return errReply("ERR_MALFORMED")
+        supported = payload[3:].split(b"\x00", 1)[0]
+        if b"blake3" not in supported.lower():
+            return errReply("ERR_MALFORMED")
+
+        self.handshakes[peerIp] = time.monotonic()
+        return PROTO_AR, MSG_ARISE_RESP, bytes([0x4C, 0x1C, VERSION]) + b"Blake3, MD5"
+
+    def handleLogin(self, peerIp: str, payload: bytes) -> Req:
+        hsTime = self.handshakes.get(peerIp)
+        if hsTime is None or time.monotonic() - hsTime > HS_TTL_SEC:
+            self.handshakes.pop(peerIp, None)
+            return errReply("ERR_UNAUTHORIZED")
+
+        user = cStr(payload)
+        if user is None or len(user) > MAX_CRED_LEN:
+            return errReply("ERR_MALFORMED")
+        password = cStr(payload[len(user) + 1:])
+        if password is None or len(password) > MAX_CRED_LEN:
+            return errReply("ERR_MALFORMED")
+        if password != PASSPHRASE:
+            return errReply("ERR_UNAUTHORIZED")
+
+        sess = self.createSession(user)
+        if sess is None:
+            return errReply("ERR_MALFORMED")
+        return PROTO_SB, MSG_SB_RESP, b"\x01" + sess.token + bytes([AUTH_UNPRIVILEGED])
+
+    def handleElevate(self, payload: bytes) -> Req:
+        if len(payload) < TOKEN_SIZE + 2:
+            return errReply("ERR_MALFORMED")
+        sess, errName = self.lookup(payload[:TOKEN_SIZE])
+        if sess is None:
+            return errReply(errName)
+
+        request = cStr(payload[TOKEN_SIZE:])
+        if not request:
+            return errReply("ERR_MALFORMED")
+        if self.config["EleEnabled"][0] != "True" or request != ELEV_REQ:
+            return errReply("ERR_UNAUTHORIZED")
+
+        sess.authLevel = AUTH_ADMIN
+        sess.lastActivity = time.monotonic()
+        flag = bytes(b ^ ELE_KEY[i % len(ELE_KEY)] for i, b in enumerate(ELE_FLAG_BYTES))
+        return PROTO_SB, MSG_SB_RESP, b"\x01" + sess.token + bytes([AUTH_ADMIN]) + flag
+
+    def handleRts(self, sess: Session, payload: bytes) -> Req:
+        dataSize = struct.unpack_from("<I", payload)[0]
+        maxChunk = atoi(self.config["maxChunkSize"][0])
+        if maxChunk < 0 or dataSize > maxChunk:
+            return errReply("ERR_TRANSFER_DENY")
+
+        sess.inTransfer = True
+        sess.expected = dataSize
+        return PROTO_BC, MSG_BC_CTS, b"\x01"
+
+    def handleData(self, sess: Session, payload: bytes) -> Req:
+        dataLen = len(payload) - 16 - TOKEN_SIZE
+        if dataLen > MAX_CHUNK_SIZE:
+            return errReply("ERR_MALFORMED")
+        if dataLen > sess.expected:
+            sess.inTransfer = False
+            sess.expected = 0
+            return errReply("ERR_TRANSFER_DENY")
+        if hashlib.md5(payload[:dataLen]).digest() != payload[dataLen:dataLen + 16]:
+            return errReply("ERR_CHUNK_HASH")
+
+        sess.expected -= dataLen
+        if sess.expected == 0:
+            sess.inTransfer = False
+        return PROTO_BC, MSG_BC_ACK, b""
+
+    def handleGetCfg(self, payload: bytes) -> Req:
+        key = cStr(payload)
+        if not key:
+            return errReply("ERR_MALFORMED")
+        ent = self.config.get(key.decode("utf-8", errors="replace"))
+        if ent is None:
+            return errReply("ERR_CONFIG_NOTFOUND")
+        return PROTO_NW, MSG_NW_GETCFG, ent[0].encode("utf-8") + b"\x00"
+
+    def handleSetCfg(self, sess: Session, payload: bytes) -> Req:
+        key = cStr(payload)
+        if not key:
+            return errReply("ERR_MALFORMED")
+        value = cStr(payload[len(key) + 1:])
+        if value is None:
+            return errReply("ERR_MALFORMED")
+
+        ent = self.config.get(key.decode("utf-8", errors="replace"))
+        if ent is None:
+            return errReply("ERR_CONFIG_NOTFOUND")
+        decision = b"deny"
+        if sess.authLevel == AUTH_ADMIN or not ent[1]:
+            ent[0] = value.decode("utf-8", errors="replace")
+            decision = b"approve"
+        return PROTO_NW, MSG_NW_APPROVE, key + b"\x00" + decision + b"\x00"
+
+    def handleExec(self, sess: Session, payload: bytes) -> Req:
+        if len(payload) < TOKEN_SIZE + 1 or payload[-TOKEN_SIZE:] != sess.token:
+            return errReply("ERR_UNAUTHORIZED" if len(payload) >= TOKEN_SIZE + 1 else "ERR_MALFORMED")
+        if sess.authLevel != AUTH_ADMIN:
+            return errReply("ERR_CMD_DENIED")
+        if self.config["EnCmdExec"][0] != "True":
+            return errReply("ERR_CMD_DENIED")
+
+        cmdMax = self.cfgInt("CmdSize", MAX_CMD_LEN, 1, 1 << 30)
+        cmd = payload.split(b"\x00", 1)[0]
+        if len(cmd) > cmdMax:
+            return errReply("ERR_CMD_DENIED")
+        # Like the reference server, commands are policy-checked but never run
+        return PROTO_UW, MSG_UW_RESULT, b"\x00"
+
+    # Transport
+
+    async def serveConn(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.conns += 1
+        peer = writer.get_extra_info("peername")
+        peerIp = peer[0] if peer else ""
+        try:
+            while True:
+                try:
+                    header = await asyncio.wait_for(reader.readexactly(HEADER_SIZE), self.timeout())
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    return
+
+                protoId, msgType, payloadLen, magic, version, hashBytes = FRAME_HDR.unpack(header)
+                if payloadLen > MAX_PAYLOAD_LEN or payloadLen > self.maxPayload():
+                    reply = errReply("ERR_MALFORMED")
+                else:
+                    try:
+                        payload = await asyncio.wait_for(reader.readexactly(payloadLen), self.timeout())
+                    except asyncio.IncompleteReadError:
+                        return
+                    except asyncio.TimeoutError:
+                        payload = None
+                    if payload is None:
+                        reply = errReply("ERR_MALFORMED")
+                    else:
+                        reply = self.handle(peerIp, protoId, msgType, magic, version, hashBytes, payload)
+
+                self.requests += 1
+                if self.verbose:
+                    print(f"[*] {peerIp} {protoId.decode('ascii', errors='replace')} 0x{msgType:02x} -> "
+                          f"{reply[0].decode()} 0x{reply[1]:02x}")
+                writer.write(buildFrame(*reply))
+                await writer.drain()
+                if self.oneShot or reply[1] == MSG_ER_IDK:
+                    return
+        except (ConnectionError, OSError):
+            return
+        finally:
+            writer.close()
+
+
+def parseOverrides(items: List[str]) -> Dict[str, str]:
+    overrides = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"--config expects key=value, got {item!r}")
+        overrides[key] = value
+    return overrides
+
+
+async def serve(host: str, port: int, srv: LichServer) -> None:
+    server = await asyncio.start_server(srv.serveConn, host, port, backlog=1024)
+    print(f"[*] Lich server listening on {host}:{port}" + (" (one request per connection)" if srv.oneShot else ""))
+    async with server:
+        await server.serve_forever()
+
+
+def buildParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Lich protocol reference server (asyncio)")
+    parser.add_argument("port", type=int, nargs="?", default=9001, help="Listen port (default: 9001)")
+    parser.add_argument("--host", default="127.0.0.1", help="Listen address (default: 127.0.0.1)")
+    parser.add_argument("--one-shot", action="store_true", help="Close after every reply, like lichServer.exe")
+    parser.add_argument("--config", action="append", default=[], metavar="KEY=VALUE",
+                        help="Override a config default (repeatable), e.g. maxSess=100")
+    parser.add_argument("--max-sessions", type=int, default=MAX_SESSIONS,
+                        help=f"Hard cap on live sessions (default: {MAX_SESSIONS})")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    return parser
+
+
+def main() -> int:
+    args = buildParser().parse_args()
+    try:
+        srv = LichServer(args.one_shot, parseOverrides(args.config), args.max_sessions, args.verbose)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+    if uvloop is not None:
+        uvloop.install()
+    try:
+        asyncio.run(serve(args.host, args.port, srv))
+    except KeyboardInterrupt:
+        pass
+    print(f"[*] Server stopped ({srv.conns} connections, {srv.requests} requests)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
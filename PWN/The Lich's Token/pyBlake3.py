@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Pure-Python BLAKE3 (32-byte default output), used by client.py when the blake3 C
+extension is not installed.
+
+The compression function is fully unrolled over local variables with the message
+schedule precomputed per round. Chunk chaining values are independent, so large
+inputs are split into chunk ranges and hashed on a thread pool when the interpreter
+can run threads in parallel (free-threaded builds); under the GIL they are hashed
+inline, which is faster than paying for threads that cannot overlap.
+
+Examples:
+  python pyBlake3.py somefile.bin
+  python -c "import pyBlake3; print(pyBlake3.digest(b'').hex())"
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+IV = (0x6A09E667, 0xBB67AE85, 0x3C6EF372, 0xA54FF53A, 0x510E527F, 0x9B05688C, 0x1F83D9AB, 0x5BE0CD19)
+MSG_PERMUTATION = (2, 6, 3, 10, 7, 0, 4, 13, 1, 11, 12, 5, 9, 14, 15, 8)
+
+CHUNK_START = 1
+CHUNK_END = 2
+PARENT = 4
+ROOT = 8
+
+BLOCK_LEN = 64
+CHUNK_LEN = 1024
+OUT_LEN = 32
+
+# Chunks per thread-pool task, and the smallest input worth splitting
+PARALLEL_CHUNKS = 64
+PARALLEL_MIN = PARALLEL_CHUNKS * CHUNK_LEN * 2
+
+BLOCK_WORDS = struct.Struct("<16I")
+OUT_WORDS = struct.Struct("<8I")
+
+
+def buildSchedule() -> Tuple[Tuple[int, ...], ...]:
+    # Message word order for each of the 7 rounds
+    sched = [tuple(range(16))]
+    for _ in range(6):
+        prev = sched[-1]
+        sched.append(tuple(prev[i] for i in MSG_PERMUTATION))
+    return tuple(sched)
+
+
+SCHEDULE = buildSchedule()
+
+
+def compress(cv: Sequence[int], m: Sequence[int], counter: int, blockLen: int, flags: int) -> Tuple[int, ...]:
+    # First 8 words of the BLAKE3 compression output (the chaining value)
+    M = 0xFFFFFFFF
+    s0, s1, s2, s3, s4, s5, s6, s7 = cv
+    s8, s9, s10, s11 = IV[0], IV[1], IV[2], IV[3]
+    s12 = counter & M
+    s13 = (counter >> 32) & M
+    s14 = blockLen
+    s15 = flags
+
+    for sched in SCHEDULE:
+        m0, m1, m2, m3, m4, m5, m6, m7, m8, m9, m10, m11, m12, m13, m14, m15 = [m[i] for i in sched]
+
+        # Columns
+        s0 = (s0 + s4 + m0) & M; s12 ^= s0; s12 = ((s12 >> 16) | (s12 << 16)) & M
+        s8 = (s8 + s12) & M; s4 ^= s8; s4 = ((s4 >> 12) | (s4 << 20)) & M
+        s0 = (s0 + s4 + m1) & M; s12 ^= s0; s12 = ((s12 >> 8) | (s12 << 24)) & M
+        s8 = (s8 + s12) & M; s4 ^= s8; s4 = ((s4 >> 7) | (s4 << 25)) & M
+
+        s1 = (s1 + s5 + m2) & M; s13 ^= s1; s13 = ((s13 >> 16) | (s13 << 16)) & M
+        s9 = (s9 + s13) & M; s5 ^= s9; s5 = ((s5 >> 12) | (s5 << 20)) & M
+        s1 = (s1 + s5 + m3) & M; s13 ^= s1; s13 = ((s13 >> 8) | (s13 << 24)) & M
+        s9 = (s9 + s13) & M; s5 ^= s9; s5 = ((s5 >> 7) | (s5 << 25)) & M
+
+        s2 = (s2 + s6 + m4) & M; s14 ^= s2; s14 = ((s14 >> 16) | (s14 << 16)) & M
+        s10 = (s10 + s14) & M; s6 ^= s10; s6 = ((s6 >> 12) | (s6 << 20)) & M
+        s2 = (s2 + s6 + m5) & M; s14 ^= s2; s14 = ((s14 >> 8) | (s14 << 24)) & M
+        s10 = (s10 + s14) & M; s6 ^= s10; s6 = ((s6 >> 7) | (s6 << 25)) & M
+
+        s3 = (s3 + s7 + m6) & M; s15 ^= s3; s15 = ((s15 >> 16) | (s15 << 16)) & M
+        s11 = (s11 + s15) & M; s7 ^= s11; s7 = ((s7 >> 12) | (s7 << 20)) & M
+        s3 = (s3 + s7 + m7) & M; s15 ^= s3; s15 = ((s15 >> 8) | (s15 << 24)) & M
+        s11 = (s11 + s15) & M; s7 ^= s11; s7 = ((s7 >> 7) | (s7 << 25)) & M
+
+        # Diagonals
+        s0 = (s0 + s5 + m8) & M; s15 ^= s0; s15 = ((s15 >> 16) | (s15 << 16)) & M
+        s10 = (s10 + s15) & M; s5 ^= s10; s5 = ((s5 >> 12) | (s5 << 20)) & M
+        s0 = (s0 + s5 + m9) & M; s15 ^= s0; s15 = ((s15 >> 8) | (s15 << 24)) & M
+        s10 = (s10 + s15) & M; s5 ^= s10; s5 = ((s5 >> 7) | (s5 << 25)) & M
+
+        s1 = (s1 + s6 + m10) & M; s12 ^= s1; s12 = ((s12 >> 16) | (s12 << 16)) & M
+        s11 = (s11 + s12) & M; s6 ^= s11; s6 = ((s6 >> 12) | (s6 << 20)) & M
+        s1 = (s1 + s6 + m11) & M; s12 ^= s1; s12 = ((s12 >> 8) | (s12 << 24)) & M
+        s11 = (s11 + s12) & M; s6 ^= s11; s6 = ((s6 >> 7) | (s6 << 25)) & M
+
+        s2 = (s2 + s7 + m12) & M; s13 ^= s2; s13 = ((s13 >> 16) | (s13 << 16)) & M
+        s8 = (s8 + s13) & M; s7 ^= s8; s7 = ((s7 >> 12) | (s7 << 20)) & M
+        s2 = (s2 + s7 + m13) & M; s13 ^= s2; s13 = ((s13 >> 8) | (s13 << 24)) & M
+        s8 = (s8 + s13) & M; s7 ^= s8; s7 = ((s7 >> 7) | (s7 << 25)) & M
+
+        s3 = (s3 + s4 + m14) & M; s14 ^= s3; s14 = ((s14 >> 16) | (s14 << 16)) & M
+        s9 = (s9 + s14) & M; s4 ^= s9; s4 = ((s4 >> 12) | (s4 << 20)) & M
+        s3 = (s3 + s4 + m15) & M; s14 ^= s3; s14 = ((s14 >> 8) | (s14 << 24)) & M
+        s9 = (s9 + s14) & M; s4 ^= s9; s4 = ((s4 >> 7) | (s4 << 25)) & M
+
+    return (s0 ^ s8, s1 ^ s9, s2 ^ s10, s3 ^ s11, s4 ^ s12, s5 ^ s13, s6 ^ s14, s7 ^ s15)
+
+
+def chunkState(data: memoryview, start: int, counter: int) -> Tuple[Tuple[int, ...], Tuple[int, ...], int, int]:
+    # Chain every block of one chunk except the last; returns (cv, lastBlockWords, lastLen, lastFlags)
+    end = min(start + CHUNK_LEN, len(data))
+    cv = IV
+    flags = CHUNK_START
+    pos = start
+    while end - pos > BLOCK_LEN:
+        cv = compress(cv, BLOCK_WORDS.unpack_from(data, pos), counter, BLOCK_LEN, flags)
+        flags = 0
+        pos += BLOCK_LEN
+
+    lastLen = end - pos
+    if lastLen == BLOCK_LEN:
+        words = BLOCK_WORDS.unpack_from(data, pos)
+    else:
+        words = BLOCK_WORDS.unpack(bytes(data[pos:end]) + bytes(BLOCK_LEN - lastLen))
+    return cv, words, lastLen, flags | CHUNK_END
+
+
+def chunkCvs(data: memoryview, first: int, last: int) -> List[Tuple[int, ...]]:
+    # Chaining values of chunks [first, last)
+    cvs = []
+    for idx in range(first, last):
+        cv, words, lastLen, flags = chunkState(data, idx * CHUNK_LEN, idx)
+        cvs.append(compress(cv, words, idx, lastLen, flags))
+    return cvs
+
+
+def subtreeCv(cvs: List[Tuple[int, ...]], lo: int, hi: int) -> Tuple[int, ...]:
+    # Chaining value of the subtree over chunks [lo, hi)
+    if hi - lo == 1:
+        return cvs[lo]
+    mid = lo + (1 << ((hi - lo - 1).bit_length() - 1))
+    return compress(IV, subtreeCv(cvs, lo, mid) + subtreeCv(cvs, mid, hi), 0, BLOCK_LEN, PARENT)
+
+
+def parallelOk() -> bool:
+    # True when threads can run Python bytecode concurrently
+    isGilEnabled = getattr(sys, "_is_gil_enabled", None)
+    return isGilEnabled is not None and not isGilEnabled()
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+
+
+def threadPool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="blake3")
+    return _pool
+
+
+def digest(data, parallel: Optional[bool] = None) -> bytes:
+    """32-byte BLAKE3 hash of a bytes-like object.
+
+    parallel: split chunk hashing over the thread pool (default: only for large inputs
+    on free-threaded interpreters).
+    """
+    view = memoryview(data).cast("B")
+    total = len(view)
+    nChunks = max(1, -(-total // CHUNK_LEN))
+
+    if nChunks == 1:
+        cv, words, lastLen, flags = chunkState(view, 0, 0)
+        return OUT_WORDS.pack(*compress(cv, words, 0, lastLen, flags | ROOT))
+
+    if parallel is None:
+        parallel = total >= PARALLEL_MIN and parallelOk()
+    if parallel:
+        ranges = [(lo, min(lo + PARALLEL_CHUNKS, nChunks)) for lo in range(0, nChunks, PARALLEL_CHUNKS)]
+        cvs = [cv for part in threadPool().map(lambda r: chunkCvs(view, *r), ranges) for cv in part]
+    else:
+        cvs = chunkCvs(view, 0, nChunks)
+
+    mid = 1 << ((nChunks - 1).bit_length() - 1)
+    root = compress(IV, subtreeCv(cvs, 0, mid) + subtreeCv(cvs, mid, nChunks), 0, BLOCK_LEN, PARENT | ROOT)
+    return OUT_WORDS.pack(*root)
+
+
+def main() -> int:
+    if len(sys.argv) < 2:
+        print(f"usage: {sys.argv[0]} FILE...", file=sys.stderr)
+        return 2
+    for fPath in sys.argv[1:]:
+        with open(fPath, "rb") as f:
+            print(f"{digest(f.read()).hex()}  {fPath}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""Batch Ashen Choir engine: run() and classify() over N tokens at once.
+
+State is held as struct-of-arrays (s0..s3 as uint32[N], trace/passMask/classHist
+as uint8[N, 24]) and the 24 voice steps run in lockstep, with per-token voice
+indices gathered from the voice tables. Results match solve.run/classify.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import solve
+from solve import (
+    BUCKET, CORE_A, CORE_B, FOLD_A, FOLD_B, HI_A0, HI_A1, HI_B0, HI_B1, IDX_A, IDX_B, IDX_C,
+    MIX_A, MIX_B, RAW_LEN, ROT_BY, VOICE_COUNT, split_word,
+)
+from primitives import SCRAMBLE_CLS_NP as SCRAMBLE_CLS, rotl32_np as rotl32, rotl8_np as rotl8  # on sys.path via solve
+
+U8 = np.uint8
+U32 = np.uint32
+U64 = np.uint64
+M32 = 0xFFFFFFFF
+
+LABELS = ("REAL", "FAKE_A", "FAKE_B", "FAKE_C", "DENY")
+REAL, FAKE_A, FAKE_B, FAKE_C, DENY = range(len(LABELS))
+
+# Per-voice tables, indexed by the voice chosen at each step
+V_IDX_A = np.array(IDX_A, dtype=np.intp)
+V_IDX_B = np.array(IDX_B, dtype=np.intp)
+V_IDX_C = np.array(IDX_C, dtype=np.intp)
+V_ROT = np.array(ROT_BY, dtype=U32)
+V_MIX = np.array([a ^ b for a, b in zip(MIX_A, MIX_B)], dtype=U32)
+V_FOLD = np.array([a ^ b for a, b in zip(FOLD_A, FOLD_B)], dtype=U32)
+V_T0 = np.array([(a ^ b) & 0xF0 for a, b in zip(HI_A0, HI_B0)], dtype=U32)
+V_T1 = np.array([(a ^ b) & 0xF0 for a, b in zip(HI_A1, HI_B1)], dtype=U32)
+# Bucket b holds voices b, b + 4, ..., b + 20
+assert all(BUCKET[b][k] == b + 4 * k for b in range(4) for k in range(6))
+
+EXPECTED_CORE = np.array([(a ^ b) & 0xFF for a, b in zip(CORE_A, CORE_B)], dtype=U32)
+
+
+def rotl32_wide(v, r):
+    # solve.rotl32 on an unmasked sum: a carry out of bit 31 lands in bit r
+    v = v.astype(U64)
+    return (((v << U64(r)) & U64(M32)) | (v >> U64(32 - r))).astype(U32)
+
+
+def to_batch(tokens):
+    """Tokens -> ((N, 20) uint8 letters, valid mask); invalid rows are zero."""
+    n = len(tokens)
+    out = np.zeros((n, RAW_LEN), dtype=U8)
+    if not n:
+        return out, np.zeros(0, dtype=bool)
+    raw = np.frombuffer("".join(t if len(t) == 24 and t.isascii() else "-" * 24 for t in tokens).encode(),
+                        dtype=U8).reshape(n, 24)
+    letters = np.delete(raw, [4, 9, 14, 19], axis=1)
+    ok = (raw[:, [4, 9, 14, 19]] == ord("-")).all(axis=1) & ((letters >= 65) & (letters <= 90)).all(axis=1)
+    out[ok] = letters[ok]
+    return out, ok
+
+
+def run_batch(inp):
+    """solve.run over an (N, 20) uint8 array; returns the same keys holding arrays."""
+    x = np.asarray(inp, dtype=U8).astype(U32)
+    n = len(x)
+    rows = np.arange(n)
+
+    s0 = np.full(n, 0xA51C39E7, dtype=U32)
+    s1 = np.full(n, 0xB4D28A6C, dtype=U32)
+    s2 = np.full(n, 0xC0DEC0DE, dtype=U32)
+    s3 = np.full(n, 0x9137F00D, dtype=U32)
+    trace = np.zeros((n, VOICE_COUNT), dtype=U8)
+    pass_mask = np.zeros((n, VOICE_COUNT), dtype=U8)
+    class_hist = np.zeros((n, VOICE_COUNT), dtype=U8)
+    voice_order = np.zeros((n, VOICE_COUNT), dtype=np.intp)
+    cursor = np.zeros((n, 4), dtype=np.intp)
+
+    taint = (x.sum(axis=1, dtype=U32) & U32(0xFF)) ^ U32(0x5A)
+    taint ^= (x[:, 1] * U32(3) + x[:, 18]) & U32(0xFF)
+    class_acc = ((taint >> U32(1)) ^ U32(3)) & U32(3)
+
+    with np.errstate(over="ignore"):
+        for step in range(VOICE_COUNT):
+            seed = (class_acc ^ U32(step) ^ ((s0 >> U32(8 * (step & 3))) & U32(0xFF))
+                    ^ (taint if step & 1 else U32(0xA5))) & U32(0xFF)
+            cls = SCRAMBLE_CLS[seed]
+            class_hist[:, step] = cls
+
+            # First bucket from cls onwards with voices left (all 24 get used, so one always is)
+            bucket = cls.astype(np.intp)
+            for off in range(3, -1, -1):
+                cand = (cls.astype(np.intp) + off) & 3
+                avail = cursor[rows, cand] < 6
+                bucket[avail] = cand[avail]
+            idx = bucket + 4 * cursor[rows, bucket]
+            cursor[rows, bucket] += 1
+            voice_order[:, step] = idx
+
+            a = x[rows, V_IDX_A[idx]] ^ V_MIX[idx]
+            lhs = (rotl8(a, V_ROT[idx]) + ((x[rows, V_IDX_B[idx]] + V_FOLD[idx]) & U32(0xFF))) & U32(0xFF)
+            lhs ^= (x[rows, V_IDX_C[idx]] + U32(7) * idx.astype(U32)) & U32(0xFF)
+            passed = ((((lhs ^ V_T0[idx]) & U32(0xF0)) == 0) | (((lhs ^ V_T1[idx]) & U32(0xF0)) == 0)).astype(U32)
+
+            trace[rows, idx] = lhs
+            pass_mask[rows, idx] = passed
+
+            vi = idx.astype(U32)
+            s0 = rotl32_wide((s0 ^ ((lhs + vi * U32(13)) & U32(0xFF))).astype(U64) + U64(0x9E3779B9), 5) + U32(0x7F4A7C15) + vi
+            s1 = s1 + ((((lhs << U32(1)) & U32(0xFF)) ^ ((vi * U32(29)) & U32(0xFF)) ^ U32(0xA6)))
+            s1 ^= rotl32(s0, vi % U32(7) + U32(3))
+            s2 = rotl32(s2 + lhs + s1 + U32(0x13579BDF), 7) ^ (passed << (vi % U32(13)))
+            s3 ^= rotl32(s2 + U32(0x2468ACE1) + vi, vi % U32(11) + U32(1))
+            class_acc = (class_acc + ((lhs ^ taint) & U32(3)) + passed + ((vi >> U32(2)) & U32(1))) & U32(3)
+
+        pass_count = pass_mask.sum(axis=1, dtype=U32) & U32(0xFF)
+        class_counts = np.stack([(class_hist == k).sum(axis=1) for k in range(4)], axis=1)
+
+        edge = np.zeros(n, dtype=np.int64)
+        for i in range(VOICE_COUNT - 1):
+            c0 = class_hist[:, i].astype(np.int64)
+            c1 = class_hist[:, i + 1].astype(np.int64)
+            p = pass_mask[rows, voice_order[:, i]].astype(np.int64)
+            edge = (edge + ((((c0 << 2) ^ c1 ^ p) * (0x11 + i * 7)) & 0xFFFF)) % 65521
+
+        t = trace.astype(U32)
+        core = np.stack([
+            t[:, 2] + t[:, 17] + x[:, 0],
+            t[:, 5] ^ t[:, 12] ^ x[:, 7],
+            t[:, 8] + t[:, 9] + t[:, 10],
+            t[:, 4] - t[:, 15] + x[:, 11],
+            t[:, 1] ^ t[:, 6] ^ t[:, 18],
+            x[:, 3] + x[:, 14] + t[:, 22],
+            t[:, 0] + x[:, 19] - t[:, 23],
+        ], axis=1) & U32(0xFF)
+        core_ok = (core == EXPECTED_CORE).all(axis=1)
+        late_ok = (((t[:, 21] ^ t[:, 7]) + x[:, 19]) & U32(0xFF)) == 159
+
+        sig_a = np.full(n, 0x811C9DC5, dtype=U32)
+        for i in range(VOICE_COUNT):
+            sig_a ^= (t[:, i] + U32(i * 17)) & U32(0xFF)
+            sig_a *= U32(0x01000193)
+        sig_a ^= s1
+
+        sig_b = np.full(n, 0x9E3779B9, dtype=U32)
+        for i in range(RAW_LEN):
+            sig_b = rotl32(sig_b ^ ((x[:, i] + U32(i * 9)) & U32(0xFF)), 5)
+            sig_b += U32((0x7F4A7C15 + i * 0x1F123BB5) & M32)
+        sig_b ^= s2
+
+        chord = ((sig_a >> U32(8)) ^ (sig_b >> U32(16)) ^ (pass_count << U32(3)) ^ taint) & U32(0xFF)
+        sig_real = (sig_a ^ rotl32(sig_b, 9)) + U32(split_word(solve.REAL_ADD_PART)) == U32(split_word(solve.REAL_GOAL_PART))
+        sig_decoy = (sig_b ^ rotl32(sig_a, 7)) + U32(split_word(solve.FAKE_ADD_PART)) == U32(split_word(solve.FAKE_GOAL_PART))
+
+    return {
+        "s0": s0, "s1": s1, "s2": s2, "s3": s3,
+        "trace": trace, "passMask": pass_mask, "classHist": class_hist, "voiceOrder": voice_order,
+        "taint": taint, "passCount": pass_count, "classCounts": class_counts, "edge": edge,
+        "coreOk": core_ok, "lateOk": late_ok, "sigA": sig_a, "sigB": sig_b, "chord": chord,
+        "sigReal": sig_real, "sigDecoy": sig_decoy,
+        "stateOk": (edge == 14789) & (class_counts == [6, 7, 3, 8]).all(axis=1),
+        "earlyOk": (edge == 14031) & (class_counts == [8, 4, 8, 4]).all(axis=1),
+    }
+
+
+def label_batch(inp, valid=None):
+    """classify() labels as codes into LABELS for an (N, 20) uint8 array."""
+    st = run_batch(inp)
+    full = st["passCount"] == 24
+    conds = [
+        full & st["stateOk"] & st["coreOk"] & st["lateOk"] & st["sigReal"],
+        full & st["sigDecoy"],
+        (st["passCount"] >= 18) & st["earlyOk"] & ~st["lateOk"],
+        (st["passCount"] >= 14) & (st["chord"] == 0x8A) & (((st["sigA"] ^ st["sigB"]) & U32(0xFF)) == 0x37),
+    ]
+    labels = np.select(conds, [REAL, FAKE_B, FAKE_A, FAKE_C], DENY).astype(U8)
+    if valid is not None:
+        labels[~valid] = DENY
+    return labels
+
+
+def classify_batch(tokens):
+    # Label names for a list of token strings
+    inp, valid = to_batch(tokens)
+    return [LABELS[c] for c in label_batch(inp, valid)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-classify Ashen Choir tokens.")
+    parser.add_argument("--count", type=int, default=200000, help="Random tokens to classify")
+    parser.add_argument("--batch", type=int, default=1 << 17, help="Tokens per lockstep batch")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    known = [solve.REAL_TOKEN, solve.FAKE_A_TOKEN, solve.FAKE_B_TOKEN, solve.FAKE_C_TOKEN]
+    for t, label in zip(known, classify_batch(known)):
+        print(f"{t} -> {label}")
+
+    rng = np.random.default_rng(args.seed)
+    hist = np.zeros(len(LABELS), dtype=np.int64)
+    t0 = time.perf_counter()
+    for lo in range(0, args.count, args.batch):
+        inp = rng.integers(65, 91, size=(min(args.batch, args.count - lo), RAW_LEN), dtype=U8)
+        hist += np.bincount(label_batch(inp), minlength=len(LABELS))
+    elapsed = time.perf_counter() - t0
+    print(f"[+] {args.count} random tokens in {elapsed:.2f}s ({args.count / elapsed:,.0f}/s): "
+          + ", ".join(f"{name}={int(c)}" for name, c in zip(LABELS, hist)))
+
+
+if __name__ == "__main__":
+    main()
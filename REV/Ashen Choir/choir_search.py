@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""Depth-first Ashen Choir token search with per-voice pruning.
+
+Characters are assigned in voice order: at each step the next voice is chosen
+from the incrementally carried state (s0..s3, class accumulator, bucket cursors),
+its unassigned input positions are filled only with letters that make the voice's
+high-nibble check pass (or spend one of the allowed failures), and the state is
+advanced by that one voice. The target class's other requirements (class counts,
+core/late equations) prune as soon as their inputs are known; complete tokens are
+confirmed with solve.classify.
+
+The voice order depends on taint, a byte summed over every character, so the
+search runs once per taint guess and rejects the guess as soon as all characters
+are fixed.
+"""
+
+import argparse
+import os
+import sys
+from functools import lru_cache
+
+from solve import (
+    CORE_A, CORE_B, FOLD_A, FOLD_B, HI_A0, HI_A1, HI_B0, HI_B1, IDX_A, IDX_B, IDX_C,
+    MIX_A, MIX_B, RAW_LEN, ROT_BY, VOICE_COUNT, classify, rotl32,
+)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from primitives import ROTL8, SCRAMBLE_CLS  # noqa: E402
+from shard_search import add_shard_args, run_shards, stopped  # noqa: E402
+
+LETTERS = range(65, 91)
+
+# Per-target: minimum passing voices, required class counts, required lateOk (None: free)
+TARGETS = {
+    "REAL": (24, (6, 7, 3, 8), True),
+    "FAKE_B": (24, None, None),
+    "FAKE_A": (18, (8, 4, 8, 4), False),
+    "FAKE_C": (14, None, None),
+}
+
+V_MIX = [a ^ b for a, b in zip(MIX_A, MIX_B)]
+V_FOLD = [a ^ b for a, b in zip(FOLD_A, FOLD_B)]
+V_T0 = [(a ^ b) & 0xF0 for a, b in zip(HI_A0, HI_B0)]
+V_T1 = [(a ^ b) & 0xF0 for a, b in zip(HI_A1, HI_B1)]
+EXPECTED_CORE = [(a ^ b) & 0xFF for a, b in zip(CORE_A, CORE_B)]
+
+# core[k] as (trace positions, input positions, fn(trace values..., input values...))
+CORE_EQS = (
+    ((2, 17), (0,), lambda t2, t17, i0: (t2 + t17 + i0) & 0xFF == EXPECTED_CORE[0]),
+    ((5, 12), (7,), lambda t5, t12, i7: (t5 ^ t12 ^ i7) & 0xFF == EXPECTED_CORE[1]),
+    ((8, 9, 10), (), lambda t8, t9, t10: (t8 + t9 + t10) & 0xFF == EXPECTED_CORE[2]),
+    ((4, 15), (11,), lambda t4, t15, i11: (t4 - t15 + i11) & 0xFF == EXPECTED_CORE[3]),
+    ((1, 6, 18), (), lambda t1, t6, t18: (t1 ^ t6 ^ t18) & 0xFF == EXPECTED_CORE[4]),
+    ((22,), (3, 14), lambda t22, i3, i14: (i3 + i14 + t22) & 0xFF == EXPECTED_CORE[5]),
+    ((0, 23), (19,), lambda t0, t23, i19: (t0 + i19 - t23) & 0xFF == EXPECTED_CORE[6]),
+)
+LATE_EQ = ((21, 7), (19,), lambda t21, t7, i19: ((t21 ^ t7) + i19) & 0xFF == 159)
+
+
+def voice_lhs(idx, a, b, c):
+    lhs = (ROTL8[ROT_BY[idx]][(a ^ V_MIX[idx]) & 0xFF] + ((b + V_FOLD[idx]) & 0xFF)) & 0xFF
+    return lhs ^ ((c + idx * 7) & 0xFF)
+
+
+def voice_passes(idx, lhs):
+    return ((lhs ^ V_T0[idx]) & 0xF0) == 0 or ((lhs ^ V_T1[idx]) & 0xF0) == 0
+
+
+@lru_cache(maxsize=None)
+def voice_choices(idx, a, b, c, passing):
+    # (a, b, c, lhs) letter triples consistent with the fixed ones (None = free) whose
+    # check passes (or fails, for passing=False)
+    out = []
+    for va in (LETTERS if a is None else (a,)):
+        for vb in (LETTERS if b is None else (b,)):
+            for vc in (LETTERS if c is None else (c,)):
+                lhs = voice_lhs(idx, va, vb, vc)
+                if voice_passes(idx, lhs) == passing:
+                    out.append((va, vb, vc, lhs))
+    return tuple(out)
+
+
+class ChoirSearch:
+    """DFS over one target class; tokens accumulate in self.found."""
+
+    def __init__(self, target="REAL", template=None, limit=1, max_nodes=None, stop=None):
+        if target not in TARGETS:
+            raise ValueError(f"unknown target {target}; choose from {', '.join(TARGETS)}")
+        self.target = target
+        self.min_pass, self.counts, self.late = TARGETS[target]
+        self.limit = limit
+        self.max_nodes = max_nodes
+        self.stop = stop
+        self.halted = False
+        self.nodes = 0
+        self.found = []
+
+        template = template or "????-????-????-????-????"
+        chars = template.replace("-", "")
+        if len(template) != 24 or len(chars) != RAW_LEN or any(template[i] != "-" for i in (4, 9, 14, 19)):
+            raise ValueError("template must look like XXXX-XXXX-XXXX-XXXX-XXXX with '?' for free letters")
+        self.fixed = [None if ch == "?" else ord(ch) for ch in chars]
+        if any(v is not None and not 65 <= v <= 90 for v in self.fixed):
+            raise ValueError("template letters must be A-Z or '?'")
+
+        self.eqs = list(CORE_EQS) if target == "REAL" else []
+        if self.late is not None:
+            want = self.late
+            t_pos, i_pos, fn = LATE_EQ
+            self.eqs.append((t_pos, i_pos, lambda *v, fn=fn, want=want: fn(*v) == want))
+
+    def done(self):
+        return self.halted or (self.limit and len(self.found) >= self.limit) or (self.max_nodes and self.nodes >= self.max_nodes)
+
+    def run(self, taints=range(256)):
+        for taint in taints:
+            if self.done():
+                break
+            self.taint = taint
+            self.inp = list(self.fixed)
+            self.trace = [None] * VOICE_COUNT
+            self.eq_done = [False] * len(self.eqs)
+            if self.taint_ok():
+                self.step(0, 0xA51C39E7, 0xB4D28A6C, 0xC0DEC0DE, 0x9137F00D,
+                          ((taint >> 1) ^ 3) & 3, [0, 0, 0, 0], [0, 0, 0, 0], VOICE_COUNT - self.min_pass)
+        return self.found
+
+    def taint_ok(self):
+        # Once every character is fixed, the guessed taint must be the real one
+        inp = self.inp
+        if None in inp:
+            return True
+        taint = ((sum(inp) & 0xFF) ^ 0x5A) ^ ((inp[1] * 3 + inp[18]) & 0xFF)
+        return taint == self.taint
+
+    def eqs_ok(self):
+        # Check target equations whose trace and input values have all become known
+        trace, inp = self.trace, self.inp
+        for k, (t_pos, i_pos, fn) in enumerate(self.eqs):
+            if self.eq_done[k]:
+                continue
+            if any(trace[p] is None for p in t_pos) or any(inp[p] is None for p in i_pos):
+                continue
+            if not fn(*(trace[p] for p in t_pos), *(inp[p] for p in i_pos)):
+                return False
+        return True
+
+    def step(self, step, s0, s1, s2, s3, class_acc, cursor, counts, slack):
+        if self.done():
+            return
+        self.nodes += 1
+        if self.stop is not None and not self.nodes & 0xFFF and self.stop():
+            self.halted = True
+            return
+        if step == VOICE_COUNT:
+            token = "-".join("".join(map(chr, self.inp[i:i + 4])) for i in range(0, RAW_LEN, 4))
+            if classify(token)[0] == self.target:
+                self.found.append(token)
+            return
+
+        taint = self.taint
+        seed = (class_acc ^ step ^ ((s0 >> (8 * (step & 3))) & 0xFF) ^ (taint if step & 1 else 0xA5)) & 0xFF
+        cls = SCRAMBLE_CLS[seed]
+        if self.counts is not None and counts[cls] >= self.counts[cls]:
+            return
+
+        for off in range(4):
+            b = (cls + off) & 3
+            if cursor[b] < 6:
+                break
+        idx = b + 4 * cursor[b]
+        pa, pb, pc = IDX_A[idx], IDX_B[idx], IDX_C[idx]
+        inp = self.inp
+        saved = (inp[pa], inp[pb], inp[pc])
+
+        cursor[b] += 1
+        counts[cls] += 1
+        for passed in ((1, 0) if slack else (1,)):
+            for va, vb, vc, lhs in voice_choices(idx, saved[0], saved[1], saved[2], bool(passed)):
+                inp[pa], inp[pb], inp[pc] = va, vb, vc
+                self.trace[idx] = lhs
+                if not (self.taint_ok() and self.eqs_ok()):
+                    continue
+
+                n0 = (rotl32((s0 ^ ((lhs + idx * 13) & 0xFF)) + 0x9E3779B9, 5) + 0x7F4A7C15 + idx) & 0xFFFFFFFF
+                n1 = (s1 + (((lhs << 1) & 0xFF) ^ ((idx * 29) & 0xFF) ^ 0xA6)) & 0xFFFFFFFF
+                n1 ^= rotl32(n0, (idx % 7) + 3)
+                n2 = (rotl32((s2 + lhs + n1 + 0x13579BDF) & 0xFFFFFFFF, 7) ^ ((passed & 1) << (idx % 13))) & 0xFFFFFFFF
+                n3 = s3 ^ rotl32((n2 + 0x2468ACE1 + idx) & 0xFFFFFFFF, (idx % 11) + 1)
+                acc = (class_acc + ((lhs ^ taint) & 3) + passed + ((idx >> 2) & 1)) & 3
+
+                self.step(step + 1, n0, n1, n2, n3, acc, cursor, counts, slack - (1 - passed))
+                if self.done():
+                    break
+            if self.done():
+                break
+
+        inp[pa], inp[pb], inp[pc] = saved
+        self.trace[idx] = None
+        cursor[b] -= 1
+        counts[cls] -= 1
+
+
+def search(target="REAL", template=None, limit=1, max_nodes=None):
+    """Tokens classified as target, found by DFS over an optional '?' template."""
+    return ChoirSearch(target, template, limit, max_nodes).run()
+
+
+def search_shard(shard):
+    # shard_search worker: one taint guess
+    target, template, limit, max_nodes, taint = shard
+    srch = ChoirSearch(target, template, limit, max_nodes, stop=stopped)
+    return srch.run((taint,)), srch.nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search Ashen Choir tokens for a target class.")
+    parser.add_argument("--target", default="REAL", choices=sorted(TARGETS))
+    parser.add_argument("--template", default="??HN-CHOR-ECHO-NITE-??RD",
+                        help="Token with '?' for free letters (default: ??HN-CHOR-ECHO-NITE-??RD)")
+    parser.add_argument("--limit", type=int, default=1, help="Stop after this many tokens (0: all)")
+    parser.add_argument("--max-nodes", type=int, default=0,
+                        help="Stop each taint shard after visiting this many nodes (0: no cap)")
+    add_shard_args(parser)
+    args = parser.parse_args()
+
+    ChoirSearch(args.target, args.template)  # validate before forking
+    shards = [(args.target, args.template, args.limit, args.max_nodes or None, taint) for taint in range(256)]
+    res = run_shards(search_shard, shards, args.procs, first_hit=args.first_hit or args.limit == 1)
+    found = res.hits[:args.limit] if args.limit else res.hits
+    for token in found:
+        print(f"{token} -> {classify(token)[0]}")
+    print(f"[+] {len(found)} token(s), {res.candidates} nodes in {res.seconds:.2f}s")
+    if args.stats:
+        print(res.report("taint shards"))
+
+
+if __name__ == "__main__":
+    main()
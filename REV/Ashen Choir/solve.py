@@ -1,5 +1,17 @@
 #!/usr/bin/env python3
 
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from primitives import ROTL8, SCRAMBLE_CLS, opaque_scramble, rotl32, rotl8  # noqa: E402,F401
+from solve_cache import add_cache_args, cached  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# classify() depends on the challenge source, this script and the shared primitives
+SOURCES = (os.path.join(HERE, "choir.c"), os.path.abspath(__file__), os.path.join(os.path.dirname(HERE), "primitives.py"))
+
 VOICE_COUNT = 24
 RAW_LEN = 20
 
@@ -46,20 +58,6 @@ FAKE_B_TOKEN = "DUSK-CHOR-ECHO-NITE-WAIL"
 FAKE_C_TOKEN = "MIST-CHOR-ECHO-NITE-GLEN"
 
 
-def rotl32(v, r):
-    return ((v << r) & 0xFFFFFFFF) | (v >> (32 - r))
-
-
-def rotl8(v, r):
-    return ((v << r) & 0xFF) | (v >> (8 - r))
-
-
-def opaque_scramble(v):
-    y = (v * 0x45D9F3B) & 0xFFFFFFFF
-    y ^= y >> 16
-    return (y * 0x27D4EB2D) & 0xFFFFFFFF
-
-
 def parse_token(token):
     if len(token) != 24:
         return None
@@ -89,7 +87,7 @@ def voice_lhs(inp, idx):
     m = split_byte(MIX_A, MIX_B, idx)
     f = split_byte(FOLD_A, FOLD_B, idx)
     lhs = (
-        rotl8((ord(inp[IDX_A[idx]]) ^ m) & 0xFF, ROT_BY[idx])
+        ROTL8[ROT_BY[idx]][(ord(inp[IDX_A[idx]]) ^ m) & 0xFF]
         + ((ord(inp[IDX_B[idx]]) + f) & 0xFF)
     ) & 0xFF
     lhs ^= (ord(inp[IDX_C[idx]]) + idx * 7) & 0xFF
@@ -131,7 +129,7 @@ def run(token):
             ^ ((st["s0"] >> (8 * (step & 3))) & 0xFF)
             ^ (st["taint"] if (step & 1) else 0xA5)
         ) & 0xFF
-        cls = opaque_scramble(seed) & 3
+        cls = SCRAMBLE_CLS[seed]
         st["classHist"][step] = cls
 
         idx = None
@@ -267,10 +265,20 @@ def classify(token):
     return "DENY", None
 
 
+def classify_all(tokens, use_cache=True):
+    """[(kind, payload)] for each token, cached on disk per token list."""
+    tokens = list(tokens)
+    results = cached("ashen-choir", SOURCES, tokens, lambda: [classify(t) for t in tokens], use_cache)
+    return [tuple(r) for r in results]
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Classify the Ashen Choir reference tokens.")
+    add_cache_args(parser)
+    args = parser.parse_args()
+
     tokens = [REAL_TOKEN, FAKE_A_TOKEN, FAKE_B_TOKEN, FAKE_C_TOKEN]
-    for t in tokens:
-        kind, payload = classify(t)
+    for t, (kind, payload) in zip(tokens, classify_all(tokens, not args.no_cache)):
         print(f"{t} -> {kind}")
         if payload is not None:
             print(f"  {payload}")
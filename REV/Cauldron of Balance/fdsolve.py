@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Small finite-domain constraint solver for byte-valued puzzle variables.
+
+Variables take integer values from explicit domains (usually character codes).
+Constraints are linear equations, XOR / mask / modular relations or arbitrary
+predicates. Search maintains arc consistency after every assignment and always
+branches on the variable with the smallest remaining domain, so chains of
+equations collapse by propagation instead of being enumerated as 36^n.
+"""
+
+from __future__ import annotations
+
+import itertools
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+# Largest number of combinations of the other variables scanned when looking for
+# support; constraints over bigger domains are only checked once fully assigned.
+SUPPORT_LIMIT = 1 << 14
+
+Domains = Dict[str, Set[int]]
+Operand = Union[str, int]
+
+
+class Constraint:
+    """Predicate over a tuple of variables, made arc consistent by support search."""
+
+    def __init__(self, scope: Sequence[str], check: Callable[..., bool]) -> None:
+        self.scope = tuple(scope)
+        self.check = check
+
+    def revise(self, domains: Domains) -> Optional[List[str]]:
+        # Drop unsupported values; returns the variables that shrank, None on a wipe-out
+        changed = []
+        for i, var in enumerate(self.scope):
+            others = [domains[v] for j, v in enumerate(self.scope) if j != i]
+            size = 1
+            for dom in others:
+                size *= len(dom)
+            if size > SUPPORT_LIMIT:
+                continue
+
+            keep = set()
+            for value in domains[var]:
+                for rest in itertools.product(*others):
+                    if self.check(*rest[:i], value, *rest[i:]):
+                        keep.add(value)
+                        break
+            if len(keep) != len(domains[var]):
+                if not keep:
+                    return None
+                domains[var] = keep
+                changed.append(var)
+        return changed
+
+    def satisfied(self, values: Dict[str, int]) -> bool:
+        return self.check(*(values[v] for v in self.scope))
+
+
+class Linear(Constraint):
+    """sum(coeff * var) == rhs, kept bounds consistent for any number of variables."""
+
+    def __init__(self, coeffs: Dict[str, int], rhs: int) -> None:
+        self.coeffs = [(v, c) for v, c in coeffs.items() if c]
+        self.rhs = rhs
+        super().__init__([v for v, _ in self.coeffs], lambda *xs: sum(c * x for (_, c), x in zip(self.coeffs, xs)) == rhs)
+
+    def revise(self, domains: Domains) -> Optional[List[str]]:
+        changed = []
+        again = True
+        while again:
+            again = False
+            lo = hi = 0
+            spans = []
+            for var, c in self.coeffs:
+                a, b = c * min(domains[var]), c * max(domains[var])
+                if a > b:
+                    a, b = b, a
+                spans.append((a, b))
+                lo += a
+                hi += b
+
+            for (var, c), (a, b) in zip(self.coeffs, spans):
+                # c * x must fit rhs minus whatever the other terms can contribute
+                want_lo = self.rhs - (hi - b)
+                want_hi = self.rhs - (lo - a)
+                keep = {x for x in domains[var] if want_lo <= c * x <= want_hi}
+                if len(keep) != len(domains[var]):
+                    if not keep:
+                        return None
+                    domains[var] = keep
+                    if var not in changed:
+                        changed.append(var)
+                    again = True
+                    break
+        return changed
+
+
+class Problem:
+    """Variables, their domains and the constraints between them."""
+
+    def __init__(self) -> None:
+        self.domains: Domains = {}
+        self.constraints: List[Constraint] = []
+        self.watch: Dict[str, List[Constraint]] = {}
+        self.nodes = 0  # propagation rounds, i.e. partial assignments examined
+
+    def add_var(self, name: str, domain: Iterable[int]) -> None:
+        if name in self.domains:
+            raise ValueError(f"duplicate variable: {name}")
+        self.domains[name] = set(domain)
+        self.watch[name] = []
+
+    def add(self, constraint: Constraint) -> Constraint:
+        for var in constraint.scope:
+            if var not in self.domains:
+                raise ValueError(f"unknown variable: {var}")
+            if constraint not in self.watch[var]:
+                self.watch[var].append(constraint)
+        self.constraints.append(constraint)
+        return constraint
+
+    # Constraint helpers; an Operand is a variable name or an integer constant
+
+    def where(self, scope: Sequence[str], check: Callable[..., bool]) -> Constraint:
+        return self.add(Constraint(scope, check))
+
+    def linear(self, coeffs: Dict[str, int], rhs: int) -> Constraint:
+        return self.add(Linear(coeffs, rhs))
+
+    def xor(self, a: Operand, b: Operand, value: int) -> Constraint:
+        return self.binary(a, b, lambda x, y: (x ^ y) == value)
+
+    def mask(self, var: str, mask: int, value: int) -> Constraint:
+        return self.where([var], lambda x: (x & mask) == value)
+
+    def mod(self, coeffs: Dict[str, int], modulus: int, rhs: int) -> Constraint:
+        terms = list(coeffs.items())
+        return self.where([v for v, _ in terms],
+                          lambda *xs: sum(c * x for (_, c), x in zip(terms, xs)) % modulus == rhs % modulus)
+
+    def binary(self, a: Operand, b: Operand, check: Callable[[int, int], bool]) -> Constraint:
+        if isinstance(a, int) and isinstance(b, int):
+            raise ValueError("constraint needs at least one variable")
+        if isinstance(b, int):
+            return self.where([a], lambda x: check(x, b))
+        if isinstance(a, int):
+            return self.where([b], lambda y: check(a, y))
+        return self.where([a, b], check)
+
+    # Solving
+
+    def propagate(self, domains: Domains, queue: List[Constraint]) -> bool:
+        # AC-3 over the constraint queue; False if some domain empties
+        self.nodes += 1
+        pending = set(map(id, queue))
+        while queue:
+            con = queue.pop()
+            pending.discard(id(con))
+            changed = con.revise(domains)
+            if changed is None:
+                return False
+            for var in changed:
+                for other in self.watch[var]:
+                    if other is not con and id(other) not in pending:
+                        pending.add(id(other))
+                        queue.append(other)
+        return True
+
+    def search(self, domains: Domains) -> Iterator[Dict[str, int]]:
+        open_vars = [v for v, dom in domains.items() if len(dom) > 1]
+        if not open_vars:
+            values = {v: next(iter(dom)) for v, dom in domains.items()}
+            if all(con.satisfied(values) for con in self.constraints):
+                yield values
+            return
+
+        var = min(open_vars, key=lambda v: len(domains[v]))
+        for value in sorted(domains[var]):
+            trial = {v: (set(dom) if v != var else {value}) for v, dom in domains.items()}
+            if self.propagate(trial, list(self.watch[var])):
+                yield from self.search(trial)
+
+    def solutions(self) -> Iterator[Dict[str, int]]:
+        """Yield every satisfying assignment, in ascending value order of the branch variables."""
+        domains = {v: set(dom) for v, dom in self.domains.items()}
+        if any(not dom for dom in domains.values()):
+            return
+        if self.propagate(domains, list(self.constraints)):
+            yield from self.search(domains)
+
+    def solve_all(self, limit: Optional[int] = None) -> List[Dict[str, int]]:
+        return list(itertools.islice(self.solutions(), limit))
+
+
+def char_domain(charset: str) -> Tuple[int, ...]:
+    return tuple(ord(ch) for ch in charset)
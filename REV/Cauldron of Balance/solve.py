@@ -1,58 +1,69 @@
 #!/usr/bin/env python3
 
 import argparse
+import os
 import string
 import subprocess
+import sys
+
+from fdsolve import Problem, char_domain
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shard_search import ShardResult, add_shard_args, run_shards  # noqa: E402
+from solve_cache import add_cache_args, cached  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Files the answers depend on: the challenge source and the solver itself
+SOURCES = (os.path.join(HERE, "cauldron.c"), os.path.abspath(__file__), os.path.join(HERE, "fdsolve.py"))
 
 
 CHARSET = string.ascii_lowercase + string.digits
 
 
-def solve() -> list[str]:
-    answers = []
-
-    for ember_ch in CHARSET:
-        ember = ord(ember_ch)
-        for frost_ch in CHARSET:
-            frost = ord(frost_ch)
-            if ember + frost != 150:
-                continue
-
-            for bile_ch in CHARSET:
-                bile = ord(bile_ch)
-                if (bile ^ 0x33) != 95:
-                    continue
-
-                for root_ch in CHARSET:
-                    root = ord(root_ch)
-                    if frost + root != 149:
-                        continue
-                    if bile - root != 11:
-                        continue
-
-                    for mist_ch in CHARSET:
-                        mist = ord(mist_ch)
-                        if root - mist != -13:
-                            continue
-                        if ((ember * 7 + mist) % 26) != 16:
-                            continue
-                        if (mist ^ ember) != 12:
-                            continue
-
-                        for ash_ch in CHARSET:
-                            ash = ord(ash_ch)
-                            if (ash & 0xF) != 3:
-                                continue
-                            if bile + ash != 207:
-                                continue
-                            if ((frost * 3 + ash) % 26) != 21:
-                                continue
-
-                            answers.append(
-                                ember_ch + frost_ch + bile_ch + root_ch + mist_ch + ash_ch
-                            )
-
-    return answers
+# Answer order: one variable per input character
+NAMES = ("ember", "frost", "bile", "root", "mist", "ash")
+
+
+def build_problem(charset: str = CHARSET) -> Problem:
+    prob = Problem()
+    for name in NAMES:
+        prob.add_var(name, char_domain(charset))
+
+    prob.linear({"ember": 1, "frost": 1}, 150)
+    prob.xor("bile", 0x33, 95)
+    prob.linear({"frost": 1, "root": 1}, 149)
+    prob.linear({"bile": 1, "root": -1}, 11)
+    prob.linear({"root": 1, "mist": -1}, -13)
+    prob.mod({"ember": 7, "mist": 1}, 26, 16)
+    prob.xor("mist", "ember", 12)
+    prob.mask("ash", 0xF, 3)
+    prob.linear({"bile": 1, "ash": 1}, 207)
+    prob.mod({"frost": 3, "ash": 1}, 26, 21)
+    return prob
+
+
+def solve_shard(shard: tuple[str, int]) -> tuple[list[str], int]:
+    # shard_search worker: the first input character is fixed to one charset value
+    charset, first = shard
+    prob = build_problem(charset)
+    prob.domains[NAMES[0]] = {first}
+    answers = ["".join(chr(sol[name]) for name in NAMES) for sol in prob.solutions()]
+    return answers, prob.nodes
+
+
+def solve(procs: int | None = 1, first_hit: bool = False,
+          use_cache: bool = True) -> tuple[list[str], ShardResult | None]:
+    # The shard stats are only available (not None) when the search actually ran
+    runs = []
+
+    def compute() -> list[str]:
+        res = run_shards(solve_shard, [(CHARSET, v) for v in char_domain(CHARSET)], procs, first_hit)
+        runs.append(res)
+        # Same order as scanning CHARSET per position
+        return sorted(res.hits, key=lambda ans: [CHARSET.index(ch) for ch in ans])
+
+    answers = cached("cauldron", SOURCES, {"charset": CHARSET, "first_hit": first_hit}, compute, use_cache)
+    return answers, (runs[0] if runs else None)
 
 
 def run_binary(exe_path: str, answer: str) -> None:
@@ -82,12 +93,16 @@ def main() -> None:
         default="Cauldron.exe",
         help="Path to challenge binary (used with --run).",
     )
+    add_shard_args(parser, default_procs=1)
+    add_cache_args(parser)
     args = parser.parse_args()
 
-    answers = solve()
+    answers, res = solve(args.procs, args.first_hit, not args.no_cache)
     print(f"[+] solutions found: {len(answers)}")
     for ans in answers:
         print(f"[+] answer: {ans}")
+    if args.stats:
+        print(res.report("first-character shards") if res else "[+] answers read from the solution cache")
 
     if args.run:
         if len(answers) != 1:
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# Crown of Mirrors batch evaluator: checkReal/checkFake over an (N, 20) uint8 array
+# of flattened star names, one vectorized uint32 pass per character position.
+
+import argparse
+import time
+
+import numpy as np
+
+from solve import (
+    FAKE_INPUT, FAKE_KS, FAKE_TAGS, REAL_INPUT, REAL_KS, REAL_TAGS, STAR_COUNT, checkFake, checkReal,
+)
+from primitives import rol16_np as rol16, rotl32_np as rol32  # on sys.path via solve
+
+U32 = np.uint32
+
+
+def toBatch(texts):
+    # 24-char star names -> (N, 20) uint8; malformed names become all-zero rows (never valid)
+    out = np.zeros((len(texts), STAR_COUNT), dtype=np.uint8)
+    if not len(texts):
+        return out
+    raw = np.frombuffer("".join(t if len(t) == 24 and t.isascii() else "-" * 24 for t in texts).encode(),
+                        dtype=np.uint8).reshape(-1, 24)
+    dashes = (raw[:, [4, 9, 14, 19]] == ord("-")).all(axis=1)
+    letters = np.delete(raw, [4, 9, 14, 19], axis=1)
+    ok = dashes & ((letters >= ord("A")) & (letters <= ord("Z"))).all(axis=1)
+    out[ok] = letters[ok]
+    return out
+
+
+def crownTags(c, tags, ks, r):
+    # Mask of rows whose five group tags match: raw ^ rol16(mix, r) ^ ks[g] == tags[g]
+    ok = np.ones(len(c), dtype=bool)
+    for g in range(5):
+        raw = (c[:, g * 4] << U32(8)) | c[:, g * 4 + 1]
+        mix = (c[:, g * 4 + 2] << U32(8)) | c[:, g * 4 + 3]
+        ok &= (raw ^ rol16(mix, r) ^ U32(ks[g])) == U32(tags[g])
+    return ok
+
+
+def crownRealSig(c):
+    sig = np.full(len(c), 0x811C9DC5, dtype=U32)
+    for i in range(STAR_COUNT):
+        sig ^= (c[:, i] + U32(i * 13)) & U32(0xFF)
+        sig *= U32(0x01000193)
+    return sig ^ U32(0xAE88B2B5)
+
+
+def mirrorRealOk(c):
+    s = c.astype(np.int32)
+    return ((s[:, 0] + s[:, 19] == 159)
+            & (s[:, 3] == s[:, 12])
+            & ((s[:, 4] + s[:, 5] + s[:, 6] - 3 * 65) % 26 == 5)
+            & (s[:, 1] - s[:, 8] == 1)
+            & ((s[:, 10] ^ s[:, 14]) == 26)
+            & (s[:, 7] + s[:, 11] + s[:, 15] == 224))
+
+
+def mirrorRealSig(c):
+    sig = np.full(len(c), 0x9E3779B9, dtype=U32)
+    for i in range(STAR_COUNT):
+        sig = rol32(sig ^ ((c[:, i] + U32(i * 7)) & U32(0xFF)), 5)
+        sig += U32((0x7F4A7C15 + i * 0x1F123BB5) & 0xFFFFFFFF)
+    return sig
+
+
+def crownFakeSig(c):
+    sig = np.full(len(c), 0xA5B3571D, dtype=U32)
+    for i in range(STAR_COUNT):
+        sig ^= c[:, i] * U32(i + 3)
+        sig = rol32(sig, 9)
+        sig += U32(0x10204081 + i * 0x1337)
+    return sig
+
+
+def mirrorFakeOk(c):
+    s = c.astype(np.int32)
+    return ((s[:, 2] + s[:, 17] == 168)
+            & ((s[:, 0] ^ s[:, 19]) == 26)
+            & ((s[:, 4] + s[:, 9] + s[:, 13] - 3 * 65) % 26 == 0)
+            & (s[:, 6] - s[:, 1] == 3)
+            & ((s[:, 10] ^ s[:, 14]) == 14)
+            & (s[:, 3] + s[:, 8] + s[:, 12] == 211))
+
+
+def mirrorFakeSig(c):
+    sig = np.full(len(c), 0x6C8E9CF5, dtype=U32)
+    for i in range(STAR_COUNT):
+        sig += ((c[:, i] ^ U32(i * 17)) & U32(0xFF)) + U32(0x9D)
+        sig = rol32(sig, (i % 11) + 3)
+        sig ^= U32(0x7F4A9E21)
+    return sig
+
+
+def checkBatch(cands, real=True):
+    """Boolean mask of candidates (N, 20) uint8 that pass checkReal (or checkFake)."""
+    c = np.asarray(cands, dtype=np.uint8).astype(U32)
+    if real:
+        ok = crownTags(c, REAL_TAGS, REAL_KS, 3) & mirrorRealOk(c)
+    else:
+        ok = crownTags(c, FAKE_TAGS, FAKE_KS, 5) & mirrorFakeOk(c)
+    # Signatures only for the survivors of the cheap checks
+    idx = np.flatnonzero(ok)
+    if not len(idx):
+        return ok
+    s = c[idx]
+    with np.errstate(over="ignore"):
+        if real:
+            sigA = crownRealSig(s)
+            final = (sigA ^ rol32(mirrorRealSig(s), 7)) + U32(0x27D4EB2D) == U32(0x613283A6)
+        else:
+            sigA = crownFakeSig(s)
+            final = (sigA ^ rol32(mirrorFakeSig(s), 3)) + U32(0x31D9BEEF) == U32(0x628E1F60)
+    ok[idx] = final & (sigA != 0)
+    return ok
+
+
+def checkRealBatch(cands):
+    return checkBatch(cands, True)
+
+
+def checkFakeBatch(cands):
+    return checkBatch(cands, False)
+
+
+def signatureBatch(cands, real=True):
+    # Both signatures for every row (no gating), for cross-checking against solve.py
+    c = np.asarray(cands, dtype=np.uint8).astype(U32)
+    with np.errstate(over="ignore"):
+        if real:
+            return crownRealSig(c), mirrorRealSig(c)
+        return crownFakeSig(c), mirrorFakeSig(c)
+
+
+def buildParser():
+    parser = argparse.ArgumentParser(description="Vectorized Crown of Mirrors candidate checks.")
+    parser.add_argument("--count", type=int, default=2_000_000, help="Random candidates to evaluate")
+    parser.add_argument("--batch", type=int, default=1 << 20, help="Rows per vectorized batch")
+    parser.add_argument("--fake", action="store_true", help="Use the decoy path checks")
+    parser.add_argument("--seed", type=int, default=1)
+    return parser
+
+
+def main():
+    args = buildParser().parse_args()
+    real = not args.fake
+    known = REAL_INPUT if real else FAKE_INPUT
+    ref = checkReal if real else checkFake
+
+    probe = toBatch([known, known.lower(), known[:-1] + "A"])
+    assert checkBatch(probe, real).tolist() == [ref(known), False, ref(known[:-1] + "A")]
+
+    rng = np.random.default_rng(args.seed)
+    hits = 0
+    t0 = time.perf_counter()
+    for lo in range(0, args.count, args.batch):
+        n = min(args.batch, args.count - lo)
+        cands = rng.integers(ord("A"), ord("Z") + 1, size=(n, STAR_COUNT), dtype=np.uint8)
+        cands[0] = probe[0]
+        hits += int(checkBatch(cands, real).sum())
+    elapsed = time.perf_counter() - t0
+
+    print(f"[+] {'real' if real else 'fake'} path: {args.count} candidates in {elapsed:.2f}s "
+          f"({args.count / elapsed / 1e6:.1f} M/s), {hits} valid (includes the known input per batch)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,13 @@
 #!/usr/bin/env python3
 
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from primitives import rol16, rol16_table, rotl32 as rol32  # noqa: E402,F401
+from shard_search import add_shard_args, run_shards, stopped, usable_cpus  # noqa: E402
+
 STAR_COUNT = 20
 REAL_INPUT = "VEGA-RIGL-DENB-ALTR-SIRI"
 FAKE_INPUT = "NOVA-LYRA-ORIO-CYGN-ARCT"
@@ -14,13 +22,35 @@ FAKE_ENC = bytes([
     0xCA, 0x05, 0x13, 0xAA, 0x01, 0x7F,
 ])
 
+REAL_TAGS = (0x9720, 0xFB37, 0x8BC0, 0x6488, 0x48CF)
+REAL_KS = (0xFB6F, 0x931C, 0xBD97, 0x8756, 0x89CC)
+FAKE_TAGS = (0x09EB, 0xBE83, 0x553D, 0xCEA3, 0xFB4D)
+FAKE_KS = (0x8F8E, 0xBAF0, 0x3386, 0x6432, 0xD097)
+
+# Cross-group mirror constraints as (positions, predicate on their character codes)
+REAL_LINKS = (
+    ((0, 19), lambda a, b: a + b == 159),
+    ((3, 12), lambda a, b: a ^ b == 0),
+    ((4, 5, 6), lambda a, b, c: (a + b + c - 3 * 65) % 26 == 5),
+    ((1, 8), lambda a, b: a - b == 1),
+    ((10, 14), lambda a, b: a ^ b == 26),
+    ((7, 11, 15), lambda a, b, c: a + b + c == 224),
+)
 
-def rol32(v, r):
-    return ((v << r) & 0xFFFFFFFF) | (v >> (32 - r))
+FAKE_LINKS = (
+    ((2, 17), lambda a, b: a + b == 168),
+    ((0, 19), lambda a, b: a ^ b == 26),
+    ((4, 9, 13), lambda a, b, c: (a + b + c - 3 * 65) % 26 == 0),
+    ((6, 1), lambda a, b: a - b == 3),
+    ((10, 14), lambda a, b: a ^ b == 14),
+    ((3, 8, 12), lambda a, b, c: a + b + c == 211),
+)
 
+LETTER_PAIRS = [(a << 8) | b for a in range(65, 91) for b in range(65, 91)]
 
-def rol16(v, r):
-    return ((v << r) & 0xFFFF) | (v >> (16 - r))
+
+ROL16_3 = rol16_table(3)
+ROL16_5 = rol16_table(5)
 
 
 def flattenStars(text):
@@ -51,13 +81,13 @@ def xorDecrypt(enc):
 
 
 def crownReal(c):
-    tags = [0x9720, 0xFB37, 0x8BC0, 0x6488, 0x48CF]
-    ks = [0xFB6F, 0x931C, 0xBD97, 0x8756, 0x89CC]
+    tags = REAL_TAGS
+    ks = REAL_KS
 
     for g in range(5):
         raw = (ord(c[g * 4]) << 8) | ord(c[g * 4 + 1])
         mix = (ord(c[g * 4 + 2]) << 8) | ord(c[g * 4 + 3])
-        calc = raw ^ rol16(mix, 3) ^ ks[g]
+        calc = raw ^ ROL16_3[mix] ^ ks[g]
         if calc != tags[g]:
             return 0
 
@@ -104,13 +134,13 @@ def checkReal(text):
 
 
 def crownFake(c):
-    tags = [0x09EB, 0xBE83, 0x553D, 0xCEA3, 0xFB4D]
-    ks = [0x8F8E, 0xBAF0, 0x3386, 0x6432, 0xD097]
+    tags = FAKE_TAGS
+    ks = FAKE_KS
 
     for g in range(5):
         raw = (ord(c[g * 4]) << 8) | ord(c[g * 4 + 1])
         mix = (ord(c[g * 4 + 2]) << 8) | ord(c[g * 4 + 3])
-        calc = raw ^ rol16(mix, 5) ^ ks[g]
+        calc = raw ^ ROL16_5[mix] ^ ks[g]
         if calc != tags[g]:
             return 0
 
@@ -157,15 +187,101 @@ def checkFake(text):
     return ((sigA ^ rol32(sigB, 3)) + 0x31D9BEEF) & 0xFFFFFFFF == 0x628E1F60
 
 
+def groupIndex(tag, k, r):
+    # Required raw value -> mix pairs that satisfy raw ^ rol16(mix, r) ^ k == tag
+    index = {}
+    rot = rol16_table(r)
+    for mix in LETTER_PAIRS:
+        index.setdefault(tag ^ k ^ rot[mix], []).append(mix)
+    return index
+
+
+def groupCandidates(tag, k, r):
+    # Every uppercase 4-char group passing its tag, as bytes
+    index = groupIndex(tag, k, r)
+    out = []
+    for raw in LETTER_PAIRS:
+        for mix in index.get(raw, ()):
+            out.append(bytes([raw >> 8, raw & 0xFF, mix >> 8, mix & 0xFF]))
+    return out
+
+
+def crownSearch(real=True, part=0, parts=1):
+    # Join the per-group candidate lists under the mirror constraints, then check the signatures.
+    # Only every parts-th candidate of the first-placed group (from part) is tried, so
+    # disjoint (part, parts) slices cover the whole space. Returns (found, placements).
+    if real:
+        tags, ks, r, links, check = REAL_TAGS, REAL_KS, 3, REAL_LINKS, checkReal
+    else:
+        tags, ks, r, links, check = FAKE_TAGS, FAKE_KS, 5, FAKE_LINKS, checkFake
+
+    cands = [groupCandidates(tags[g], ks[g], r) for g in range(5)]
+    order = sorted(range(5), key=lambda g: len(cands[g]))
+    cands[order[0]] = cands[order[0]][part::parts]
+
+    # Each constraint is tested at the depth where its last group gets placed
+    due = [[] for _ in order]
+    for pos, fn in links:
+        due[max(order.index(p // 4) for p in pos)].append((pos, fn))
+
+    found = []
+    tried = 0
+    c = bytearray(STAR_COUNT)
+
+    def place(depth):
+        nonlocal tried
+        if depth == len(order):
+            text = "-".join(c[i:i + 4].decode() for i in range(0, STAR_COUNT, 4))
+            if check(text):
+                found.append(text)
+            return
+        g = order[depth]
+        for quad in cands[g]:
+            tried += 1
+            c[g * 4:g * 4 + 4] = quad
+            if all(fn(*(c[p] for p in pos)) for pos, fn in due[depth]):
+                place(depth + 1)
+            if depth == 0 and stopped():
+                return
+
+    place(0)
+    return sorted(found), tried
+
+
+def crownShard(shard):
+    # shard_search worker
+    real, part, parts = shard
+    return crownSearch(real, part, parts)
+
+
+def solveCrown(real=True, procs=1, firstHit=False):
+    parts = max(1, procs or usable_cpus()) * 4
+    res = run_shards(crownShard, [(real, part, parts) for part in range(parts)], procs, firstHit)
+    return sorted(res.hits), res
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Check and solve the Crown of Mirrors gates.")
+    add_shard_args(parser, default_procs=1)
+    args = parser.parse_args()
+
+    realSolved, realRes = solveCrown(True, args.procs, args.first_hit)
+    fakeSolved, fakeRes = solveCrown(False, args.procs, args.first_hit)
+
     print("Real input:", REAL_INPUT)
     print("Real gate valid:", checkReal(REAL_INPUT))
     print("Real decrypt:", xorDecrypt(REAL_ENC))
+    print("Real solved:", ", ".join(realSolved) or "none")
     print()
     print("Fake input:", FAKE_INPUT)
     print("Fake gate valid:", checkFake(FAKE_INPUT))
     print("Fake decrypt:", xorDecrypt(FAKE_ENC))
+    print("Fake solved:", ", ".join(fakeSolved) or "none")
+    if args.stats:
+        print()
+        print(realRes.report("real solve"))
+        print(fakeRes.report("fake solve"))
 
 
 if __name__ == "__main__":
-    main()
+    main()
@@ -1,29 +1,40 @@
 #!/usr/bin/env python3
 
 import argparse
-import re
+import contextlib
+import os
 import subprocess
+import sys
 from pathlib import Path
+from typing import BinaryIO
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from c_arrays import load_arrays, scan_arrays  # noqa: E402
+from solve_cache import add_cache_args, cached  # noqa: E402
 
-def parseHexArray(src: str, name: str) -> list[int]:
-    pattern = rf"static const uint8_t {re.escape(name)}\[[^\]]*\]\s*=\s*\{{(.*?)\}};"
-    match = re.search(pattern, src, re.S)
-    if not match:
-        raise ValueError(f"array '{name}' not found")
+DECODE_CHUNK = 1 << 20
+C_ARRAYS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "c_arrays.py")
 
-    hexVals = re.findall(r"0x([0-9A-Fa-f]{2})", match.group(1))
-    if not hexVals:
+
+def requireArray(arrays: dict[str, bytes], name: str) -> bytes:
+    if name not in arrays:
+        raise ValueError(f"array '{name}' not found")
+    if not arrays[name]:
         raise ValueError(f"array '{name}' is empty or unparsable")
+    return arrays[name]
 
-    return [int(v, 16) for v in hexVals]
+
+def parseHexArray(src: str, name: str) -> list[int]:
+    # Single-array lookup; loadFromSource scans every array in one pass instead
+    return list(requireArray(scan_arrays(src), name))
 
 
-def buildInverseMap(runeMap: list[int]) -> list[int]:
+def buildInverseMap(runeMap: bytes | list[int]) -> bytes:
+    # 256-byte bytes.translate table mapping each encoded byte back to its plain byte
     if len(runeMap) != 256:
         raise ValueError(f"runeMap length must be 256, got {len(runeMap)}")
 
-    inv = [0] * 256
+    inv = bytearray(256)
     seen = [False] * 256
 
     for plain, enc in enumerate(runeMap):
@@ -32,19 +43,31 @@ def buildInverseMap(runeMap: list[int]) -> list[int]:
         seen[enc] = True
         inv[enc] = plain
 
-    return inv
+    return bytes(inv)
+
+
+def decodeBytes(encoded: bytes | list[int], invMap: bytes) -> str:
+    return bytes(encoded).translate(invMap).decode("ascii")
 
 
-def decodeBytes(encoded: list[int], invMap: list[int]) -> str:
-    raw = bytes(invMap[b] for b in encoded)
-    return raw.decode("ascii")
+def decodeStream(src: BinaryIO, dst: BinaryIO, invMap: bytes, chunkSize: int = DECODE_CHUNK) -> int:
+    # Decode a rune-encoded stream chunk by chunk into dst; returns the byte count.
+    # Memory stays at one chunk buffer however large the input is.
+    buf = bytearray(chunkSize)
+    total = 0
+    while True:
+        n = src.readinto(buf)
+        if not n:
+            return total
+        dst.write((buf if n == chunkSize else buf[:n]).translate(invMap))
+        total += n
 
 
-def loadFromSource(sourcePath: Path) -> tuple[str, str]:
-    src = sourcePath.read_text(encoding="utf-8")
-    runeMap = parseHexArray(src, "runeMap")
-    inscription = parseHexArray(src, "inscription")
-    flagRunes = parseHexArray(src, "flagRunes")
+def decodeSource(sourcePath: Path) -> tuple[str, str]:
+    arrays = load_arrays(sourcePath)
+    runeMap = requireArray(arrays, "runeMap")
+    inscription = requireArray(arrays, "inscription")
+    flagRunes = requireArray(arrays, "flagRunes")
 
     invMap = buildInverseMap(runeMap)
     answer = decodeBytes(inscription, invMap)
@@ -52,6 +75,13 @@ def loadFromSource(sourcePath: Path) -> tuple[str, str]:
     return answer, flag
 
 
+def loadFromSource(sourcePath: Path, useCache: bool = True) -> tuple[str, str]:
+    # Keyed on the source, this script and c_arrays.py, so a regenerated rune.c is decoded again
+    answer, flag = cached("rune-translation", [sourcePath, __file__, C_ARRAYS_PATH], None,
+                          lambda: decodeSource(sourcePath), useCache)
+    return answer, flag
+
+
 def runBinary(exePath: Path, answer: str) -> None:
     proc = subprocess.run(
         [str(exePath)],
@@ -85,10 +115,30 @@ def main() -> None:
         default="RuneTranslation.exe",
         help="Binary path used with --run (default: RuneTranslation.exe)",
     )
+    parser.add_argument(
+        "--decode",
+        metavar="FILE",
+        help="Stream-decode a rune-encoded file with the source's runeMap instead of solving ('-' for stdin)",
+    )
+    parser.add_argument(
+        "--out",
+        default="-",
+        help="Output path for --decode (default: stdout)",
+    )
+    add_cache_args(parser)
     args = parser.parse_args()
 
     sourcePath = Path(args.source)
-    answer, flag = loadFromSource(sourcePath)
+    if args.decode:
+        invMap = buildInverseMap(requireArray(load_arrays(sourcePath), "runeMap"))
+        with contextlib.ExitStack() as stack:
+            src = sys.stdin.buffer if args.decode == "-" else stack.enter_context(open(args.decode, "rb"))
+            dst = sys.stdout.buffer if args.out == "-" else stack.enter_context(open(args.out, "wb"))
+            total = decodeStream(src, dst, invMap)
+        print(f"[+] decoded {total} bytes", file=sys.stderr)
+        return
+
+    answer, flag = loadFromSource(sourcePath, not args.no_cache)
 
     print(f"[+] answer: {answer}")
     print(f"[+] flag:   {flag}")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Extract `static const uint8_t name[...] = { ... };` tables from C sources.
+
+The whole file is scanned once: a single compiled pattern walks every uint8_t
+initializer in order (file-scope or function-local, any number of dimensions,
+hex or decimal values with u/U/l/L suffixes, comments allowed in the body), and
+each body is turned into bytes on the spot. Multi-dimensional tables come back
+flattened in row-major order. When a name is declared twice (function-local
+tables in different functions), the first one wins.
+
+Anything in a body that is not a plain integer literal (a char constant, an
+expression, a negative number) raises ValueError rather than being skipped, as
+does a value count that differs from a numeric declared size.
+
+Examples:
+  python c_arrays.py rune.c
+  python c_arrays.py --names ../*/*.c
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+ARRAY_RE = re.compile(
+    rb"\bstatic\s+const\s+uint8_t\s+(\w+)\s*((?:\[[^\]]*\]\s*)+)=\s*\{(.*?)\}\s*;",
+    re.S,
+)
+COMMENT_RE = re.compile(rb"/\*.*?\*/|//[^\n]*", re.S)
+DIM_RE = re.compile(rb"\[\s*([^\]]*?)\s*\]")
+VALUE_RE = re.compile(rb"(?:0[xX]([0-9A-Fa-f]+)|0([0-7]*)|([1-9][0-9]*))[uUlL]*")
+BRACES_TO_COMMAS = bytes.maketrans(b"{}", b",,")
+# Bodies that are nothing but two-digit hex bytes once squeezed go through bytes.fromhex
+SQUEEZE = b" \t\r\n{}uUlL"
+HEX_BYTES_RE = re.compile(rb"(?:0[xX][0-9A-Fa-f]{2},)*")
+
+
+def declared_size(dims: bytes) -> Optional[int]:
+    # Element count of "[4][6]"-style dimensions, None if any is symbolic or empty
+    size = 1
+    for dim in DIM_RE.findall(dims):
+        if not dim.isdigit():
+            return None
+        size *= int(dim)
+    return size
+
+
+def _parse_values(body: bytes, name: str) -> bytes:
+    out = bytearray()
+    for tok in body.translate(BRACES_TO_COMMAS).split(b","):
+        tok = tok.strip()
+        if not tok:
+            continue
+        m = VALUE_RE.fullmatch(tok)
+        if m is None:
+            raise ValueError(f"array '{name}' has a non-literal value: {tok.decode('latin-1')!r}")
+        hex_val, oct_val, dec_val = m.groups()
+        v = int(hex_val, 16) if hex_val else int(dec_val) if dec_val else int(oct_val or b"0", 8)
+        if v > 0xFF:
+            raise ValueError(f"array '{name}' has a value out of uint8_t range: {v}")
+        out.append(v)
+    return bytes(out)
+
+
+def parse_body(body: bytes, name: str = "?", size: Optional[int] = None) -> bytes:
+    """Bytes of an initializer body; size, when given, must match the value count."""
+    data = None
+    if b"/" in body:
+        body = COMMENT_RE.sub(b" ", body)
+    else:
+        squeezed = body.translate(None, SQUEEZE)
+        if not squeezed.endswith(b","):
+            squeezed += b","
+        if HEX_BYTES_RE.fullmatch(squeezed):
+            data = bytes.fromhex(squeezed.replace(b"0x", b"").replace(b"0X", b"").replace(b",", b"").decode())
+    if data is None:
+        data = _parse_values(body, name)
+    if size is not None and len(data) != size:
+        raise ValueError(f"array '{name}' is declared with {size} value(s) but has {len(data)}")
+    return data
+
+
+def scan_arrays(src: Union[str, bytes]) -> Dict[str, bytes]:
+    """Every uint8_t initializer in src, as {name: bytes}, from one pass over the text."""
+    if isinstance(src, str):
+        src = src.encode("utf-8")
+    arrays: Dict[str, bytes] = {}
+    for m in ARRAY_RE.finditer(src):
+        name = m.group(1).decode("ascii")
+        if name not in arrays:
+            arrays[name] = parse_body(m.group(3), name, declared_size(m.group(2)))
+    return arrays
+
+
+def load_arrays(path: Union[str, Path]) -> Dict[str, bytes]:
+    """scan_arrays() over a file, read once as raw bytes."""
+    return scan_arrays(Path(path).read_bytes())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="List the uint8_t tables defined in C sources.")
+    parser.add_argument("sources", nargs="+", help="C source files")
+    parser.add_argument("--names", action="store_true", help="Only print names and lengths")
+    args = parser.parse_args()
+
+    for src in args.sources:
+        arrays = load_arrays(src)
+        print(f"{src}: {len(arrays)} array(s)")
+        for name, data in arrays.items():
+            print(f"  {name}[{len(data)}]" + ("" if args.names else f" = {data.hex()}"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
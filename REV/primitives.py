@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Rotate / scramble primitives shared by the REV solvers.
+
+Scalar functions keep the exact arithmetic of the solver scripts they replace
+(rotl32 in particular does not mask its input, which Ashen Choir relies on).
+Where the domain is small the hot paths index precomputed tables instead:
+
+    ROTL8[r][v], ROTR8[r][v]   8-bit rotates, 256-entry bytes per amount
+    rol16_table(r)[v]          16-bit rotate by a fixed amount, 65536 entries
+    SCRAMBLE[v]                opaque_scramble() over byte seeds
+    SCRAMBLE_CLS[v]            SCRAMBLE[v] & 3, the voice class run() uses
+
+The *_np variants take NumPy uint32 arrays (NumPy is optional and only needed
+for those). They stay arithmetic: a gather from a 256/65536-entry table is
+several times slower than the shift/or it replaces once the work is already
+vectorized, so only the byte-seed scramble is tabulated there (SCRAMBLE_CLS_NP).
+"""
+
+from array import array
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+M32 = 0xFFFFFFFF
+
+
+def rotl32(v, r):
+    return ((v << r) & M32) | (v >> (32 - r))
+
+
+def rotl8(v, r):
+    return ((v << r) & 0xFF) | (v >> (8 - r))
+
+
+def rotr8(v, r):
+    return ((v >> r) | ((v << (8 - r)) & 0xFF)) & 0xFF
+
+
+def rol16(v, r):
+    return ((v << r) & 0xFFFF) | (v >> (16 - r))
+
+
+def opaque_scramble(v):
+    y = (v * 0x45D9F3B) & M32
+    y ^= y >> 16
+    return (y * 0x27D4EB2D) & M32
+
+
+# Amount 0 is included so ROTL8[r] works for every r in 0..7
+ROTL8 = tuple(bytes(rotl8(v, r) if r else v for v in range(256)) for r in range(8))
+ROTR8 = tuple(bytes(rotr8(v, r) if r else v for v in range(256)) for r in range(8))
+SCRAMBLE = tuple(opaque_scramble(v) for v in range(256))
+SCRAMBLE_CLS = bytes(s & 3 for s in SCRAMBLE)
+
+
+@lru_cache(maxsize=None)
+def rol16_table(r):
+    """65536-entry table of rol16(v, r), built on first use per amount."""
+    return array("H", [((v << r) & 0xFFFF) | (v >> (16 - r)) for v in range(0x10000)])
+
+
+if np is not None:
+    U32 = np.uint32
+    SCRAMBLE_CLS_NP = np.frombuffer(SCRAMBLE_CLS, dtype=np.uint8).astype(U32)
+
+    def rotl32_np(v, r):
+        # v: uint32 array, r: int or uint32 array (wraps, unlike the scalar rotl32)
+        r = np.asarray(r, dtype=U32)
+        return (v << r) | (v >> (U32(32) - r))
+
+    def rotl8_np(v, r):
+        # v: uint32 byte values, r: int or uint32 array of amounts in 1..7
+        r = np.asarray(r, dtype=U32)
+        return ((v << r) & U32(0xFF)) | (v >> (U32(8) - r))
+
+    def rotr8_np(v, r):
+        r = np.asarray(r, dtype=U32)
+        return (v >> r) | ((v << (U32(8) - r)) & U32(0xFF))
+
+    def rol16_np(v, r):
+        # v: uint32 16-bit values, r: fixed amount
+        return ((v << U32(r)) & U32(0xFFFF)) | (v >> U32(16 - r))
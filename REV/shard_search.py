@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Process-pool driver shared by the REV solvers.
+
+A solver splits its candidate space into shards (a first character, a first
+group, a guessed state byte, ...) and supplies a module-level worker that
+searches one shard and returns (hits, candidates_tried). run_shards() fans the
+shards out over a ProcessPoolExecutor, collects the hits in shard order and
+tallies candidates/second per worker process.
+
+With first_hit=True the driver stops as soon as any shard reports a hit: queued
+shards are cancelled and running ones see stopped() turn True, which long
+searches should poll every few thousand candidates.
+
+Solvers live one directory down, so they import this module with:
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+Worker = Callable[[Any], Tuple[List[Any], int]]
+
+_stop_event = None
+
+
+def _init_worker(event) -> None:
+    global _stop_event
+    _stop_event = event
+
+
+def usable_cpus() -> int:
+    """CPUs this process may run on (its affinity mask, not the machine's core count)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def stopped() -> bool:
+    """True once the driver has asked running shards to give up (first_hit mode)."""
+    return _stop_event is not None and _stop_event.is_set()
+
+
+@dataclass
+class WorkerStats:
+    pid: int
+    shards: int = 0
+    candidates: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.candidates / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass
+class ShardResult:
+    hits: List[Any] = field(default_factory=list)
+    candidates: int = 0
+    seconds: float = 0.0
+    shards_done: int = 0
+    shards_total: int = 0
+    cancelled: bool = False
+    workers: Dict[int, WorkerStats] = field(default_factory=dict)
+
+    @property
+    def rate(self) -> float:
+        return self.candidates / self.seconds if self.seconds > 0 else 0.0
+
+    def report(self, label: str = "search") -> str:
+        lines = [f"[+] {label}: {self.candidates} candidates in {self.seconds:.2f}s "
+                 f"({self.rate:,.0f}/s), {self.shards_done}/{self.shards_total} shards"
+                 + (", stopped at first hit" if self.cancelled and self.shards_done < self.shards_total else "")]
+        for st in sorted(self.workers.values(), key=lambda s: s.pid):
+            lines.append(f"    worker {st.pid}: {st.shards} shards, {st.candidates} candidates, {st.rate:,.0f}/s")
+        return "\n".join(lines)
+
+
+def _run_one(worker: Worker, shard: Any) -> Tuple[int, List[Any], int, float]:
+    t0 = time.perf_counter()
+    hits, count = worker(shard)
+    return os.getpid(), list(hits), count, time.perf_counter() - t0
+
+
+def run_shards(worker: Worker, shards: Sequence[Any], procs: Optional[int] = None,
+               first_hit: bool = False) -> ShardResult:
+    """Run worker(shard) for every shard on up to procs processes (default: usable_cpus()).
+
+    worker must be a module-level function so it can be pickled. procs=1 runs the
+    shards inline in this process, which is also the fastest choice for tiny spaces.
+    """
+    shards = list(shards)
+    procs = max(1, min(procs or usable_cpus(), len(shards) or 1))
+    res = ShardResult(shards_total=len(shards))
+    per_shard: List[Optional[List[Any]]] = [None] * len(shards)
+
+    def record(i: int, pid: int, hits: List[Any], count: int, secs: float) -> None:
+        per_shard[i] = hits
+        res.candidates += count
+        res.shards_done += 1
+        st = res.workers.setdefault(pid, WorkerStats(pid))
+        st.shards += 1
+        st.candidates += count
+        st.seconds += secs
+
+    t0 = time.perf_counter()
+    if procs == 1:
+        for i, shard in enumerate(shards):
+            record(i, *_run_one(worker, shard))
+            if first_hit and per_shard[i]:
+                res.cancelled = res.shards_done < len(shards)
+                break
+    else:
+        event = multiprocessing.Event()
+        pool = ProcessPoolExecutor(max_workers=procs, initializer=_init_worker, initargs=(event,))
+        try:
+            pending = {pool.submit(_run_one, worker, shard): i for i, shard in enumerate(shards)}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                hit = False
+                for fut in done:
+                    i = pending.pop(fut)
+                    record(i, *fut.result())
+                    hit = hit or bool(per_shard[i])
+                if first_hit and hit:
+                    if pending:
+                        event.set()
+                        # Running shards cannot be cancelled; they finish (or poll stopped()) and count as done
+                        res.cancelled = any([fut.cancel() for fut in pending])
+                    # Shards already running still report what they searched
+                    for fut in wait(pending)[0]:
+                        if not fut.cancelled():
+                            record(pending[fut], *fut.result())
+                    break
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    res.seconds = time.perf_counter() - t0
+
+    for hits in per_shard:
+        if hits:
+            res.hits.extend(hits)
+    return res
+
+
+def add_shard_args(parser, default_procs: Optional[int] = None) -> None:
+    """--procs / --first-hit / --stats options shared by the solver CLIs."""
+    default = "all usable cores" if default_procs is None else f"{default_procs}; 0 uses all usable cores"
+    parser.add_argument("--procs", type=int, default=default_procs,
+                        help=f"Worker processes (default: {default}; 1 runs inline)")
+    parser.add_argument("--first-hit", action="store_true", help="Stop as soon as any shard finds a solution")
+    parser.add_argument("--stats", action="store_true", help="Print candidates/second per worker")
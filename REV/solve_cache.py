@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Content-addressed on-disk cache for REV solver results.
+
+An entry's key is a SHA-256 over the solver name, the contents of every source
+file it depends on (the challenge .c file and the solver scripts themselves)
+and its JSON-encoded parameters. Editing or regenerating any of those files
+changes the key, so stale results are never read back and need no explicit
+invalidation; old entries are simply left behind.
+
+Entries are JSON files under REV_SOLVE_CACHE (default ~/.cache/rev-solve),
+written atomically. Set REV_SOLVE_CACHE=off to disable caching everywhere.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from typing import Any, Callable, Optional, Sequence
+
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "rev-solve")
+
+
+def cache_dir() -> Optional[str]:
+    path = os.environ.get("REV_SOLVE_CACHE", DEFAULT_DIR)
+    return None if path.lower() in ("", "0", "off", "none") else path
+
+
+@lru_cache(maxsize=None)
+def _file_hash(path: str, mtime_ns: int, size: int) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def file_hash(path) -> str:
+    """SHA-256 of a file's contents ('' if missing), memoized per (path, mtime, size)."""
+    path = os.path.abspath(path)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return ""
+    return _file_hash(path, st.st_mtime_ns, st.st_size)
+
+
+def cache_key(name: str, sources: Sequence, params: Any = None) -> str:
+    h = hashlib.sha256()
+    h.update(name.encode())
+    for src in sources:
+        h.update(b"\0" + file_hash(src).encode())
+    h.update(b"\0" + json.dumps(params, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def entry_path(key: str, root: str) -> str:
+    return os.path.join(root, key[:2], key + ".json")
+
+
+def load(key: str) -> Any:
+    # Cached value, or KeyError on a miss (a corrupt entry counts as a miss)
+    root = cache_dir()
+    if root is None:
+        raise KeyError(key)
+    try:
+        with open(entry_path(key, root), "r", encoding="utf-8") as f:
+            return json.load(f)["value"]
+    except (OSError, ValueError, KeyError):
+        raise KeyError(key) from None
+
+
+def store(key: str, value: Any) -> None:
+    root = cache_dir()
+    if root is None:
+        return
+    path = entry_path(key, root)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"value": value}, f)
+        os.replace(tmp, path)
+    except OSError:
+        # A read-only or full cache directory only costs the speedup
+        pass
+
+
+def cached(name: str, sources: Sequence, params: Any, compute: Callable[[], Any], use_cache: bool = True) -> Any:
+    """compute()'s result, read from the cache when sources and params are unchanged.
+
+    The result must survive a JSON round trip (tuples come back as lists).
+    use_cache=False recomputes and refreshes the entry.
+    """
+    key = cache_key(name, sources, params)
+    if use_cache:
+        try:
+            return load(key)
+        except KeyError:
+            pass
+    value = compute()
+    store(key, value)
+    return value
+
+
+def add_cache_args(parser) -> None:
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Recompute instead of reading the solution cache (the entry is refreshed)")
@@ -0,0 +1,157 @@
+# Unknown Runes ISA batch assembler
+# Assembles many .asm sources across a process pool in one invocation,
+# skipping sources whose hash (and assembler options) match the last build
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from asmISA import UnknownRunesAsm
+
+# Tool sources folded into every cache key, so assembler changes rebuild everything
+TOOLSRC = ('asmISA.py', 'runeImg.py')
+CACHEFILE = '.runecache.json'
+
+
+def sha256File(fPath: str) -> Optional[str]:
+    # Hex digest of a file, or None if it does not exist
+    try:
+        with open(fPath, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def toolHash() -> str:
+    # Hash of the assembler itself
+    here = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha256()
+    for name in TOOLSRC:
+        h.update((sha256File(os.path.join(here, name)) or '').encode())
+    return h.hexdigest()
+
+
+def outPathFor(srcPath: str, outDir: Optional[str]) -> str:
+    # Same naming as asmISA.py: <source>.rune, optionally redirected into outDir
+    outPath = srcPath.rsplit('.', 1)[0] + '.rune'
+    if outDir:
+        outPath = os.path.join(outDir, os.path.basename(outPath))
+    return outPath
+
+
+def asmJob(srcPath: str, outPath: str, container: bool, syms: bool,
+           prune: bool) -> Tuple[str, int, List[str]]:
+    # Worker: assemble one source and write it; returns (source, size or -1, errors)
+    # Per-source failures (unreadable file, unencodable .DS, ...) are reported, not raised,
+    # so one bad source cannot take down the batch and its cache update
+    asm = UnknownRunesAsm()
+    try:
+        with contextlib.redirect_stderr(io.StringIO()):
+            if container:
+                prog = asm.imgFile(srcPath, syms=syms, prune=prune)
+            else:
+                prog = asm.asmFile(srcPath, prune=prune)
+        if prog is None:
+            return srcPath, -1, asm.errs
+        with open(outPath, 'wb') as f:
+            f.write(prog)
+    except (OSError, ValueError, UnicodeError) as e:
+        return srcPath, -1, [f"{type(e).__name__}: {e}"]
+    return srcPath, len(prog), []
+
+
+def loadCache(cachePath: str) -> Dict[str, dict]:
+    # Read the build cache (missing or corrupt cache means rebuild everything)
+    try:
+        with open(cachePath, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def saveCache(cachePath: str, cache: Dict[str, dict]) -> None:
+    # Write the build cache: source path -> key, output path and output hash
+    with open(cachePath, 'w') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+
+
+def buildParser() -> argparse.ArgumentParser:
+    # Command line options
+    parser = argparse.ArgumentParser(description="Assemble many Unknown Runes sources in parallel.")
+    parser.add_argument("sources", nargs="+", help="Source .asm files")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--out-dir", help="Write all outputs here instead of next to each source")
+    parser.add_argument("--container", action="store_true", help="Emit container images")
+    parser.add_argument("--strip", action="store_true", help="Omit symbol table (with --container)")
+    parser.add_argument("--prune", action="store_true", help="Drop unreachable blocks before assembling")
+    parser.add_argument("--cache", help=f"Cache file (default: {CACHEFILE} in the output dir or cwd)")
+    parser.add_argument("--force", action="store_true", help="Ignore the cache and rebuild everything")
+    return parser
+
+
+def main() -> int:
+    # Assemble every changed source in a process pool; 1 on any assembly error, 2 on output clashes
+    args = buildParser().parse_args()
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+    cachePath = args.cache or os.path.join(args.out_dir or '.', CACHEFILE)
+    cache = {} if args.force else loadCache(cachePath)
+
+    # --out-dir flattens directories, so same-named sources would overwrite each other
+    sources = list(dict.fromkeys(args.sources))
+    byOut: Dict[str, List[str]] = {}
+    for srcPath in sources:
+        byOut.setdefault(os.path.abspath(outPathFor(srcPath, args.out_dir)), []).append(srcPath)
+    clashes = {o: s for o, s in byOut.items() if len(s) > 1}
+    if clashes:
+        for outPath, srcs in clashes.items():
+            print(f"ASM ERROR: {', '.join(srcs)} would all be written to {outPath}", file=sys.stderr)
+        return 2
+
+    opts = f"{toolHash()}|c={args.container}|s={not args.strip}|p={args.prune}"
+    todo: List[Tuple[str, str, str]] = []
+    skipped = 0
+    for srcPath in sources:
+        outPath = outPathFor(srcPath, args.out_dir)
+        key = hashlib.sha256(f"{sha256File(srcPath)}|{opts}".encode()).hexdigest()
+        ent = cache.get(os.path.abspath(srcPath))
+        if ent and ent["key"] == key and ent["out"] == outPath and sha256File(outPath) == ent["outHash"]:
+            skipped += 1
+            continue
+        todo.append((srcPath, outPath, key))
+
+    t0 = time.perf_counter()
+    jobArgs = [(s, o, args.container, not args.strip, args.prune) for s, o, _ in todo]
+    if len(todo) > 1 and args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(todo))) as pool:
+            results = list(pool.map(asmJob, *zip(*jobArgs)))
+    else:
+        results = [asmJob(*a) for a in jobArgs]
+    elapsed = time.perf_counter() - t0
+
+    failed = 0
+    for (srcPath, outPath, key), (_, size, errs) in zip(todo, results):
+        if size < 0:
+            failed += 1
+            cache.pop(os.path.abspath(srcPath), None)
+            for e in errs:
+                print(f"ASM ERROR: {srcPath}: {e}", file=sys.stderr)
+            continue
+        cache[os.path.abspath(srcPath)] = {"key": key, "out": outPath, "outHash": sha256File(outPath)}
+        print(f"[+] {srcPath} -> {outPath} ({size} bytes)")
+
+    saveCache(cachePath, cache)
+    print(f"Assembled {len(todo) - failed}, failed {failed}, up-to-date {skipped} in {elapsed:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
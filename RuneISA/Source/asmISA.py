@@ -3,7 +3,9 @@
 
 import sys
 import re
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from runeImg import RuneImage
 
 
 class UnknownRunesAsm:
@@ -15,6 +17,22 @@ class UnknownRunesAsm:
     REGS = {'RA': 0b01, 'RB': 0b10, 'RC': 0b11}
     NOREG = 0b00
 
+    # Output sections and their load addresses (.CODE is the default)
+    SECTBASE = {'.CODE': RuneImage.CODEBASE, '.DATA': RuneImage.DATABASE}
+
+    # Instructions that end a basic block
+    JMPS = ('JMP', 'JEQ', 'JNE', 'JLT', 'JGT', 'JLE', 'JGE')
+    BLKEND = JMPS + ('CALL', 'RET', 'HALT')
+    # Instructions after which execution never falls through
+    NOFALL = ('JMP', 'RET', 'HALT')
+    # Directives the prune pass must never drop
+    KEEPDIRS = ('.CODE', '.DATA', '.ENTRY')
+
+    # String escapes: one regex pass, replacements looked up in a table
+    ESCRE = re.compile(r'\\(x[0-9A-Fa-f]{2}|.)', re.S)
+    ESCMAP = {'n': '\n', 't': '\t', 'r': '\r', '0': '\0',
+              '\\': '\\', '"': '"', "'": "'"}
+
     # Opcode table
     OPCODES = {
         'HALT': 0x00, 'MOV': 0x01, 'MOVR': 0x02, 'ADD': 0x03, 'SUB': 0x04,
@@ -46,6 +64,15 @@ class UnknownRunesAsm:
         self.out: bytearray = bytearray()
         self.pos = 0
         self.errs: List[str] = []
+        self.sect = '.CODE'
+        self.secs: Dict[str, bytearray] = {}
+        self.secPos: Dict[str, int] = {}
+        self.entry = RuneImage.CODEBASE
+        self.instrs: List[Tuple[int, str, int]] = []
+        self.dropped: List[str] = []
+        self.saved = 0
+        # Decoded string literals, shared by both passes
+        self.escMemo: Dict[str, bytes] = {}
 
     def err(self, ln: int, msg: str) -> None:
         # Record an assembly error
@@ -80,48 +107,32 @@ class UnknownRunesAsm:
         instr = (op << 34) | (r1 << 30) | (r2 << 28) | (r3 << 26) | imm24
         return instr.to_bytes(6, 'little')
 
+    def unEsc(self, m: re.Match) -> str:
+        # Replacement for one escape sequence (\xHH, known escapes, else the char itself)
+        c = m.group(1)
+        if len(c) == 3:
+            return chr(int(c[1:], 16))
+        return self.ESCMAP.get(c, c)
+
     def escStr(self, s: str) -> bytes:
-        # Process escape sequences in a string literal
+        # Process escape sequences in a string literal; plain strings skip the regex
+        bs = self.escMemo.get(s)
+        if bs is None:
+            bs = (self.ESCRE.sub(self.unEsc, s) if '\\' in s else s).encode('latin-1')
+            self.escMemo[s] = bs
+        return bs
+
+    def parseBytes(self, args: List[str], ln: int) -> bytes:
+        # Parse a whole .DB argument list in one go; labels/odd tokens fall back to parseImm
+        try:
+            return bytes([int(a, 0) & 0xFF for a in args])
+        except ValueError:
+            pass
         out = bytearray()
-        i, n = 0, len(s)
-        while i < n:
-            if s[i] == '\\' and i + 1 < n:
-                c = s[i + 1]
-                match c:
-                    case 'n':
-                        out.append(0x0A)
-                        i += 2
-                    case 't':
-                        out.append(0x09)
-                        i += 2
-                    case 'r':
-                        out.append(0x0D)
-                        i += 2
-                    case '0':
-                        out.append(0x00)
-                        i += 2
-                    case '\\':
-                        out.append(0x5C)
-                        i += 2
-                    case '"':
-                        out.append(0x22)
-                        i += 2
-                    case "'":
-                        out.append(0x27)
-                        i += 2
-                    case 'x' if i + 3 < n:
-                        try:
-                            out.append(int(s[i+2:i+4], 16))
-                            i += 4
-                        except ValueError:
-                            out.append(ord(c))
-                            i += 2
-                    case _:
-                        out.append(ord(c))
-                        i += 2
-            else:
-                out.append(ord(s[i]))
-                i += 1
+        for a in args:
+            v = self.parseImm(a, ln)
+            if v is not None:
+                out.append(v & 0xFF)
         return bytes(out)
 
     def extractStr(self, line: str) -> Optional[str]:
@@ -148,9 +159,23 @@ class UnknownRunesAsm:
         return lbl, line
 
     def tokenize(self, line: str) -> List[str]:
-        # Split instruction line into tokens
-        parts = re.split(r'[,\s]+', line)
-        return [p for p in parts if p]
+        # Split instruction line into tokens (commas and whitespace both separate)
+        return line.replace(',', ' ').split()
+
+    def resetSects(self) -> None:
+        # Start a pass in .CODE at offset 0 with empty section buffers
+        self.secs = {name: bytearray() for name in self.SECTBASE}
+        self.secPos = {}
+        self.sect = '.CODE'
+        self.out = self.secs[self.sect]
+        self.pos = 0
+
+    def switchSect(self, name: str) -> None:
+        # Switch output section; each section keeps its own position
+        self.secPos[self.sect] = self.pos
+        self.sect = name
+        self.out = self.secs[name]
+        self.pos = self.secPos.get(name, 0)
 
     def lineSize(self, toks: List[str], raw: str) -> int:
         # Calculate how many bytes a source line contributes
@@ -175,18 +200,21 @@ class UnknownRunesAsm:
     def pass1(self, src: str) -> None:
         # First pass: collect labels and compute byte positions
         self.labels = {}
-        self.pos = 0
+        self.resetSects()
         for ln, raw in enumerate(src.splitlines(), 1):
             lbl, line = self.stripLine(raw)
-            if lbl:
-                self.labels[lbl] = self.pos
             toks = self.tokenize(line) if line else []
+            if toks and toks[0].upper() in self.SECTBASE:
+                self.switchSect(toks[0].upper())
+            if lbl:
+                self.labels[lbl] = self.SECTBASE[self.sect] + self.pos
             self.pos += self.lineSize(toks, raw)
 
     def pass2(self, src: str) -> bytearray:
         # Second pass: encode instructions and data
-        self.out = bytearray()
-        self.pos = 0
+        self.resetSects()
+        self.entry = RuneImage.CODEBASE
+        self.instrs = []
         for ln, raw in enumerate(src.splitlines(), 1):
             _, line = self.stripLine(raw)
             if not line:
@@ -199,12 +227,21 @@ class UnknownRunesAsm:
 
             # Directives
             match mnem:
+                case '.CODE' | '.DATA':
+                    self.switchSect(mnem)
+                    continue
+                case '.ENTRY':
+                    if len(args) != 1:
+                        self.err(ln, ".ENTRY expects 1 operand")
+                        continue
+                    v = self.parseImm(args[0], ln)
+                    if v is not None:
+                        self.entry = v
+                    continue
                 case '.DB' | '.BYTE':
-                    for a in args:
-                        v = self.parseImm(a, ln)
-                        if v is not None:
-                            self.out.append(v & 0xFF)
-                            self.pos += 1
+                    bs = self.parseBytes(args, ln)
+                    self.out += bs
+                    self.pos += len(bs)
                     continue
                 case '.DW' | '.WORD':
                     for a in args:
@@ -282,32 +319,160 @@ class UnknownRunesAsm:
                                 if v is not None:
                                     imm = v
 
+            if self.sect == '.CODE':
+                self.instrs.append((self.SECTBASE[self.sect] + self.pos, mnem, imm))
             self.out.extend(self.encInstr(op, r1, r2, r3, imm))
             self.pos += self.INSTRSZ
 
-        return self.out
+        return self.secs['.CODE']
+
+    def basicBlocks(self) -> List[Tuple[int, int]]:
+        # Split encoded .CODE instructions into (start, count) basic blocks
+        addrs = {a for a, _, _ in self.instrs}
+        leaders = {self.entry} | {v for v in self.labels.values() if v in addrs}
+        for a, mnem, imm in self.instrs:
+            if mnem in self.JMPS:
+                leaders.add(imm & 0xFFFFFF)
+            if mnem in self.BLKEND:
+                leaders.add(a + self.INSTRSZ)
+
+        blocks: List[Tuple[int, int]] = []
+        start, cnt, prev = -1, 0, -1
+        for a, _, _ in self.instrs:
+            if cnt == 0 or a in leaders or a != prev + self.INSTRSZ:
+                if cnt:
+                    blocks.append((start, cnt))
+                start, cnt = a, 0
+            cnt += 1
+            prev = a
+        if cnt:
+            blocks.append((start, cnt))
+        return blocks
+
+    def imageSize(self, src: str) -> int:
+        # Total bytes a source would assemble to across all sections
+        self.pass1(src)
+        self.secPos[self.sect] = self.pos
+        return sum(self.secPos.values())
+
+    def prune(self, src: str) -> str:
+        # Linker-style pass: split source into label blocks, walk references from the
+        # entry and drop blocks nothing reaches (unused .DB strings, dead code).
+        # Only label references are tracked; numeric addresses into code/data are not.
+        lines = src.splitlines()
+        starts = [0] + [i for i, raw in enumerate(lines) if i and self.stripLine(raw)[0]]
+        bounds = list(zip(starts, starts[1:] + [len(lines)]))
+
+        lblBlk: Dict[str, int] = {}
+        for b, (s, _) in enumerate(bounds):
+            lbl = self.stripLine(lines[s])[0]
+            if lbl:
+                lblBlk[lbl] = b
+                lblBlk.setdefault(lbl.upper(), b)
+
+        refs: List[List[int]] = []
+        roots = [0]
+        for b, (s, e) in enumerate(bounds):
+            out: List[int] = []
+            last = None  # last mnemonic; None means no instruction/data yet
+            for raw in lines[s:e]:
+                _, line = self.stripLine(raw)
+                toks = self.tokenize(line) if line else []
+                if not toks:
+                    continue
+                mnem = toks[0].upper()
+                if mnem in ('.DS', '.STRING'):
+                    last = mnem
+                    continue  # string contents are not references
+                for t in toks[1:]:
+                    tgt = lblBlk.get(t, lblBlk.get(t.upper()))
+                    if tgt is not None:
+                        out.append(tgt)
+                        if mnem == '.ENTRY':
+                            roots.append(tgt)
+                if mnem in self.OPCODES or mnem in ('.DB', '.BYTE', '.DW', '.WORD'):
+                    last = mnem
+            # Code falls into the next block unless it ends in JMP/RET/HALT; data does not
+            if b + 1 < len(bounds) and (last is None or
+                                        (last in self.OPCODES and last not in self.NOFALL)):
+                out.append(b + 1)
+            refs.append(out)
+
+        live = set()
+        work = list(roots)
+        while work:
+            b = work.pop()
+            if b in live:
+                continue
+            live.add(b)
+            work.extend(refs[b])
+
+        keep: List[str] = []
+        self.dropped = []
+        for b, (s, e) in enumerate(bounds):
+            if b in live:
+                keep.extend(lines[s:e])
+                continue
+            lbl = self.stripLine(lines[s])[0]
+            if lbl:
+                self.dropped.append(lbl)
+            for raw in lines[s:e]:
+                _, line = self.stripLine(raw)
+                toks = self.tokenize(line) if line else []
+                if toks and toks[0].upper() in self.KEEPDIRS:
+                    keep.append(line)
+
+        pruned = '\n'.join(keep) + '\n'
+        self.saved = self.imageSize(src) - self.imageSize(pruned)
+        return pruned
+
+    def reportErrs(self) -> bool:
+        # Print collected errors; True if assembly failed
+        for e in self.errs:
+            print(f"ASM ERROR: {e}", file=sys.stderr)
+        return bool(self.errs)
 
     def assemble(self, src: str) -> Optional[bytes]:
-        # Two-pass assembly: source text → binary
+        # Two-pass assembly: source text → raw binary (loaded at CODEBASE)
         self.errs = []
         self.pass1(src)
         result = self.pass2(src)
-        if self.errs:
-            for e in self.errs:
-                print(f"ASM ERROR: {e}", file=sys.stderr)
+        if self.secs['.DATA']:
+            self.errs.append("Raw output cannot hold a .DATA section (use --container)")
+        if self.entry != RuneImage.CODEBASE:
+            self.errs.append("Raw output always starts at CODEBASE (use --container)")
+        if self.reportErrs():
             return None
         return bytes(result)
 
-    def asmFile(self, fPath: str) -> Optional[bytes]:
+    def assembleImage(self, src: str, syms: bool = True) -> Optional[RuneImage]:
+        # Two-pass assembly into a container with sections, symbols and block index
+        self.errs = []
+        self.pass1(src)
+        code = self.pass2(src)
+        if self.reportErrs():
+            return None
+        return RuneImage(code, self.secs['.DATA'], self.entry,
+                         self.labels if syms else None, self.basicBlocks())
+
+    def asmFile(self, fPath: str, prune: bool = False) -> Optional[bytes]:
         # Assemble from source file
         with open(fPath, 'r') as f:
-            return self.assemble(f.read())
+            src = f.read()
+        return self.assemble(self.prune(src) if prune else src)
+
+    def imgFile(self, fPath: str, syms: bool = True, prune: bool = False) -> Optional[bytes]:
+        # Assemble from source file into a packed container
+        with open(fPath, 'r') as f:
+            src = f.read()
+        img = self.assembleImage(self.prune(src) if prune else src, syms)
+        return img.pack() if img is not None else None
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Unknown Runes ISA Assembler v1.0")
-        print("Usage: python asmISA.py <source.asm> [-o output.rune]")
+        print("Usage: python asmISA.py <source.asm> [-o output.rune] [--container [--strip]] [--prune]")
         sys.exit(0)
 
     srcPath = sys.argv[1]
@@ -323,10 +488,19 @@ if __name__ == "__main__":
         outPath = srcPath.rsplit('.', 1)[0] + '.rune'
 
     asm = UnknownRunesAsm()
-    prog = asm.asmFile(srcPath)
+    prune = '--prune' in sys.argv
+    if '--container' in sys.argv:
+        prog = asm.imgFile(srcPath, syms='--strip' not in sys.argv, prune=prune)
+    else:
+        prog = asm.asmFile(srcPath, prune=prune)
     if prog is None:
         sys.exit(1)
 
+    if prune:
+        print(f"Pruned {len(asm.dropped)} unreachable block(s), saved {asm.saved} bytes")
+        for lbl in asm.dropped:
+            print(f"  - {lbl}")
+
     print(f"Assembled {len(prog)} bytes")
 
     with open(outPath, 'wb') as f:
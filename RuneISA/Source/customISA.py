@@ -3,7 +3,9 @@
 
 import sys
 import random
-from typing import Dict
+from typing import Dict, Tuple
+
+from runeImg import RuneImage
 
 
 class RuneVM:
@@ -87,6 +89,9 @@ class RuneVM:
         self.halted = False
         self.instrCnt = 0
         self.maxInstrs = 1000000
+        # Pre-decoded instructions from a container's block index (addr -> decoded tuple)
+        self.icache: Dict[int, Tuple] = {}
+        self.symbols: Dict[int, str] = {}
 
     def sgnExt24(self, val: int) -> int:
         # Sign extend 24-bit immediate to Python int
@@ -117,11 +122,39 @@ class RuneVM:
         raise RuntimeError(f"Memory address out of bounds: 0x{addr:X}")
 
     def loadProg(self, prog: bytes) -> None:
-        # Load program bytes into memory
+        # Load program bytes into memory (raw code image or RuneImage container)
+        if RuneImage.isContainer(prog):
+            self.loadImage(RuneImage.unpack(prog))
+            return
         if len(prog) > self.CODESZ:
             raise RuntimeError("Program too large for code segment")
-        for i, b in enumerate(prog):
-            self.mem[self.CODEBASE + i] = b
+        self.mem.update(zip(range(self.CODEBASE, self.CODEBASE + len(prog)), prog))
+
+    def loadImage(self, img: RuneImage) -> None:
+        # Load container sections at CODEBASE/DATABASE and pre-decode its indexed blocks
+        if len(img.code) > self.CODESZ:
+            raise RuntimeError("Program too large for code segment")
+        if len(img.data) > self.DATASZ:
+            raise RuntimeError("Data section too large for data segment")
+        self.mem.update(zip(range(self.CODEBASE, self.CODEBASE + len(img.code)), img.code))
+        self.mem.update(zip(range(self.DATABASE, self.DATABASE + len(img.data)), img.data))
+        self.pc = img.entry
+        self.symbols = {addr: name for name, addr in img.symbols.items()}
+
+        # The block index already tells us where code is, so no scanning here
+        self.icache = {}
+        for start, cnt in img.blocks:
+            for i in range(cnt):
+                off = start - self.CODEBASE + i * self.INSTRSZ
+                if off < 0 or off + self.INSTRSZ > len(img.code):
+                    break
+                instr = int.from_bytes(img.code[off:off + self.INSTRSZ], "little")
+                self.icache[self.CODEBASE + off] = self.decodeInstr(instr)
+
+    def invICache(self, addr: int, length: int) -> None:
+        # Drop pre-decoded instructions overlapping a memory write
+        for a in range(addr - self.INSTRSZ + 1, addr + length):
+            self.icache.pop(a, None)
 
     def loadProgFile(self, fPath: str) -> None:
         # Load program from binary file
@@ -143,6 +176,8 @@ class RuneVM:
         val = self.to24(val)
         for i in range(3):
             self.mem[addr + i] = (val >> (i * 8)) & 0xFF
+        if self.icache:
+            self.invICache(addr, 3)
 
     def rdStk(self, addr: int) -> int:
         # Read 64-bit value from stack memory (little-endian)
@@ -226,6 +261,8 @@ class RuneVM:
                 nWrit = min(len(line), maxLen)
                 for i in range(nWrit):
                     self.mem[addr + i] = ord(line[i]) & 0xFF
+                if self.icache:
+                    self.invICache(addr, nWrit)
                 return nWrit
             case 5:  # STRLEN
                 addr, sLen = self.regs[rB] & 0xFFFFFFFFFFFFFFFF, 0
@@ -530,14 +567,17 @@ class RuneVM:
         # Execute program until HALT or max instructions
         while not self.halted and self.instrCnt < self.maxInstrs:
             try:
-                instr = self.fetchInstr()
-                op, rsv, r0, r1, r2, rsv2, imm = self.decodeInstr(instr)
+                dec = self.icache.get(self.pc)
+                if dec is None:
+                    dec = self.decodeInstr(self.fetchInstr())
+                op, rsv, r0, r1, r2, rsv2, imm = dec
 
                 if dbg:
                     mnem = self.REVOP.get(op, "UNKNOWN")
                     rv = lambda r: hex(self.regs[r]) if 0 <= r <= 2 else "--"
+                    sym = f" <{self.symbols[self.pc]}>" if self.pc in self.symbols else ""
                     print(
-                        f"[{self.instrCnt:06d}] PC=0x{self.pc:016X} {mnem} R0={rv(r0)} R1={rv(r1)} R2={rv(r2)} IMM={imm}"
+                        f"[{self.instrCnt:06d}] PC=0x{self.pc:016X}{sym} {mnem} R0={rv(r0)} R1={rv(r1)} R2={rv(r2)} IMM={imm}"
                     )
 
                 self.execInstr(op, rsv, r0, r1, r2, rsv2, imm)
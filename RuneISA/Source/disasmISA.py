@@ -0,0 +1,389 @@
+# Unknown Runes ISA Disassembler (42-bit instructions)
+# Decodes .rune images back into re-assemblable source for asmISA.py
+
+import sys
+import struct
+from typing import Dict, List, Optional, Set, Tuple
+
+from asmISA import UnknownRunesAsm
+from runeImg import RuneImage
+
+try:
+    import numpy as np  # optional, speeds up bulk unpacking
+except ImportError:
+    np = None
+
+
+class UnknownRunesDisasm:
+    # Disassembler for Unknown Runes ISA
+
+    INSTRSZ = 6
+    NOREG = 0b00
+    RA = 0b01
+
+    OPCODES = UnknownRunesAsm.OPCODES
+    FMTS = UnknownRunesAsm.FMTS
+    REVOP = {v: k for k, v in OPCODES.items()}
+    REVREG = {v: k for k, v in UnknownRunesAsm.REGS.items()}
+
+    JCC = ('JEQ', 'JNE', 'JLT', 'JGT', 'JLE', 'JGE')
+    # Instructions that never write their Reg1 field
+    NOWRITE = ('HALT', 'STORE', 'STOREI', 'JMP', 'PUSH', 'PUSHI', 'PUSHA',
+               'CALL', 'RET') + JCC
+
+    # 48-bit slot as low dword + high word (little-endian)
+    SLOT = struct.Struct('<IH')
+    BYTESPERLINE = 16
+
+    def __init__(self):
+        self.asm = UnknownRunesAsm()
+        # 48-bit word -> (mnem, r1, r2, r3, imm) or None if not a valid instruction
+        self.cache: Dict[int, Optional[tuple]] = {}
+        self.code: Dict[int, tuple] = {}
+        self.callTgts: Set[int] = set()
+
+    def unpackWords(self, img: bytes) -> List[int]:
+        # Unpack every aligned 6-byte slot of the image into 48-bit words
+        n = len(img) // self.INSTRSZ
+        if n == 0:
+            return []
+        if np is not None:
+            raw = np.frombuffer(img, dtype=np.uint8, count=n * self.INSTRSZ)
+            buf = np.zeros((n, 8), dtype=np.uint8)
+            buf[:, :self.INSTRSZ] = raw.reshape(n, self.INSTRSZ)
+            return buf.view('<u8').ravel().tolist()
+        return [lo | (hi << 32)
+                for lo, hi in self.SLOT.iter_unpack(img[:n * self.INSTRSZ])]
+
+    def decodeWord(self, word: int) -> Optional[tuple]:
+        # Decode a 48-bit slot, memoized since programs repeat the same words a lot
+        try:
+            return self.cache[word]
+        except KeyError:
+            pass
+        ins = None
+        op = (word >> 34) & 0xFF
+        rsv = (word >> 32) & 0x03
+        rsv2 = (word >> 24) & 0x03
+        mnem = self.REVOP.get(op)
+        if mnem is not None and rsv == 0 and rsv2 == 0 and (word >> 42) == 0:
+            ins = (mnem, (word >> 30) & 0x03, (word >> 28) & 0x03,
+                   (word >> 26) & 0x03, word & 0xFFFFFF)
+        self.cache[word] = ins
+        return ins
+
+    def trackConsts(self, consts: Dict[int, int], ins: tuple) -> None:
+        # Follow MOV/MZERO constants in registers so CALL Rx targets can be resolved
+        mnem, r1 = ins[0], ins[1]
+        match mnem:
+            case 'MOV':
+                consts[r1] = ins[4]
+            case 'MZERO':
+                consts[r1] = 0
+            case 'CALL':
+                consts.clear()
+            case 'POPA':
+                consts.clear()
+            case 'SYSCALL':
+                consts.pop(self.RA, None)
+            case _ if mnem not in self.NOWRITE:
+                consts.pop(r1, None)
+
+    def linearSweep(self, img: bytes) -> Dict[int, tuple]:
+        # Decode every aligned slot; slots that are not valid instructions become data
+        self.code, self.callTgts = {}, set()
+        consts: Dict[int, int] = {}
+        for i, word in enumerate(self.unpackWords(img)):
+            ins = self.decodeWord(word)
+            if ins is None:
+                consts = {}
+                continue
+            addr = i * self.INSTRSZ
+            self.code[addr] = ins
+            if ins[0] == 'CALL' and ins[1] in consts:
+                self.callTgts.add(consts[ins[1]])
+            self.trackConsts(consts, ins)
+            if ins[0] in ('JMP', 'RET', 'HALT'):
+                consts = {}
+        return self.code
+
+    def recursiveDescent(self, img: bytes, entries: Tuple[int, ...] = (0,)) -> Dict[int, tuple]:
+        # Follow JMP/Jcc/CALL flow from the entry points, leaving everything else as data
+        self.code, self.callTgts = {}, set()
+        n = len(img)
+        aligned = self.unpackWords(img)
+        covered = bytearray(n)
+        work: List[Tuple[int, Dict[int, int]]] = [(e, {}) for e in entries]
+
+        while work:
+            addr, consts = work.pop()
+            while 0 <= addr and addr + self.INSTRSZ <= n and addr not in self.code:
+                if any(covered[addr:addr + self.INSTRSZ]):
+                    break  # lands inside an instruction already decoded
+                if addr % self.INSTRSZ == 0:
+                    word = aligned[addr // self.INSTRSZ]
+                else:
+                    word = int.from_bytes(img[addr:addr + self.INSTRSZ], 'little')
+                ins = self.decodeWord(word)
+                if ins is None:
+                    break
+
+                self.code[addr] = ins
+                covered[addr:addr + self.INSTRSZ] = b'\x01' * self.INSTRSZ
+                mnem, r1, imm = ins[0], ins[1], ins[4]
+
+                if mnem in ('RET', 'HALT'):
+                    break
+                if mnem == 'JMP':
+                    work.append((imm, {}))
+                    break
+                if mnem in self.JCC:
+                    work.append((imm, dict(consts)))
+                elif mnem == 'CALL' and r1 in consts:
+                    self.callTgts.add(consts[r1])
+                    work.append((consts[r1], {}))
+                elif mnem == 'SYSCALL' and consts.get(self.RA) == 0:
+                    break  # EXIT does not return
+
+                self.trackConsts(consts, ins)
+                addr += self.INSTRSZ
+
+        return self.code
+
+    def canonical(self, ins: tuple) -> Optional[bytes]:
+        # Re-encode an instruction the way the assembler would emit it from text
+        mnem, r1, r2, r3, imm = ins
+        fmt = self.FMTS[mnem]
+        regs = [r1, r2, r3]
+        if self.NOREG in regs[:fmt.count('r')] or (fmt == '*' and r1 == self.NOREG):
+            return None  # a required register field is empty, not expressible in source
+        if fmt == '*':
+            # SYSCALL takes registers positionally until the first unused field
+            for i in range(3):
+                if regs[i] == self.NOREG:
+                    regs[i:] = [self.NOREG] * (3 - i)
+                    break
+        else:
+            nReg = fmt.count('r')
+            regs = regs[:nReg] + [self.NOREG] * (3 - nReg)
+        return self.asm.encInstr(self.OPCODES[mnem], regs[0], regs[1], regs[2],
+                                 imm if 'i' in fmt else 0)
+
+    def fmtImm(self, imm: int) -> str:
+        # Format a 24-bit immediate so it reassembles to the same bits
+        if imm & 0x800000:
+            return str(imm - (1 << 24))
+        if imm < 0x100:
+            return str(imm)
+        return f'0x{imm:X}'
+
+    def fmtInstr(self, ins: tuple, labels: Dict[int, str]) -> str:
+        # Render one decoded instruction as assembler source
+        mnem, r1, r2, r3, imm = ins
+        fmt = self.FMTS[mnem]
+        regs = [r1, r2, r3]
+        ops: List[str] = []
+        if fmt == '*':
+            for r in regs:
+                if r == self.NOREG:
+                    break
+                ops.append(self.REVREG[r])
+        else:
+            rIdx = 0
+            for fi in fmt:
+                if fi == 'r':
+                    ops.append(self.REVREG[regs[rIdx]])
+                    rIdx += 1
+                else:
+                    ops.append(labels.get(imm) or self.fmtImm(imm))
+        return f'    {mnem} {", ".join(ops)}'.rstrip()
+
+    def collectLabels(self, img: bytes, covered: bytearray) -> Dict[int, str]:
+        # Name every referenced address that sits on an instruction or data boundary
+        n = len(img)
+        tgts: Set[int] = set()
+        dataRefs: Set[int] = set()
+        for addr, ins in self.code.items():
+            mnem, imm = ins[0], ins[4]
+            if mnem == 'JMP' or mnem in self.JCC:
+                tgts.add(imm)
+            elif mnem == 'MOV':
+                if imm in self.callTgts:
+                    tgts.add(imm)
+                elif imm < n and not covered[imm] and imm not in self.code:
+                    dataRefs.add(imm)
+
+        labels: Dict[int, str] = {}
+        for a in tgts | self.callTgts:
+            if a in self.code:
+                labels[a] = f'loc_{a:06X}'
+            elif 0 <= a < n and not covered[a]:
+                dataRefs.add(a)
+        for a in dataRefs:
+            labels.setdefault(a, f'dat_{a:06X}')
+        return labels
+
+    def fmtData(self, chunk: bytes) -> List[str]:
+        # Render a data run: NUL-terminated printable runs as .DS, the rest as .DB
+        lines: List[str] = []
+        pend = bytearray()
+        i, n = 0, len(chunk)
+        while i < n:
+            j = i
+            while j < n and (0x20 <= chunk[j] < 0x7F or chunk[j] in (0x09, 0x0A, 0x0D)):
+                j += 1
+            if j < n and chunk[j] == 0 and j - i >= 4:
+                lines.extend(self.fmtBytes(pend))
+                pend = bytearray()
+                lines.append(f'    .DS "{self.escape(chunk[i:j])}"')
+                i = j + 1
+                continue
+            j = max(j, i + 1)
+            pend += chunk[i:j]
+            i = j
+        lines.extend(self.fmtBytes(pend))
+        return lines
+
+    def fmtBytes(self, raw: bytes) -> List[str]:
+        # Render raw bytes as .DB lines
+        return ['    .DB ' + ', '.join(f'0x{b:02X}' for b in raw[s:s + self.BYTESPERLINE])
+                for s in range(0, len(raw), self.BYTESPERLINE)]
+
+    def escape(self, raw: bytes) -> str:
+        # Escape bytes for a .DS literal (';' would be eaten as a comment by stripLine)
+        out = []
+        for b in raw:
+            match b:
+                case 0x0A:
+                    out.append('\\n')
+                case 0x09:
+                    out.append('\\t')
+                case 0x0D:
+                    out.append('\\r')
+                case 0x5C:
+                    out.append('\\\\')
+                case 0x22:
+                    out.append('\\"')
+                case 0x3B:
+                    out.append('\\x3B')
+                case _:
+                    out.append(chr(b))
+        return ''.join(out)
+
+    def render(self, img: bytes, showAddr: bool = False,
+               names: Optional[Dict[int, str]] = None, data: bytes = b'',
+               entry: int = RuneImage.CODEBASE) -> str:
+        # Emit source for the current decode of img; code and data interleave by address.
+        # names/data/entry come from a container: symbol names and the .DATA section.
+        n = len(img)
+        covered = bytearray(n + 1)
+        for addr in self.code:
+            covered[addr + 1:addr + self.INSTRSZ] = b'\x01' * (self.INSTRSZ - 1)
+        labels = self.collectLabels(img, covered)
+
+        dBase, dEnd = RuneImage.DATABASE, RuneImage.DATABASE + len(data)
+        if data:
+            for ins in self.code.values():
+                if dBase <= ins[4] <= dEnd:
+                    labels.setdefault(ins[4], f'dat_{ins[4]:06X}')
+        if entry != RuneImage.CODEBASE:
+            labels.setdefault(entry, f'loc_{entry:06X}')
+        for a, name in (names or {}).items():
+            if a in labels or a in self.code or (0 <= a <= n and not covered[a]) \
+                    or (data and dBase <= a <= dEnd):
+                labels[a] = name
+
+        out: List[str] = []
+        if entry != RuneImage.CODEBASE:
+            out.append(f'.ENTRY {labels[entry]}')
+        addr = 0
+        while addr < n:
+            if addr in labels:
+                out.append(f'{labels[addr]}:')
+            ins = self.code.get(addr)
+            if ins is not None:
+                raw = img[addr:addr + self.INSTRSZ]
+                if self.canonical(ins) == raw:
+                    line = self.fmtInstr(ins, labels)
+                else:
+                    line = self.fmtBytes(raw)[0] + f'  ; non-canonical {ins[0]}'
+                out.append(f'{line:<39} ; 0x{addr:06X}' if showAddr else line)
+                addr += self.INSTRSZ
+                continue
+            # data run ends at the next instruction or label
+            end = addr + 1
+            while end < n and end not in self.code and end not in labels:
+                end += 1
+            dLines = self.fmtData(img[addr:end])
+            if showAddr and dLines:
+                dLines[0] = f'{dLines[0]:<39} ; 0x{addr:06X}'
+            out.extend(dLines)
+            addr = end
+        if n in labels:
+            out.append(f'{labels[n]}:')
+
+        if data:
+            out.append('.DATA')
+            addr = 0
+            while addr < len(data):
+                if dBase + addr in labels:
+                    out.append(f'{labels[dBase + addr]}:')
+                end = addr + 1
+                while end < len(data) and dBase + end not in labels:
+                    end += 1
+                out.extend(self.fmtData(data[addr:end]))
+                addr = end
+            if dEnd in labels:
+                out.append(f'{labels[dEnd]}:')
+        return '\n'.join(out) + '\n'
+
+    def disImage(self, rimg: RuneImage, showAddr: bool = False) -> str:
+        # Disassemble a container: start from its entry and indexed blocks, keep its symbol names
+        entries = (rimg.entry,) + tuple(start for start, _ in rimg.blocks)
+        self.recursiveDescent(rimg.code, entries)
+        names = {addr: name for name, addr in rimg.symbols.items()}
+        return self.render(rimg.code, showAddr, names, rimg.data, rimg.entry)
+
+    def disassemble(self, img: bytes, linear: bool = False, showAddr: bool = False) -> str:
+        # Decode a whole image and return re-assemblable source
+        if RuneImage.isContainer(img):
+            return self.disImage(RuneImage.unpack(img), showAddr)
+        if linear:
+            self.linearSweep(img)
+        else:
+            self.recursiveDescent(img)
+        return self.render(img, showAddr)
+
+    def disFile(self, fPath: str, linear: bool = False, showAddr: bool = False) -> str:
+        # Disassemble a .rune file
+        with open(fPath, 'rb') as f:
+            return self.disassemble(f.read(), linear, showAddr)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Unknown Runes ISA Disassembler v1.0")
+        print("Usage: python disasmISA.py <program.rune> [-o output.asm] [--linear] [--addr]")
+        sys.exit(0)
+
+    runePath = sys.argv[1]
+    outPath = None
+
+    # Parse -o flag
+    if '-o' in sys.argv:
+        oIdx = sys.argv.index('-o')
+        if oIdx + 1 < len(sys.argv):
+            outPath = sys.argv[oIdx + 1]
+
+    dis = UnknownRunesDisasm()
+    src = dis.disFile(runePath, linear='--linear' in sys.argv,
+                      showAddr='--addr' in sys.argv)
+
+    if outPath is None:
+        sys.stdout.write(src)
+        sys.exit(0)
+
+    with open(outPath, 'w') as f:
+        f.write(src)
+    print(f"Disassembled {len(dis.code)} instructions")
+    print(f"Written to {outPath}")
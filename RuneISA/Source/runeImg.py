@@ -0,0 +1,93 @@
+# Unknown Runes program container (.rune v1)
+# Wraps code/data sections with an entry point, optional symbol table and basic-block index.
+# Raw .rune files (plain code bytes loaded at CODEBASE) stay valid: a raw program can never
+# start with the container magic, since byte 4 = version 0x01 sets the reserved bits 33..32.
+
+import struct
+from typing import Dict, List, Optional, Tuple
+
+
+class RuneImage:
+    # Program image: sections plus load metadata
+
+    MAGIC = b'RUNE'
+    VERSION = 1
+
+    CODEBASE = 0x0000000000000000
+    DATABASE = 0x0000000000100000
+
+    FLAG_SYMS = 0x01
+    FLAG_BLKS = 0x02
+
+    # magic, version, flags, rsv, entry, codeSz, dataSz, symCnt, blkCnt, rsv
+    HDR = struct.Struct('<4sBBHIIIIII')
+    SYM = struct.Struct('<IB')  # addr, name length (name bytes follow)
+    BLK = struct.Struct('<II')  # block start addr, instruction count
+
+    def __init__(self, code: bytes = b'', data: bytes = b'', entry: int = CODEBASE,
+                 symbols: Optional[Dict[str, int]] = None,
+                 blocks: Optional[List[Tuple[int, int]]] = None):
+        self.code = bytes(code)
+        self.data = bytes(data)
+        self.entry = entry
+        self.symbols: Dict[str, int] = dict(symbols or {})
+        self.blocks: List[Tuple[int, int]] = list(blocks or [])
+
+    @classmethod
+    def isContainer(cls, blob: bytes) -> bool:
+        # True if blob starts with a container header rather than raw code
+        return blob[:4] == cls.MAGIC
+
+    def pack(self) -> bytes:
+        # Serialize: header | code | data | symbols | blocks
+        flags = (self.FLAG_SYMS if self.symbols else 0) | (self.FLAG_BLKS if self.blocks else 0)
+        out = bytearray(self.HDR.pack(self.MAGIC, self.VERSION, flags, 0, self.entry,
+                                      len(self.code), len(self.data),
+                                      len(self.symbols), len(self.blocks), 0))
+        out += self.code
+        out += self.data
+        for name, addr in self.symbols.items():
+            nm = name.encode('utf-8')
+            if len(nm) > 0xFF:
+                raise RuntimeError(f"Symbol name too long: {name}")
+            out += self.SYM.pack(addr, len(nm))
+            out += nm
+        for start, cnt in self.blocks:
+            out += self.BLK.pack(start, cnt)
+        return bytes(out)
+
+    @classmethod
+    def unpack(cls, blob: bytes) -> 'RuneImage':
+        # Parse a container; sections are returned as slices of blob
+        if len(blob) < cls.HDR.size or not cls.isContainer(blob):
+            raise RuntimeError("Not a rune container image")
+        (_, ver, _, _, entry, codeSz, dataSz,
+         symCnt, blkCnt, _) = cls.HDR.unpack_from(blob, 0)
+        if ver != cls.VERSION:
+            raise RuntimeError(f"Unsupported rune container version {ver}")
+
+        pos = cls.HDR.size
+        if pos + codeSz + dataSz > len(blob):
+            raise RuntimeError("Truncated rune container (sections)")
+        code = blob[pos:pos + codeSz]
+        pos += codeSz
+        data = blob[pos:pos + dataSz]
+        pos += dataSz
+
+        symbols: Dict[str, int] = {}
+        for _ in range(symCnt):
+            if pos + cls.SYM.size > len(blob):
+                raise RuntimeError("Truncated rune container (symbols)")
+            addr, nLen = cls.SYM.unpack_from(blob, pos)
+            pos += cls.SYM.size
+            symbols[blob[pos:pos + nLen].decode('utf-8')] = addr
+            pos += nLen
+
+        if pos + blkCnt * cls.BLK.size > len(blob):
+            raise RuntimeError("Truncated rune container (blocks)")
+        blocks = [cls.BLK.unpack_from(blob, pos + i * cls.BLK.size) for i in range(blkCnt)]
+
+        img = cls.__new__(cls)
+        img.code, img.data, img.entry = code, data, entry
+        img.symbols, img.blocks = symbols, blocks
+        return img